@@ -48,18 +48,6 @@ class DatabaseConnection:
             )
         ''')
 
-        # Tabla de notificaciones o alertas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alertas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                socio_id INTEGER NOT NULL,
-                mensaje TEXT NOT NULL,
-                fecha_creacion TEXT NOT NULL,
-                leida INTEGER DEFAULT 0,
-                FOREIGN KEY(socio_id) REFERENCES socios(id)
-            )
-        ''')
-
         self.conn.commit()
 
     def execute(self, query: str, params: tuple = ()):  
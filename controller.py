@@ -2,9 +2,10 @@
 controllers.py
 Controladores que gestionan la lógica entre las vistas y los modelos.
 Maneja la carga inicial, pagos atrasados y creación automática de alertas.
+Las alertas se guardan como notificaciones (ver NotificationsModel).
 """
-from datetime import datetime, timedelta
-from models import Socio, Pago, Alerta
+from models import Socio, Pago
+from models.notifications_model import NotificationsModel
 
 
 class AppController:
@@ -12,7 +13,7 @@ class AppController:
         self.db = db_connection
         self.socios = Socio(self.db)
         self.pagos = Pago(self.db)
-        self.alertas = Alerta(self.db)
+        self.notificaciones = NotificationsModel(self.db.db_name)
 
     def cargar_datos_iniciales(self):
         # Puede usarse al inicio del programa si se desea poblar datos de prueba
@@ -21,23 +22,8 @@ class AppController:
             self.socios.agregar("Ana", "Gómez", "987654321", "ana@example.com", "Mensual")
 
     def generar_alertas_atrasados(self):
-        socios = self.socios.obtener_todos()
-        hoy = datetime.now()
-        limite = hoy - timedelta(days=10)  # Más de 10 días sin pagar
-
-        for socio in socios:
-            socio_id = socio[0]
-            ultimo_pago = self.pagos.obtener_pagos_por_socio(socio_id)
-
-            if ultimo_pago:
-                fecha_ultimo = datetime.strptime(ultimo_pago[0][3], '%Y-%m-%d')
-                if fecha_ultimo < limite:
-                    mensaje = f"El socio {socio[1]} {socio[2]} tiene pagos atrasados."
-                    self.alertas.crear_alerta(socio_id, mensaje)
-            else:
-                # Socio sin pagos registrados
-                mensaje = f"El socio {socio[1]} {socio[2]} no tiene pagos registrados."
-                self.alertas.crear_alerta(socio_id, mensaje)
+        # Todos los socios en una sola sentencia, sin repetir avisos (ver verificar_pagos_vencidos)
+        return self.notificaciones.verificar_pagos_vencidos()
 
     def obtener_socios(self):
         return self.socios.obtener_todos()
@@ -46,7 +32,11 @@ class AppController:
         self.pagos.registrar_pago(socio_id, monto, mes_correspondiente)
 
     def obtener_alertas_no_leidas(self):
-        return self.alertas.obtener_no_leidas()
+        # (id, socio, mensaje, fecha) como las devolvía la tabla vieja de alertas
+        return [
+            (notif[0], notif[2], notif[4], notif[5])
+            for notif in self.notificaciones.obtener_notificaciones_pendientes()
+        ]
 
     def marcar_alerta_leida(self, alerta_id):
-        self.alertas.marcar_como_leida(alerta_id)
+        self.notificaciones.marcar_como_leida(alerta_id)
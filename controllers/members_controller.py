@@ -78,13 +78,26 @@ controllers/members_controller.py
 Controlador para la gestión de socios.
 """
 
+import json
 import sqlite3
 
+from models.phone_index import PhoneIndex, guardar_telefono_en, normalizar_telefono, parece_telefono
+from models.trigram_index import TrigramIndex
+
+
+# Teléfono tal como se cargó, sin los separadores que acepta parece_telefono
+DIGITOS_TELEFONO_SQL = (
+    "replace(replace(replace(replace(replace(replace(replace("
+    "s.telefono, ' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', ''), '/', '')"
+)
+
 
 class MembersController:
     def __init__(self, db_path="gimnasio.db"):
         self.db_path = db_path
         self.create_table()
+        self.indice_trigramas = TrigramIndex(db_path)
+        self.indice_telefonos = PhoneIndex(db_path)
 
     def create_table(self):
         """Crea la tabla de socios si no existe."""
@@ -102,6 +115,10 @@ class MembersController:
                 FOREIGN KEY(plan_id) REFERENCES planes(id)
             )
         """)
+        c.execute("PRAGMA table_info(socios)")
+        if 'foto' not in [col[1] for col in c.fetchall()]:
+            # Hash de la foto en PhotoStore; la imagen no se guarda en la base
+            c.execute("ALTER TABLE socios ADD COLUMN foto TEXT")
         conn.commit()
         conn.close()
 
@@ -132,14 +149,21 @@ class MembersController:
     def agregar(self, nombre, apellido, telefono, fecha_inscripcion, plan_id):
         """Agrega un nuevo socio."""
         conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO socios (nombre, apellido, telefono, fecha_inscripcion, plan_id, activo)
-            VALUES (?, ?, ?, ?, ?, 1)
-        """, (nombre, apellido, telefono, fecha_inscripcion, plan_id))
+        self.insertar(conn, nombre, apellido, telefono, fecha_inscripcion, plan_id)
         conn.commit()
         conn.close()
 
+    def insertar(self, conn, nombre, apellido, telefono, fecha_inscripcion, plan_id):
+        """Inserta un socio usando la conexión recibida, sin hacer commit."""
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO socios (nombre, apellido, telefono, telefono_norm, fecha_inscripcion, plan_id, activo)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+        """, (nombre, apellido, telefono, normalizar_telefono(telefono), fecha_inscripcion, plan_id))
+        socio_id = c.lastrowid
+        self._sincronizar_trigramas_en(conn)
+        return socio_id
+
     def actualizar(self, socio_id, nombre, apellido, telefono, plan_id):
         """Actualiza los datos de un socio existente."""
         conn = sqlite3.connect(self.db_path)
@@ -149,6 +173,8 @@ class MembersController:
             SET nombre=?, apellido=?, telefono=?, plan_id=?
             WHERE id=?
         """, (nombre, apellido, telefono, plan_id, socio_id))
+        guardar_telefono_en(conn, socio_id, telefono)
+        self._sincronizar_trigramas_en(conn)
         conn.commit()
         conn.close()
 
@@ -160,19 +186,132 @@ class MembersController:
         conn.commit()
         conn.close()
 
-    def buscar(self, termino):
-        """Busca socios por nombre, apellido o teléfono."""
+    def asignar_foto(self, socio_id, foto_hash):
+        """Asocia una foto (su hash en PhotoStore) a un socio; None la quita."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("UPDATE socios SET foto=? WHERE id=?", (foto_hash, socio_id))
+        conn.commit()
+        conn.close()
+
+    def obtener_fotos(self, socio_ids):
+        """Devuelve {socio_id: hash de la foto} de los socios recibidos que tienen foto."""
+        if not socio_ids:
+            return {}
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        termino = f"%{termino}%"
         c.execute("""
+            SELECT id, foto FROM socios
+            WHERE id IN (SELECT value FROM json_each(?)) AND foto IS NOT NULL
+        """, (json.dumps(list(socio_ids)),))
+        fotos = dict(c.fetchall())
+        conn.close()
+        return fotos
+
+    def buscar(self, termino, limite=None):
+        """Busca socios por nombre, apellido o teléfono."""
+        conn = sqlite3.connect(self.db_path)
+        socios = self.buscar_en(conn, termino, limite)
+        conn.close()
+        return socios
+
+    def buscar_en(self, conn, termino, limite=None):
+        """
+        Busca socios usando la conexión recibida, de los más nuevos a los más viejos.
+        Cada palabra del término tiene que aparecer en el nombre, el apellido o el
+        teléfono ("juan perez" encuentra a Juan Pérez). Un término que es un
+        teléfono se compara contra el número normalizado, así "11 4444-5555"
+        encuentra "+5491144445555"; si así no aparece nadie (fijos, números del
+        exterior sin "+"), se busca por sus dígitos en el teléfono tal como se
+        cargó. Sin término devuelve los últimos socios.
+        Se puede cancelar desde otro hilo con conn.interrupt(). Solo lee: los
+        índices se ponen al día en sincronizar_indices.
+        """
+        if parece_telefono(termino):
+            normalizado = normalizar_telefono(termino)
+            if normalizado:
+                # Número completo: búsqueda exacta por el índice
+                socios = self._consultar_socios(conn, " AND s.telefono_norm = ?", [normalizado], limite)
+                if socios:
+                    return socios
+            # Parte de un número, o uno que no se normaliza ("4444-5555" de un fijo)
+            digitos = f"%{''.join(ch for ch in termino if ch.isdigit())}%"
+            return self._consultar_socios(
+                conn,
+                f" AND (s.telefono_norm LIKE ? OR s.telefono LIKE ? OR {DIGITOS_TELEFONO_SQL} LIKE ?)",
+                [digitos, f"%{termino.strip()}%", digitos],
+                limite
+            )
+
+        condiciones = ""
+        params = []
+        for palabra in termino.split():
+            condiciones += " AND (s.nombre LIKE ? OR s.apellido LIKE ? OR s.telefono LIKE ?)"
+            params.extend([f"%{palabra}%"] * 3)
+        return self._consultar_socios(conn, condiciones, params, limite)
+
+    def _consultar_socios(self, conn, condiciones, params, limite=None):
+        """Socios que cumplen las condiciones (cada una empieza con AND), de los más nuevos a los más viejos."""
+        c = conn.cursor()
+        # Con límite, SQLite corta el recorrido apenas junta los resultados
+        c.execute(f"""
             SELECT s.id, s.nombre, s.apellido, s.telefono, s.fecha_inscripcion,
                    p.nombre AS plan
             FROM socios s
             LEFT JOIN planes p ON s.plan_id = p.id
-            WHERE s.nombre LIKE ? OR s.apellido LIKE ? OR s.telefono LIKE ?
-            ORDER BY s.id DESC
-        """, (termino, termino, termino))
-        socios = c.fetchall()
+            WHERE 1=1{condiciones}
+            ORDER BY s.id DESC LIMIT ?
+        """, [*params, limite if limite else -1])
+        return c.fetchall()
+
+    def _sincronizar_trigramas_en(self, conn):
+        """
+        Reindexa el nombre recién escrito en la misma transacción. Mientras el
+        índice se arma por primera vez no se toca: lo completa la tarea programada.
+        """
+        if self.indice_trigramas.listo.is_set():
+            self.indice_trigramas.sincronizar(conn)
+
+    def sincronizar_indices(self):
+        """
+        Arma el índice de trigramas la primera vez (de a lotes) y completa los
+        nombres y teléfonos pendientes (los que cambió otro código). Corre en
+        el hilo de tareas, nunca durante una búsqueda.
+        """
+        nombres = self.indice_trigramas.armar()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            telefonos = self.indice_telefonos.sincronizar(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return f"{nombres} nombres indexados, {telefonos} teléfonos normalizados"
+
+    def buscar_similares(self, termino, limite=10):
+        """Busca socios con nombre parecido al término (tolera errores de tipeo)."""
+        conn = sqlite3.connect(self.db_path)
+        socios = self.buscar_similares_en(conn, termino, limite)
         conn.close()
-        return socios
\ No newline at end of file
+        return socios
+
+    def buscar_similares_en(self, conn, termino, limite=10):
+        """
+        Igual que buscar_en, pero por similitud de trigramas y ordenado del más
+        parecido al menos. Cada fila agrega la similitud (0 a 1) al final.
+        Hasta que el índice termina de armarse no encuentra nada: solo queda
+        la búsqueda por LIKE de buscar_en.
+        """
+        candidatos = self.indice_trigramas.buscar_en(conn, termino, limite)
+        if not candidatos:
+            return []
+
+        c = conn.cursor()
+        c.execute("""
+            SELECT s.id, s.nombre, s.apellido, s.telefono, s.fecha_inscripcion,
+                   p.nombre AS plan, json_extract(j.value, '$[1]') AS similitud
+            FROM json_each(?) j
+            JOIN socios s ON s.id = json_extract(j.value, '$[0]')
+            LEFT JOIN planes p ON s.plan_id = p.id
+            ORDER BY j.key
+        """, (json.dumps(candidatos),))
+        return c.fetchall()
@@ -134,12 +134,34 @@ class PaymentsController:
             print(f"Error al eliminar pago: {e}")
             raise
 
+    def obtener_auditoria(self, pago_id=None, socio_id=None, fecha_desde=None, fecha_hasta=None, limite=500):
+        """
+        Obtiene las ediciones y eliminaciones de pagos registradas.
+        
+        Args:
+            pago_id (int, optional): Filtrar por pago
+            socio_id (int, optional): Filtrar por socio (antes o después del cambio)
+            fecha_desde (str, optional): Fecha de inicio (YYYY-MM-DD)
+            fecha_hasta (str, optional): Fecha de fin (YYYY-MM-DD)
+            limite (int, optional): Máximo de registros
+        
+        Returns:
+            list: Registros de auditoría con los valores de antes y después
+        """
+        try:
+            return self.payments_model.obtener_auditoria(
+                pago_id, socio_id, fecha_desde, fecha_hasta, limite
+            )
+        except Exception as e:
+            print(f"Error al obtener auditoría de pagos: {e}")
+            return []
+
     def buscar_pagos(self, socio_id=None, fecha_desde=None, fecha_hasta=None, mes=None, anio=None):
         """
         Busca pagos aplicando filtros específicos.
         
         Args:
-            socio_id (int, optional): Filtrar por socio
+            socio_id (int, optional): Filtrar por socio (antes o después del cambio)
             fecha_desde (str, optional): Fecha de inicio (YYYY-MM-DD)
             fecha_hasta (str, optional): Fecha de fin (YYYY-MM-DD)
             mes (str, optional): Mes a filtrar (MM)
@@ -182,6 +204,36 @@ class PaymentsController:
                 'socios_pagaron': 0
             }
 
+    def obtener_estadisticas_mes_actual(self):
+        """
+        Obtiene las estadísticas del mes actual desde los contadores incrementales.
+        
+        Returns:
+            dict: Diccionario con estadísticas (total_pagos, total_ingresos, etc.)
+        """
+        try:
+            return self.payments_model.obtener_resumen_mes()
+        except Exception as e:
+            print(f"Error al obtener resumen del mes: {e}")
+            return {
+                'total_pagos': 0,
+                'total_ingresos': 0,
+                'promedio_pago': 0,
+                'socios_pagaron': 0
+            }
+
+    def recalcular_resumen_mes(self, mes=None):
+        """
+        Corrige los contadores incrementales recalculándolos desde la tabla de pagos.
+        
+        Args:
+            mes (str, optional): Mes a corregir (YYYY-MM). Si no se indica, se recalculan todos.
+        """
+        try:
+            self.payments_model.recalcular_resumen_mes(mes)
+        except Exception as e:
+            print(f"Error al recalcular resumen: {e}")
+
     def obtener_pagos_por_metodo(self, fecha_desde=None, fecha_hasta=None):
         """
         Obtiene el total de pagos agrupados por método de pago.
@@ -29,3 +29,15 @@ class PlansController:
         if not nombre or precio <= 0 or duracion <= 0:
             raise ValueError("Los campos no pueden estar vacíos ni tener valores negativos.")
         self.model.actualizar_plan(plan_id, nombre, precio, duracion)
+
+    def obtener_historial_precios(self, plan_id):
+        """Devuelve los precios que tuvo un plan, del más reciente al más antiguo."""
+        return self.model.obtener_historial_precios(plan_id)
+
+    def precios_vigentes(self, pares):
+        """Devuelve el precio vigente para cada par (plan_id, fecha)."""
+        try:
+            return self.model.precios_vigentes(pares)
+        except Exception as e:
+            print(f"Error al obtener precios vigentes: {e}")
+            return [None] * len(pares)
@@ -0,0 +1,145 @@
+"""
+db_writer.py
+Hilo escritor único para la base de datos SQLite.
+Recibe operaciones de escritura por una cola, las agrupa en una sola
+transacción (group commit) y devuelve los resultados a las vistas con señales Qt.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+
+class DatabaseWriter(QObject):
+    """Dueño de la conexión de escritura; ejecuta los comandos fuera del hilo de la GUI."""
+
+    # id de la operación, resultado / mensaje de error
+    completado = Signal(int, object)
+    fallido = Signal(int, str)
+
+    def __init__(self, db_path, ventana_ms=25, max_lote=200):
+        super().__init__()
+        self.db_path = db_path
+        self.ventana = ventana_ms / 1000.0
+        self.max_lote = max_lote
+
+        self._cola = queue.Queue()
+        self._callbacks = {}
+        self._siguiente_id = 0
+        self._lock = threading.Lock()
+
+        # Los callbacks se ejecutan en el hilo de la GUI (conexión encolada)
+        self.completado.connect(self._despachar_completado)
+        self.fallido.connect(self._despachar_fallido)
+
+        self._hilo = threading.Thread(target=self._bucle, name="DatabaseWriter", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, operacion, *args, al_completar=None, al_fallar=None):
+        """
+        Encola una operación de escritura.
+
+        Args:
+            operacion (callable): Función ``operacion(conn, *args)`` que escribe
+                usando la conexión recibida. No debe hacer commit.
+            al_completar (callable, optional): Recibe el resultado de la operación.
+            al_fallar (callable, optional): Recibe el mensaje de error.
+
+        Returns:
+            int: ID de la operación encolada
+        """
+        with self._lock:
+            self._siguiente_id += 1
+            op_id = self._siguiente_id
+            self._callbacks[op_id] = (al_completar, al_fallar)
+        self._cola.put((op_id, operacion, args))
+        return op_id
+
+    def detener(self, timeout=5):
+        """Procesa lo pendiente y detiene el hilo escritor."""
+        if self._hilo.is_alive():
+            self._cola.put(None)
+            self._hilo.join(timeout)
+
+    # === HILO ESCRITOR ===
+
+    def _bucle(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                primero = self._cola.get()
+                if primero is None:
+                    break
+
+                lote, detener = self._juntar_lote(primero)
+                self._ejecutar_lote(conn, lote)
+                if detener:
+                    break
+        finally:
+            conn.close()
+
+    def _juntar_lote(self, primero):
+        """Junta las operaciones que llegan dentro de la ventana de agrupamiento."""
+        lote = [primero]
+        limite = time.monotonic() + self.ventana
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                item = self._cola.get(timeout=restante)
+            except queue.Empty:
+                break
+            if item is None:
+                return lote, True
+            lote.append(item)
+        return lote, False
+
+    def _ejecutar_lote(self, conn, lote):
+        """Ejecuta el lote en una transacción; cada operación tiene su savepoint."""
+        resultados = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op_id, operacion, args in lote:
+                conn.execute("SAVEPOINT op")
+                try:
+                    resultado = operacion(conn, *args)
+                    conn.execute("RELEASE op")
+                    resultados.append((op_id, True, resultado))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    resultados.append((op_id, False, str(e)))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Error en el commit del lote de escritura: {e}")
+            resultados = [(op_id, False, str(e)) for op_id, _, _ in lote]
+
+        for op_id, ok, valor in resultados:
+            if ok:
+                self.completado.emit(op_id, valor)
+            else:
+                self.fallido.emit(op_id, valor)
+
+    # === DESPACHO EN EL HILO DE LA GUI ===
+
+    def _despachar_completado(self, op_id, resultado):
+        with self._lock:
+            al_completar, _ = self._callbacks.pop(op_id, (None, None))
+        if al_completar:
+            al_completar(resultado)
+
+    def _despachar_fallido(self, op_id, mensaje):
+        with self._lock:
+            _, al_fallar = self._callbacks.pop(op_id, (None, None))
+        if al_fallar:
+            al_fallar(mensaje)
+        else:
+            print(f"Error en escritura #{op_id}: {mensaje}")
@@ -3,16 +3,23 @@ from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
     QMessageBox, QLabel, QFrame, QHBoxLayout
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from connection import DatabaseConnection
+from db_writer import DatabaseWriter
+from scheduler import JobScheduler
 from theme_manager import ThemeManager
 import json
+import multiprocessing
 import os
 
 # Importación directa sin carpetas - todos los archivos en el mismo directorio
 from controllers.members_controller import MembersController
 from controllers.plans_controller import PlansController
 from controllers.payments_controller import PaymentsController
+from models.attendance_model import AttendanceModel
+from models.notifications_model import NotificationsModel
+from models.retention_model import RetentionModel
+from models.photo_store import PhotoStore
 from email_service import EmailService
 from whatsapp import VentanaWhatsApp
 from estado_pagos import VentanaEstadoPagos
@@ -25,11 +32,20 @@ class MainWindow(QMainWindow):
         # Crear conexión a la base de datos
         self.db_connection = DatabaseConnection("gimnasio.db")
 
+        # Hilo escritor: las escrituras de las vistas no bloquean la GUI
+        self.db_writer = DatabaseWriter(self.db_connection.db_name)
+
         # Crear controladores
         self.members_controller = MembersController(self.db_connection.db_name)
         self.plans_controller = PlansController(self.db_connection.db_name)
         self.payments_controller = PaymentsController(self.db_connection.db_name)
 
+        # Control de ingresos (se comparte para no recargar el caché de vencimientos)
+        self.attendance_model = AttendanceModel(self.db_connection.db_name)
+
+        # Fotos de los socios (un solo caché de imágenes para todas las ventanas)
+        self.photo_store = PhotoStore()
+
         # Gestor de temas
         self.theme_manager = ThemeManager()
 
@@ -37,6 +53,10 @@ class MainWindow(QMainWindow):
         self.email_service = EmailService()
         self.cargar_config_email()
 
+        # Tareas programadas (avisos de vencimiento, depuración, recordatorios) en segundo plano
+        self.scheduler = JobScheduler(self.db_connection.db_name)
+        self.iniciar_tareas()
+
         # Configuración ventana principal
         self.setWindowTitle("Sistema de Gestión de Gimnasio")
         self.setMinimumSize(1000, 700)
@@ -72,6 +92,7 @@ class MainWindow(QMainWindow):
 
         # Botones del menú
         self.btnSocios = QPushButton("👥 Socios")
+        self.btnAsistencia = QPushButton("✅ Ingresos")
         self.btnPlanes = QPushButton("📅 Planes")
         self.btnPagos = QPushButton("💰 Pagos")
         self.btnEstado = QPushButton("📊 Estado de Pagos")
@@ -101,7 +122,7 @@ class MainWindow(QMainWindow):
         """
 
         for btn in [
-            self.btnSocios, self.btnPlanes, self.btnPagos, self.btnEstado, self.btnNotificaciones,
+            self.btnSocios, self.btnAsistencia, self.btnPlanes, self.btnPagos, self.btnEstado, self.btnNotificaciones,
             self.btnReportes, self.btnWhatsapp, self.btnEmails, self.btnTema, self.btnSalir
         ]:
             btn.setStyleSheet(menu_style)
@@ -136,6 +157,12 @@ class MainWindow(QMainWindow):
         # Conectar botones
         self.setup_connections()
 
+        # Cantidad de notificaciones pendientes en el botón del menú (lee los contadores)
+        self.actualizar_badge()
+        self.timer_badge = QTimer(self)
+        self.timer_badge.timeout.connect(self.actualizar_badge)
+        self.timer_badge.start(30000)
+
     def cargar_config_email(self):
         """Carga la configuración de email desde el archivo JSON."""
         config_file = "email_config.json"
@@ -151,9 +178,63 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print(f"No se pudo cargar config de email: {e}")
 
+    def iniciar_tareas(self):
+        """Registra las tareas programadas y arranca su hilo."""
+        modelo = NotificationsModel(self.db_connection.db_name)
+        self.notifications_model = modelo
+        self.scheduler.registrar("verificar_pagos_vencidos", modelo.verificar_pagos_vencidos, hora="07:00")
+        self.scheduler.registrar("depurar_historial", RetentionModel(self.db_connection.db_name).depurar, hora="03:00")
+        self.scheduler.registrar("enviar_recordatorios", lambda: self.enviar_recordatorios(modelo), hora="10:00")
+        self.scheduler.registrar("verificar_contadores", modelo.verificar_contadores, hora="04:00")
+        self.scheduler.registrar("sincronizar_indices", self.members_controller.sincronizar_indices, cada_minutos=10)
+        if not self.members_controller.indice_trigramas.listo.is_set():
+            # El índice de búsqueda por similitud se arma en segundo plano, no al abrir
+            self.scheduler.ejecutar_ahora("sincronizar_indices")
+        self.scheduler.ejecutado.connect(self.tarea_ejecutada)
+        self.scheduler.fallido.connect(lambda nombre, msg: print(f"Error en la tarea {nombre}: {msg}"))
+        self.scheduler.iniciar()
+
+    def enviar_recordatorios(self, modelo):
+        """Envía por email los recordatorios de pago vencido pendientes (corre en el hilo de tareas)."""
+        if not self.email_service.configurado:
+            return "Email no configurado"
+
+        enviados = []
+        try:
+            for notif_id, email, socio, dias_vencido, ultimo_pago in modelo.obtener_recordatorios_pendientes():
+                exito, mensaje = self.email_service.enviar_recordatorio_pago(email, socio, dias_vencido, ultimo_pago)
+                if exito:
+                    enviados.append(notif_id)
+                else:
+                    print(f"Error al enviar el recordatorio a {email}: {mensaje}")
+        finally:
+            # Se registran aunque se corte a mitad, para no repetirlos
+            if enviados:
+                modelo.marcar_recordatorios_enviados(enviados)
+        return len(enviados)
+
+    def tarea_ejecutada(self, nombre, resultado):
+        """Refresca la ventana de notificaciones si una tarea las modificó."""
+        if nombre in ("enviar_recordatorios", "sincronizar_indices"):
+            return
+        self.actualizar_badge()
+        ventana = getattr(self, 'notifications_window', None)
+        if ventana is not None and ventana.isVisible():
+            ventana.cargar_notificaciones()
+
+    def actualizar_badge(self):
+        """Muestra las notificaciones pendientes en el botón del menú."""
+        try:
+            pendientes = self.notifications_model.obtener_estadisticas()['pendientes']
+        except Exception as e:
+            print(f"Error al contar notificaciones: {e}")
+            return
+        self.btnNotificaciones.setText(f"🔔 Notificaciones ({pendientes})" if pendientes else "🔔 Notificaciones")
+
     def setup_connections(self):
         """Conecta los botones del menú con sus acciones."""
         self.btnSocios.clicked.connect(self.abrir_socios)
+        self.btnAsistencia.clicked.connect(self.abrir_asistencia)
         self.btnPlanes.clicked.connect(self.abrir_planes)
         self.btnPagos.clicked.connect(self.abrir_pagos)
         self.btnEstado.clicked.connect(self.abrir_estado_pagos)
@@ -169,7 +250,7 @@ class MainWindow(QMainWindow):
     def abrir_socios(self):
         try:
             from views.members import MembersView
-            self.members_window = MembersView(self.members_controller)
+            self.members_window = MembersView(self.members_controller, self.db_writer, self.photo_store)
             self.members_window.setWindowTitle("Gestión de Socios")
             self.members_window.resize(1000, 700)
             if hasattr(self, 'email_service'):
@@ -179,6 +260,19 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo abrir Socios:\n{e}")
 
+    def abrir_asistencia(self):
+        try:
+            from views.attendance import AttendanceView
+            self.attendance_window = AttendanceView(
+                self.attendance_model, self.members_controller, self.db_writer, self.photo_store
+            )
+            self.attendance_window.setWindowTitle("Control de Ingresos")
+            self.attendance_window.resize(700, 700)
+            self.attendance_window.setStyleSheet(self.theme_manager.get_theme())
+            self.attendance_window.show()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo abrir Ingresos:\n{e}")
+
     def abrir_planes(self):
         try:
             from views.plans import PlansView
@@ -193,7 +287,9 @@ class MainWindow(QMainWindow):
     def abrir_pagos(self):
         try:
             from views.payments_complete_view import PaymentsCompleteView
-            self.payments_window = PaymentsCompleteView(self.payments_controller, self.email_service)
+            self.payments_window = PaymentsCompleteView(
+                self.payments_controller, self.email_service, self.db_writer
+            )
             self.payments_window.setWindowTitle("Gestión de Pagos")
             self.payments_window.resize(1400, 900)
             self.payments_window.setStyleSheet(self.theme_manager.get_theme())
@@ -207,7 +303,7 @@ class MainWindow(QMainWindow):
             from models.notifications_model import NotificationsModel
 
             notifications_model = NotificationsModel(self.db_connection.db_name)
-            self.notifications_window = NotificationsView(notifications_model)
+            self.notifications_window = NotificationsView(notifications_model, self.db_writer)
             self.notifications_window.setWindowTitle("Centro de Notificaciones")
             self.notifications_window.resize(1000, 700)
             if hasattr(self, 'email_service'):
@@ -266,6 +362,8 @@ class MainWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         if reply == QMessageBox.Yes:
+            self.scheduler.detener()
+            self.db_writer.detener()
             self.db_connection.close()
             self.close()
 
@@ -274,6 +372,8 @@ class MainWindow(QMainWindow):
             self.confirm_exit()
 
     def closeEvent(self, event):
+        self.scheduler.detener()
+        self.db_writer.detener()
         self.db_connection.close()
         event.accept()
 
@@ -294,4 +394,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necesario para los procesos de recibos en el ejecutable de Windows
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
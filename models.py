@@ -1,6 +1,7 @@
 """
 models.py
-Contiene las clases modelo para representar entidades del gimnasio: Socio, Pago y Alerta.
+Contiene las clases modelo para representar entidades del gimnasio: Socio y Pago.
+Las alertas ahora son notificaciones (ver models/notifications_model.py).
 Cada clase incluye métodos básicos CRUD (crear, leer, actualizar, eliminar) conectados a la base de datos.
 """
 from datetime import datetime
@@ -50,24 +51,3 @@ class Pago:
     def obtener_pagos_por_socio(self, socio_id):
         return self.db.fetchall("SELECT * FROM pagos WHERE socio_id=? ORDER BY fecha_pago DESC", (socio_id,))
 
-
-class Alerta:
-    def __init__(self, db_connection):
-        self.db = db_connection
-
-    def crear_alerta(self, socio_id, mensaje):
-        fecha_creacion = datetime.now().strftime('%Y-%m-%d')
-        query = '''INSERT INTO alertas (socio_id, mensaje, fecha_creacion, leida)
-                   VALUES (?, ?, ?, 0)'''
-        self.db.execute(query, (socio_id, mensaje, fecha_creacion))
-
-    def obtener_no_leidas(self):
-        return self.db.fetchall('''
-            SELECT a.id, s.nombre || ' ' || s.apellido AS socio, a.mensaje, a.fecha_creacion
-            FROM alertas a JOIN socios s ON a.socio_id = s.id
-            WHERE a.leida = 0
-            ORDER BY a.fecha_creacion DESC
-        ''')
-
-    def marcar_como_leida(self, alerta_id):
-        self.db.execute("UPDATE alertas SET leida = 1 WHERE id=?", (alerta_id,))
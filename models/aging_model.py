@@ -0,0 +1,161 @@
+"""
+models/aging_model.py
+Antigüedad de deuda: socios vencidos agrupados en tramos de 0-30, 31-60,
+61-90 y más de 90 días, con el monto adeudado. Cada consulta clasifica a
+todos los socios de una sola pasada; participaciones, posiciones y
+acumulados salen de funciones de ventana.
+"""
+
+import sqlite3
+
+from models.alert_rules import AlertRulesModel, ESTADOS_PAGO_SQL
+from models.plans_model import PlansModel
+
+
+# (índice, etiqueta) de cada tramo
+TRAMOS = [
+    (0, "0-30 días"),
+    (1, "31-60 días"),
+    (2, "61-90 días"),
+    (3, "Más de 90 días"),
+]
+
+# Un socio vence el día que termina el período de su último pago (o el día de
+# inscripción si nunca pagó) y entra en mora cuando se le acaban los días de
+# gracia de su regla (ver models/alert_rules.py). Cada período completo
+# transcurrido desde el vencimiento suma una cuota más al monto adeudado, al
+# precio que tenía el plan el día que empezó ese período (planes_precios; antes
+# del primer precio registrado vale ese primero, como en precios_vigentes).
+# Los períodos no se generan de a uno: por cada tramo de vigencia de un precio
+# se cuenta cuántos empiezan dentro de él (k tal que desde <= inicio + k *
+# duración < hasta, con días julianos enteros).
+DEUDORES_CTE = f"""
+    WITH {ESTADOS_PAGO_SQL},
+    vencidos AS MATERIALIZED (
+        SELECT
+            e.socio_id AS id,
+            e.dias_vencido,
+            CASE WHEN e.dias_vencido <= 30 THEN 0
+                 WHEN e.dias_vencido <= 60 THEN 1
+                 WHEN e.dias_vencido <= 90 THEN 2
+                 ELSE 3 END AS tramo,
+            s.plan_id,
+            pl.precio,
+            e.duracion,
+            CAST(julianday(COALESCE(e.vence, date(s.fecha_inscripcion))) AS INTEGER) AS inicio,
+            e.dias_vencido / e.duracion + 1 AS cuotas
+        FROM estados e
+        JOIN socios s ON s.id = e.socio_id
+        LEFT JOIN planes pl ON pl.id = s.plan_id
+        WHERE COALESCE(s.activo, 1) = 1
+        AND e.dias_vencido > e.gracia
+    ),
+    -- Tramos de vigencia de cada precio (desde NULL: el primero; hasta NULL: el actual)
+    vigencias AS (
+        SELECT plan_id, precio,
+               CASE WHEN ROW_NUMBER() OVER v > 1
+                    THEN CAST(julianday(vigente_desde) AS INTEGER) END AS desde,
+               CAST(julianday(LEAD(vigente_desde) OVER v) AS INTEGER) AS hasta
+        FROM planes_precios
+        WINDOW v AS (PARTITION BY plan_id ORDER BY vigente_desde)
+    ),
+    -- Primer período que empieza en o después de cada borde: ceil((borde - inicio) / duración)
+    montos AS (
+        SELECT v.id,
+               SUM(g.precio * (
+                   min(v.cuotas, CASE WHEN g.hasta IS NULL THEN v.cuotas
+                                      ELSE max(0, (g.hasta - v.inicio + v.duracion - 1) / v.duracion) END)
+                   - min(v.cuotas, CASE WHEN g.desde IS NULL THEN 0
+                                        ELSE max(0, (g.desde - v.inicio + v.duracion - 1) / v.duracion) END)
+               )) AS monto
+        FROM vencidos v
+        JOIN vigencias g ON g.plan_id = v.plan_id
+        GROUP BY v.id
+    ),
+    deudores AS (
+        -- Un plan sin historial (o un socio sin plan) se valúa al precio actual, o 0
+        SELECT v.id, v.dias_vencido, v.tramo,
+               COALESCE(m.monto, v.cuotas * COALESCE(v.precio, 0)) AS monto
+        FROM vencidos v
+        LEFT JOIN montos m ON m.id = v.id
+    )
+"""
+
+
+class AgingModel:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Las reglas de gracia por plan (ESTADOS_PAGO_SQL las necesita)
+        self.reglas = AlertRulesModel(db_path)
+        # El historial de precios con el que se valúa cada período adeudado
+        self.planes = PlansModel(db_path)
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def obtener_tramos(self):
+        """
+        Resumen por tramo de todos los socios activos vencidos.
+
+        Returns:
+            list: Tuplas (tramo, etiqueta, cantidad, monto, porcentaje del monto total),
+                  una por tramo aunque esté vacío
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(DEUDORES_CTE + """
+            SELECT tramo, COUNT(*), SUM(monto),
+                   COALESCE(SUM(monto) / NULLIF(SUM(SUM(monto)) OVER (), 0), 0)
+            FROM deudores
+            GROUP BY tramo
+        """, {'dias_aviso': None})
+        por_tramo = {fila[0]: fila[1:] for fila in c.fetchall()}
+        conn.close()
+
+        return [
+            (tramo, etiqueta) + por_tramo.get(tramo, (0, 0.0, 0.0))
+            for tramo, etiqueta in TRAMOS
+        ]
+
+    def obtener_detalle(self, tramo=None, limite=None, desde=0):
+        """
+        Socios vencidos de un tramo (o de todos), del más atrasado al menos atrasado.
+
+        Args:
+            tramo (int, optional): Índice del tramo (ver TRAMOS); None para todos
+            limite (int, optional): Máximo de socios a devolver
+            desde (int): Cantidad de socios a saltear (para paginar)
+
+        Returns:
+            list: Tuplas (posición, socio_id, socio, teléfono, plan, último pago,
+                  días vencido, tramo, monto adeudado, monto acumulado)
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(DEUDORES_CTE + """
+            , ranking AS (
+                SELECT id, dias_vencido, tramo, monto,
+                       ROW_NUMBER() OVER orden AS posicion,
+                       SUM(monto) OVER orden AS acumulado
+                FROM deudores
+                WHERE :tramo IS NULL OR tramo = :tramo
+                WINDOW orden AS (ORDER BY dias_vencido DESC, id
+                                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+            )
+            SELECT r.posicion, s.id, s.nombre || ' ' || s.apellido, s.telefono,
+                   COALESCE(pl.nombre, 'Sin plan'),
+                   (SELECT MAX(p.fecha_pago) FROM pagos p WHERE p.socio_id = s.id),
+                   r.dias_vencido, r.tramo, r.monto, r.acumulado
+            FROM ranking r
+            JOIN socios s ON s.id = r.id
+            LEFT JOIN planes pl ON pl.id = s.plan_id
+            WHERE r.posicion > :desde AND (:limite IS NULL OR r.posicion <= :desde + :limite)
+            ORDER BY r.posicion
+        """, {'dias_aviso': None, 'tramo': tramo, 'desde': desde, 'limite': limite})
+        data = c.fetchall()
+        conn.close()
+        return data
+
+    def obtener_mas_atrasados(self, limite=10):
+        """Devuelve los socios con más días de atraso (para el tablero)."""
+        return self.obtener_detalle(limite=limite)
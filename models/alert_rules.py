@@ -0,0 +1,223 @@
+"""
+models/alert_rules.py
+Reglas de aviso de vencimiento por plan: días de gracia después del
+vencimiento, días de anticipación del aviso y prioridad de cada tipo de aviso.
+La regla del plan 0 vale para los planes sin regla propia.
+ESTADOS_PAGO_SQL evalúa las reglas de todos los socios en una sola consulta;
+la usan la verificación de notificaciones, el tablero, la antigüedad de
+deuda, el control de ingresos y los recordatorios de WhatsApp, así todos
+avisan con el mismo criterio.
+"""
+
+import sqlite3
+
+
+# Plan cuya regla se aplica a los planes sin regla propia
+PLAN_POR_DEFECTO = 0
+
+# Regla inicial: la misma que estaba fija en el código
+REGLA_POR_DEFECTO = {
+    'dias_gracia': 0,
+    'dias_aviso': 5,
+    'prioridad_vencido': 'alta',
+    'prioridad_aviso': 'media',
+    'prioridad_sin_pagos': 'alta',
+}
+
+PRIORIDADES = ('alta', 'media', 'normal')
+
+# Estado de pago de cada socio según su regla. Parámetro con nombre :dias_aviso
+# (None = el de la regla), para las vistas que eligen su propia anticipación.
+# Columnas de estados: socio_id, ultimo_pago, duracion, gracia, aviso,
+# dias_transcurridos, dias_restantes (negativo si ya venció), vence, periodo
+# (vencimiento, o '-' sin pagos: es el período de la clave de notificaciones),
+# limite (último día habilitado: vencimiento, o inscripción si nunca pagó, más
+# la gracia), dias_vencido (días desde el vencimiento o la inscripción; el socio
+# está en mora cuando supera la gracia), estado ('sin_pagos', 'pago_vencido',
+# 'proximo_vencimiento' o NULL) y prioridad.
+# Es el único lugar donde se calcula el vencimiento: la antigüedad de deuda, el
+# control de ingresos y el tablero también lo leen de acá.
+_ESTADOS_PAGO = """
+    ultimos AS MATERIALIZED (
+        SELECT s.id AS socio_id,
+               s.fecha_inscripcion,
+               (SELECT MAX(p.fecha_pago) FROM pagos p WHERE p.socio_id = s.id) AS ultimo_pago,
+               COALESCE(NULLIF(pl.duracion_dias, 0), 30) AS duracion,  -- Por defecto 30 días
+               COALESCE(r.dias_gracia, d.dias_gracia, 0) AS gracia,
+               COALESCE(:dias_aviso, r.dias_aviso, d.dias_aviso, 5) AS aviso,
+               COALESCE(r.prioridad_vencido, d.prioridad_vencido, 'alta') AS prioridad_vencido,
+               COALESCE(r.prioridad_aviso, d.prioridad_aviso, 'media') AS prioridad_aviso,
+               COALESCE(r.prioridad_sin_pagos, d.prioridad_sin_pagos, 'alta') AS prioridad_sin_pagos
+        FROM socios s
+        LEFT JOIN planes pl ON s.plan_id = pl.id
+        LEFT JOIN reglas_alertas r ON r.plan_id = s.plan_id AND r.plan_id <> 0
+        LEFT JOIN reglas_alertas d ON d.plan_id = 0
+        {filtro}
+    ),
+    transcurridos AS (
+        SELECT *,
+               CAST(julianday('now', 'localtime', 'start of day')
+                    - julianday(date(ultimo_pago)) AS INTEGER) AS dias_transcurridos,
+               date(ultimo_pago, '+' || duracion || ' days') AS vence
+        FROM ultimos
+    ),
+    estados AS (
+        SELECT socio_id, ultimo_pago, duracion, gracia, aviso, dias_transcurridos,
+               duracion - dias_transcurridos AS dias_restantes,
+               vence,
+               COALESCE(vence, '-') AS periodo,
+               date(COALESCE(vence, date(fecha_inscripcion)), '+' || gracia || ' days') AS limite,
+               CAST(julianday('now', 'localtime', 'start of day')
+                    - julianday(COALESCE(vence, date(fecha_inscripcion))) AS INTEGER) AS dias_vencido,
+               CASE WHEN ultimo_pago IS NULL THEN 'sin_pagos'
+                    WHEN dias_transcurridos > duracion + gracia THEN 'pago_vencido'
+                    WHEN dias_transcurridos >= duracion - aviso THEN 'proximo_vencimiento'
+               END AS estado,
+               CASE WHEN ultimo_pago IS NULL THEN prioridad_sin_pagos
+                    WHEN dias_transcurridos > duracion + gracia THEN prioridad_vencido
+                    ELSE prioridad_aviso
+               END AS prioridad
+        FROM transcurridos
+    )
+"""
+
+ESTADOS_PAGO_SQL = _ESTADOS_PAGO.format(filtro="")
+
+# Lo mismo para un solo socio (parámetro :socio_id), sin recorrer a todos
+ESTADOS_PAGO_SOCIO_SQL = _ESTADOS_PAGO.format(filtro="WHERE s.id = :socio_id")
+
+
+class AlertRulesModel:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.crear_tabla()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_tabla(self):
+        """Crea la tabla de reglas con la regla por defecto si no existe."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS reglas_alertas (
+                plan_id INTEGER PRIMARY KEY,
+                dias_gracia INTEGER NOT NULL DEFAULT 0,
+                dias_aviso INTEGER NOT NULL DEFAULT 5,
+                prioridad_vencido TEXT NOT NULL DEFAULT 'alta',
+                prioridad_aviso TEXT NOT NULL DEFAULT 'media',
+                prioridad_sin_pagos TEXT NOT NULL DEFAULT 'alta'
+            )
+        """)
+        c.execute("""
+            INSERT INTO reglas_alertas (plan_id, dias_gracia, dias_aviso,
+                                        prioridad_vencido, prioridad_aviso, prioridad_sin_pagos)
+            VALUES (:plan_id, :dias_gracia, :dias_aviso,
+                    :prioridad_vencido, :prioridad_aviso, :prioridad_sin_pagos)
+            ON CONFLICT(plan_id) DO NOTHING
+        """, {'plan_id': PLAN_POR_DEFECTO, **REGLA_POR_DEFECTO})
+        conn.commit()
+        conn.close()
+
+    def obtener_reglas(self):
+        """
+        Devuelve las reglas guardadas, con el nombre del plan.
+
+        Returns:
+            list: Tuplas (plan_id, plan, dias_gracia, dias_aviso, prioridad_vencido,
+                  prioridad_aviso, prioridad_sin_pagos); plan es None en la regla por defecto
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT r.plan_id, pl.nombre, r.dias_gracia, r.dias_aviso,
+                   r.prioridad_vencido, r.prioridad_aviso, r.prioridad_sin_pagos
+            FROM reglas_alertas r
+            LEFT JOIN planes pl ON pl.id = r.plan_id
+            ORDER BY r.plan_id
+        """)
+        reglas = c.fetchall()
+        conn.close()
+        return reglas
+
+    def guardar_regla(self, plan_id, dias_gracia, dias_aviso, prioridad_vencido='alta',
+                      prioridad_aviso='media', prioridad_sin_pagos='alta'):
+        """
+        Crea o reemplaza la regla de un plan (PLAN_POR_DEFECTO para la general).
+
+        Raises:
+            ValueError: Si los días son negativos o alguna prioridad no es válida
+        """
+        if dias_gracia < 0 or dias_aviso < 0:
+            raise ValueError("Los días de gracia y de aviso no pueden ser negativos")
+        for prioridad in (prioridad_vencido, prioridad_aviso, prioridad_sin_pagos):
+            if prioridad not in PRIORIDADES:
+                raise ValueError(f"Prioridad inválida: {prioridad}")
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO reglas_alertas (plan_id, dias_gracia, dias_aviso,
+                                        prioridad_vencido, prioridad_aviso, prioridad_sin_pagos)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(plan_id) DO UPDATE SET
+                dias_gracia = excluded.dias_gracia,
+                dias_aviso = excluded.dias_aviso,
+                prioridad_vencido = excluded.prioridad_vencido,
+                prioridad_aviso = excluded.prioridad_aviso,
+                prioridad_sin_pagos = excluded.prioridad_sin_pagos
+        """, (plan_id, dias_gracia, dias_aviso, prioridad_vencido, prioridad_aviso, prioridad_sin_pagos))
+        conn.commit()
+        conn.close()
+
+    def eliminar_regla(self, plan_id):
+        """Elimina la regla propia de un plan (pasa a usar la regla por defecto)."""
+        if plan_id == PLAN_POR_DEFECTO:
+            raise ValueError("La regla por defecto no se puede eliminar")
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("DELETE FROM reglas_alertas WHERE plan_id = ?", (plan_id,))
+        conn.commit()
+        conn.close()
+
+    def obtener_proximos(self, dias_aviso=None, solo_activos=False):
+        """
+        Socios cuya cuota vence dentro de su ventana de aviso (y todavía no venció).
+
+        Args:
+            dias_aviso (int, optional): Anticipación a usar en lugar de la de cada regla
+            solo_activos (bool): Excluir a los socios dados de baja
+
+        Returns:
+            list: Tuplas (socio_id, nombre, apellido, telefono, telefono_norm,
+                  ultimo_pago, vence, dias_restantes), las más urgentes primero
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL}
+            SELECT s.id, s.nombre, s.apellido, s.telefono, s.telefono_norm,
+                   e.ultimo_pago, e.vence, e.dias_restantes
+            FROM estados e
+            JOIN socios s ON s.id = e.socio_id
+            WHERE e.estado = 'proximo_vencimiento'
+            AND e.dias_restantes >= 0
+            AND (:solo_activos = 0 OR COALESCE(s.activo, 1) = 1)
+            ORDER BY e.dias_restantes, s.apellido, s.nombre
+        """, {'dias_aviso': dias_aviso, 'solo_activos': int(solo_activos)})
+        proximos = c.fetchall()
+        conn.close()
+        return proximos
+
+    def contar_vencidos(self):
+        """Cantidad de socios sin pagos o con la cuota vencida y la gracia agotada."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL}
+            SELECT COUNT(*) FROM estados
+            WHERE estado IN ('sin_pagos', 'pago_vencido')
+        """, {'dias_aviso': None})
+        vencidos = c.fetchone()[0]
+        conn.close()
+        return vencidos
@@ -0,0 +1,374 @@
+"""
+models/attendance_model.py
+Registro de ingresos (asistencias) en la puerta.
+Cada ingreso se valida al instante contra un caché del vencimiento de cada
+socio y se escribe en lote a través del DatabaseWriter. La tabla de
+asistencias solo recibe inserciones al final; los conteos diarios por socio
+y los de cada hora los mantienen triggers para que los reportes y el tablero
+no recorran los eventos.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.alert_rules import AlertRulesModel, ESTADOS_PAGO_SQL, ESTADOS_PAGO_SOCIO_SQL
+
+
+# Segundos que se usa el caché de vencimientos antes de recargarlo entero
+TTL_ESTADOS = 300
+
+DIAS_SEMANA = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+# Último día habilitado de cada socio: fin del período de su último pago (o el
+# día de inscripción si nunca pagó) más los días de gracia de su regla; el
+# mismo criterio que la antigüedad de deuda y los avisos (models/alert_rules.py)
+_ESTADOS_COLUMNAS = """
+    SELECT s.id, s.nombre || ' ' || s.apellido, COALESCE(s.activo, 1), e.limite
+    FROM estados e
+    JOIN socios s ON s.id = e.socio_id
+"""
+ESTADOS_SQL = f"WITH {ESTADOS_PAGO_SQL} {_ESTADOS_COLUMNAS}"
+ESTADO_SOCIO_SQL = f"WITH {ESTADOS_PAGO_SOCIO_SQL} {_ESTADOS_COLUMNAS}"
+
+
+class AttendanceModel:
+    def __init__(self, db_path, ttl_estados=TTL_ESTADOS):
+        self.db_path = db_path
+        self.ttl_estados = ttl_estados
+        self._estados = {}
+        self._estados_cargados = 0
+        self._recargando = False
+        self._lock = threading.Lock()
+        # Las reglas de gracia por plan (ESTADOS_SQL las necesita)
+        self.reglas = AlertRulesModel(db_path)
+        self.crear_tablas()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_tablas(self):
+        """Crea la tabla de asistencias, los resúmenes y los triggers que los mantienen."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'asistencias_por_hora'")
+        existia_por_hora = c.fetchone() is not None
+
+        c.executescript("""
+            -- Sin AUTOINCREMENT ni índices secundarios: cada ingreso se agrega al final del árbol
+            CREATE TABLE IF NOT EXISTS asistencias (
+                id INTEGER PRIMARY KEY,
+                socio_id INTEGER NOT NULL,
+                fecha_hora TEXT NOT NULL,
+                habilitado INTEGER NOT NULL,
+                motivo TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS asistencias_diarias (
+                fecha TEXT NOT NULL,
+                socio_id INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                primera TEXT,
+                ultima TEXT,
+                PRIMARY KEY (fecha, socio_id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_asistencias_diarias_socio
+                ON asistencias_diarias(socio_id, fecha);
+
+            -- Solo cuentan los ingresos habilitados; los rechazos quedan en asistencias
+            CREATE TRIGGER IF NOT EXISTS trg_asistencias_diarias
+            AFTER INSERT ON asistencias
+            WHEN NEW.habilitado = 1
+            BEGIN
+                INSERT INTO asistencias_diarias (fecha, socio_id, cantidad, primera, ultima)
+                VALUES (substr(NEW.fecha_hora, 1, 10), NEW.socio_id, 1, NEW.fecha_hora, NEW.fecha_hora)
+                ON CONFLICT(fecha, socio_id) DO UPDATE SET
+                    cantidad = cantidad + 1,
+                    primera = min(primera, excluded.primera),
+                    ultima = max(ultima, excluded.ultima);
+            END;
+
+            -- Un balde por día y hora: el mapa de ocupación lee a lo sumo 24 filas por día
+            CREATE TABLE IF NOT EXISTS asistencias_por_hora (
+                fecha TEXT NOT NULL,
+                hora INTEGER NOT NULL,
+                ingresos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fecha, hora)
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_asistencias_por_hora
+            AFTER INSERT ON asistencias
+            WHEN NEW.habilitado = 1
+            BEGIN
+                INSERT INTO asistencias_por_hora (fecha, hora, ingresos)
+                VALUES (substr(NEW.fecha_hora, 1, 10), CAST(substr(NEW.fecha_hora, 12, 2) AS INTEGER), 1)
+                ON CONFLICT(fecha, hora) DO UPDATE SET ingresos = ingresos + 1;
+            END;
+        """)
+
+        if not existia_por_hora:
+            # Ingresos registrados antes de que existieran los baldes
+            c.execute("""
+                INSERT INTO asistencias_por_hora (fecha, hora, ingresos)
+                SELECT substr(fecha_hora, 1, 10), CAST(substr(fecha_hora, 12, 2) AS INTEGER), COUNT(*)
+                FROM asistencias
+                WHERE habilitado = 1
+                GROUP BY 1, 2
+            """)
+        conn.commit()
+        conn.close()
+
+    # === VALIDACIÓN CONTRA EL CACHÉ ===
+
+    def cargar_estados(self):
+        """Recarga de una sola consulta el vencimiento de todos los socios."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(ESTADOS_SQL, {'dias_aviso': None})
+        estados = {fila[0]: fila[1:] for fila in c.fetchall()}
+        conn.close()
+
+        with self._lock:
+            self._estados = estados
+            self._estados_cargados = time.monotonic()
+            self._recargando = False
+
+    def _recargar_en_segundo_plano(self):
+        """Recarga el caché en otro hilo; mientras tanto se sigue usando el anterior."""
+        with self._lock:
+            if self._recargando:
+                return
+            self._recargando = True
+
+        def recargar():
+            try:
+                self.cargar_estados()
+            except Exception as e:
+                print(f"Error al recargar los vencimientos: {e}")
+                with self._lock:
+                    self._recargando = False
+
+        threading.Thread(target=recargar, daemon=True).start()
+
+    def actualizar_estado(self, socio_id):
+        """Vuelve a leer el vencimiento de un socio (por ejemplo, después de registrar un pago)."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(ESTADO_SOCIO_SQL, {'dias_aviso': None, 'socio_id': socio_id})
+        fila = c.fetchone()
+        conn.close()
+
+        with self._lock:
+            if fila:
+                self._estados[socio_id] = fila[1:]
+            else:
+                self._estados.pop(socio_id, None)
+        return fila is not None
+
+    def validar(self, socio_id, fecha=None):
+        """
+        Indica si el socio puede ingresar, usando el caché de vencimientos.
+
+        Un rechazo (o un socio que el caché todavía no tiene) se confirma
+        releyendo al socio de la base, así quien acaba de pagar entra aunque el
+        caché no lo sepa. El caché vencido se recarga sin demorar el ingreso.
+
+        Returns:
+            tuple: (habilitado, motivo, fecha de vencimiento, nombre del socio)
+        """
+        if time.monotonic() - self._estados_cargados > self.ttl_estados:
+            self._recargar_en_segundo_plano()
+
+        hoy = (fecha or datetime.now()).strftime('%Y-%m-%d')
+        estado = self._estados.get(socio_id)
+        if estado is None or not estado[1] or (estado[2] or '') < hoy:
+            self.actualizar_estado(socio_id)
+            estado = self._estados.get(socio_id)
+
+        if estado is None:
+            return False, "Socio inexistente", None, ""
+        socio, activo, vence = estado
+        if not activo:
+            return False, "Socio inactivo", vence, socio
+        if (vence or '') < hoy:
+            return False, "Cuota vencida", vence, socio
+        return True, "", vence, socio
+
+    # === REGISTRO DE INGRESOS ===
+
+    def registrar_ingreso(self, socio_id, writer=None, al_completar=None, al_fallar=None):
+        """
+        Valida al socio y registra el ingreso (también los rechazados). Un
+        socio que no existe no se registra.
+
+        Con un DatabaseWriter la inserción se encola y se agrupa con las demás
+        escrituras en una misma transacción; sin él se escribe directamente.
+
+        Returns:
+            dict: 'socio_id', 'socio', 'habilitado', 'motivo', 'vence', 'fecha_hora'
+                  y 'registrado' (False si el socio no existe)
+        """
+        ahora = datetime.now()
+        habilitado, motivo, vence, socio = self.validar(socio_id, ahora)
+        fecha_hora = ahora.strftime('%Y-%m-%d %H:%M:%S')
+        args = (socio_id, fecha_hora, habilitado, motivo or None)
+        # validar() ya releyó al socio de la base antes de darlo por inexistente
+        registrado = motivo != "Socio inexistente"
+
+        if registrado and writer is not None:
+            writer.encolar(self.insertar_en, *args, al_completar=al_completar, al_fallar=al_fallar)
+        elif registrado:
+            conn = self.conectar()
+            self.insertar_en(conn, *args)
+            conn.commit()
+            conn.close()
+
+        return {
+            'socio_id': socio_id,
+            'socio': socio,
+            'habilitado': habilitado,
+            'motivo': motivo,
+            'vence': vence,
+            'fecha_hora': fecha_hora,
+            'registrado': registrado,
+        }
+
+    def insertar_en(self, conn, socio_id, fecha_hora, habilitado, motivo=None):
+        """
+        Inserta un ingreso usando la conexión recibida, sin hacer commit.
+        Si el socio no existe no inserta nada y devuelve None.
+        """
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO asistencias (socio_id, fecha_hora, habilitado, motivo)
+            SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM socios WHERE id = ?)
+        """, (socio_id, fecha_hora, int(habilitado), motivo, socio_id))
+        return c.lastrowid if c.rowcount else None
+
+    def insertar_lote_en(self, conn, ingresos):
+        """
+        Inserta muchos ingresos ya validados (por ejemplo, los de un molinete
+        que estuvo sin conexión) en una sola sentencia, sin hacer commit.
+        Los de socios inexistentes se descartan.
+
+        Args:
+            ingresos (list): Tuplas (socio_id, fecha_hora, habilitado, motivo)
+        """
+        c = conn.cursor()
+        # En orden cronológico los ids nuevos siguen el orden de llegada
+        c.executemany("""
+            INSERT INTO asistencias (socio_id, fecha_hora, habilitado, motivo)
+            SELECT ?1, ?2, ?3, ?4 WHERE EXISTS (SELECT 1 FROM socios WHERE id = ?1)
+        """, sorted(ingresos, key=lambda ingreso: ingreso[1]))
+        return c.rowcount
+
+    # === CONSULTAS PARA REPORTES (sobre el resumen diario) ===
+
+    def obtener_ultimos(self, limite=20):
+        """Últimos ingresos registrados, del más reciente al más viejo."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT a.id, a.socio_id, s.nombre || ' ' || s.apellido, a.fecha_hora,
+                   a.habilitado, a.motivo
+            FROM asistencias a
+            LEFT JOIN socios s ON s.id = a.socio_id
+            ORDER BY a.id DESC
+            LIMIT ?
+        """, (limite,))
+        data = c.fetchall()
+        conn.close()
+        return data
+
+    def obtener_resumen_diario(self, fecha_desde, fecha_hasta):
+        """
+        Ingresos y socios distintos por día.
+
+        Returns:
+            list: Tuplas (fecha, socios, ingresos)
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT fecha, COUNT(*), SUM(cantidad)
+            FROM asistencias_diarias
+            WHERE fecha BETWEEN ? AND ?
+            GROUP BY fecha
+            ORDER BY fecha
+        """, (fecha_desde, fecha_hasta))
+        data = c.fetchall()
+        conn.close()
+        return data
+
+    def obtener_asistencias_socio(self, socio_id, fecha_desde=None, fecha_hasta=None):
+        """
+        Días que asistió un socio, del más reciente al más viejo.
+
+        Returns:
+            list: Tuplas (fecha, cantidad de ingresos, primer ingreso, último ingreso)
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT fecha, cantidad, primera, ultima
+            FROM asistencias_diarias
+            WHERE socio_id = ?
+              AND fecha >= COALESCE(?, '') AND fecha <= COALESCE(?, '9999-12-31')
+            ORDER BY fecha DESC
+        """, (socio_id, fecha_desde, fecha_hasta))
+        data = c.fetchall()
+        conn.close()
+        return data
+
+    def obtener_ocupacion(self, semanas=12):
+        """
+        Promedio de ingresos por día de la semana y hora en las últimas semanas.
+        Solo lee los baldes por hora.
+
+        Returns:
+            list: 7 listas (lunes a domingo) de 24 promedios, una por hora
+        """
+        hasta = datetime.now().date()
+        desde = hasta - timedelta(days=7 * semanas - 1)
+
+        conn = self.conectar()
+        c = conn.cursor()
+        # strftime('%w') cuenta desde el domingo; se corre para empezar el lunes
+        c.execute("""
+            SELECT (CAST(strftime('%w', fecha) AS INTEGER) + 6) % 7, hora, SUM(ingresos)
+            FROM asistencias_por_hora
+            WHERE fecha BETWEEN ? AND ?
+            GROUP BY 1, 2
+        """, (desde.isoformat(), hasta.isoformat()))
+        matriz = [[0.0] * 24 for _ in range(7)]
+        # En 7 * semanas días cada día de la semana aparece exactamente "semanas" veces
+        for dia, hora, ingresos in c.fetchall():
+            matriz[dia][hora] = ingresos / semanas
+        conn.close()
+        return matriz
+
+    def obtener_tendencia_semanal(self, semanas=26):
+        """
+        Ingresos por semana (de lunes a domingo), leídos de los baldes por hora.
+
+        Returns:
+            list: Tuplas (lunes de la semana, ingresos), de la más vieja a la más nueva
+        """
+        hoy = datetime.now().date()
+        desde = hoy - timedelta(days=hoy.weekday() + 7 * (semanas - 1))
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT date(fecha, '-' || ((CAST(strftime('%w', fecha) AS INTEGER) + 6) % 7) || ' days') AS semana,
+                   SUM(ingresos)
+            FROM asistencias_por_hora
+            WHERE fecha >= ?
+            GROUP BY semana
+            ORDER BY semana
+        """, (desde.isoformat(),))
+        data = c.fetchall()
+        conn.close()
+        return data
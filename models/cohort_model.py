@@ -0,0 +1,245 @@
+"""
+models/cohort_model.py
+Matriz de retención por cohortes (mes de inscripción × meses transcurridos).
+Se arma en una sola pasada sobre pagos con buckets en arrays de NumPy,
+se guarda en caché y se actualiza incrementalmente con los pagos nuevos.
+Las ediciones y bajas (que no se pueden aplicar de a una) las anota un
+trigger en cohortes_version y hacen reconstruir la matriz.
+"""
+
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+
+def filtro_mes(columna):
+    """Condición SQL que acepta solo fechas 'YYYY-MM...' con un mes válido (01 a 12)."""
+    return (f"{columna} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' "
+            f"AND substr({columna}, 6, 2) BETWEEN '01' AND '12'")
+
+
+class CohortModel:
+    def __init__(self, db_path, meses=24):
+        """
+        Args:
+            db_path (str): Ruta a la base de datos SQLite
+            meses (int): Cantidad de cohortes (meses de inscripción) a analizar
+        """
+        self.db_path = db_path
+        self.meses = meses
+        self._mes_base = None
+        self.crear_triggers()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_triggers(self):
+        """
+        Crea el contador de cambios y los triggers que lo incrementan cuando se
+        edita o se borra un socio o un pago (las altas se detectan por id).
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.executescript("""
+            CREATE TABLE IF NOT EXISTS cohortes_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO cohortes_version (id, version) VALUES (1, 0);
+
+            CREATE TRIGGER IF NOT EXISTS trg_cohortes_pagos_update
+            AFTER UPDATE OF socio_id, fecha_pago ON pagos
+            BEGIN
+                UPDATE cohortes_version SET version = version + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_cohortes_pagos_delete
+            AFTER DELETE ON pagos
+            BEGIN
+                UPDATE cohortes_version SET version = version + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_cohortes_socios_update
+            AFTER UPDATE OF fecha_inscripcion ON socios
+            BEGIN
+                UPDATE cohortes_version SET version = version + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_cohortes_socios_delete
+            AFTER DELETE ON socios
+            BEGIN
+                UPDATE cohortes_version SET version = version + 1;
+            END;
+        """)
+        conn.commit()
+        conn.close()
+
+    def obtener_matriz(self):
+        """
+        Devuelve la matriz de retención actualizada.
+
+        Returns:
+            dict: cohortes (YYYY-MM), tamaño de cada cohorte, socios que pagaron
+                  por cohorte y mes transcurrido, y la retención (fracción o None
+                  para meses que todavía no ocurrieron)
+        """
+        self.actualizar()
+
+        indices = np.arange(self.meses)
+        futuro = indices[:, None] + indices[None, :] >= self.meses
+        with np.errstate(divide='ignore', invalid='ignore'):
+            retencion = np.where(self._tamanio[:, None] > 0, self._conteo / self._tamanio[:, None], 0.0)
+
+        return {
+            'cohortes': [str(self._mes_base + i) for i in range(self.meses)],
+            'tamanios': self._tamanio.tolist(),
+            'conteo': self._conteo.tolist(),
+            'retencion': [
+                [None if futuro[c, m] else float(retencion[c, m]) for m in range(self.meses)]
+                for c in range(self.meses)
+            ]
+        }
+
+    def actualizar(self):
+        """Incorpora los socios y pagos nuevos; reconstruye si hubo ediciones, bajas o cambió el mes."""
+        mes_base = np.datetime64(date.today(), 'M') - (self.meses - 1)
+        if self._mes_base != mes_base:
+            self.reconstruir()
+            return
+
+        conn = self.conectar()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT version FROM cohortes_version")
+            version = c.fetchone()[0]
+            if version == self._version:
+                c.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM socios")
+                max_socio, total_socios = c.fetchone()
+                c.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM pagos")
+                max_pago, total_pagos = c.fetchone()
+
+                nuevos_socios = self._cargar_socios(c, self._max_socio, max_socio)
+                nuevos_pagos = self._cargar_pagos(c, self._max_pago, max_pago)
+        finally:
+            conn.close()
+
+        # Un pago o socio editado (o movido por una fusión) no se puede aplicar de a uno
+        if version != self._version:
+            self.reconstruir()
+            return
+
+        # Si se borró algo, los ids nuevos no alcanzan a explicar los totales
+        if (total_socios != self._total_socios + len(nuevos_socios[0])
+                or total_pagos != self._total_pagos + len(nuevos_pagos[0])):
+            self.reconstruir()
+            return
+
+        self._agregar_socios(*nuevos_socios)
+        self._agregar_pagos(*nuevos_pagos)
+        self._max_socio, self._total_socios = max_socio, total_socios
+        self._max_pago, self._total_pagos = max_pago, total_pagos
+
+    def reconstruir(self):
+        """Arma la matriz desde cero en una sola pasada sobre pagos."""
+        self._mes_base = np.datetime64(date.today(), 'M') - (self.meses - 1)
+        self._cohorte_de = np.full(1, -1, dtype=np.int64)
+        self._tamanio = np.zeros(self.meses, dtype=np.int64)
+        self._conteo = np.zeros((self.meses, self.meses), dtype=np.int64)
+        self._claves = np.zeros(0, dtype=np.int64)
+
+        conn = self.conectar()
+        try:
+            c = conn.cursor()
+            # Se lee antes que los datos: un cambio concurrente fuerza otra reconstrucción
+            c.execute("SELECT version FROM cohortes_version")
+            self._version = c.fetchone()[0]
+            c.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM socios")
+            self._max_socio, self._total_socios = c.fetchone()
+            c.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM pagos")
+            self._max_pago, self._total_pagos = c.fetchone()
+
+            socios = self._cargar_socios(c, 0, self._max_socio)
+            pagos = self._cargar_pagos(c, 0, self._max_pago)
+        finally:
+            conn.close()
+
+        self._agregar_socios(*socios)
+        self._agregar_pagos(*pagos)
+
+    # === CARGA ===
+
+    def _cargar_socios(self, c, desde_id, hasta_id=None):
+        """Socios con id mayor a desde_id como arrays (id, mes de inscripción)."""
+        query = f"""
+            SELECT id, substr(fecha_inscripcion, 1, 7)
+            FROM socios
+            WHERE id > ? AND {filtro_mes('fecha_inscripcion')}
+        """
+        params = [desde_id]
+        if hasta_id is not None:
+            query += " AND id <= ?"
+            params.append(hasta_id)
+        c.execute(query, params)
+        return self._a_arrays(c.fetchall())
+
+    def _cargar_pagos(self, c, desde_id, hasta_id=None):
+        """Pagos con id mayor a desde_id como arrays (socio_id, mes del pago)."""
+        query = f"""
+            SELECT socio_id, substr(fecha_pago, 1, 7)
+            FROM pagos
+            WHERE id > ? AND fecha_pago >= ? AND {filtro_mes('fecha_pago')}
+        """
+        params = [desde_id, f"{self._mes_base}-01"]
+        if hasta_id is not None:
+            query += " AND id <= ?"
+            params.append(hasta_id)
+        c.execute(query, params)
+        return self._a_arrays(c.fetchall())
+
+    def _a_arrays(self, filas):
+        """Convierte filas (id, 'YYYY-MM') en ids y meses relativos al mes base."""
+        if not filas:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        ids, meses = zip(*filas)
+        relativo = (np.array(meses, dtype='datetime64[M]') - self._mes_base).astype(np.int64)
+        return np.array(ids, dtype=np.int64), relativo
+
+    # === BUCKETS ===
+
+    def _agregar_socios(self, ids, cohorte):
+        """Registra la cohorte de cada socio y suma los tamaños."""
+        if len(ids) == 0:
+            return
+        if ids.max() >= len(self._cohorte_de):
+            extendido = np.full(ids.max() + 1, -1, dtype=np.int64)
+            extendido[:len(self._cohorte_de)] = self._cohorte_de
+            self._cohorte_de = extendido
+
+        en_rango = (cohorte >= 0) & (cohorte < self.meses)
+        self._cohorte_de[ids[en_rango]] = cohorte[en_rango]
+        self._tamanio += np.bincount(cohorte[en_rango], minlength=self.meses)
+
+    def _agregar_pagos(self, socio_ids, mes_pago):
+        """Marca cada par (socio, mes transcurrido) nuevo en la matriz."""
+        if len(socio_ids) == 0:
+            return
+        conocidos = socio_ids < len(self._cohorte_de)
+        socio_ids, mes_pago = socio_ids[conocidos], mes_pago[conocidos]
+
+        cohorte = self._cohorte_de[socio_ids]
+        transcurrido = mes_pago - cohorte
+        valido = (cohorte >= 0) & (transcurrido >= 0) & (transcurrido < self.meses)
+        socio_ids, cohorte, transcurrido = socio_ids[valido], cohorte[valido], transcurrido[valido]
+
+        # Un socio cuenta una sola vez por mes aunque haya pagado varias veces
+        claves = np.unique(socio_ids * self.meses + transcurrido)
+        nuevas = claves[~np.isin(claves, self._claves, assume_unique=True)]
+        if len(nuevas) == 0:
+            return
+        self._claves = np.union1d(self._claves, nuevas)
+
+        socio_nuevo = nuevas // self.meses
+        transcurrido_nuevo = nuevas % self.meses
+        celdas = self._cohorte_de[socio_nuevo] * self.meses + transcurrido_nuevo
+        self._conteo += np.bincount(celdas, minlength=self.meses * self.meses).reshape(self.meses, self.meses)
@@ -0,0 +1,266 @@
+"""
+models/dedupe_model.py
+Detección de socios duplicados (cargados dos veces con el nombre escrito
+distinto) y fusión de los duplicados.
+Los socios se agrupan por claves de bloqueo (teléfono normalizado, soundex
+del apellido + inicial del nombre) y solo se comparan los pares de un mismo
+bloque, nunca todos contra todos.
+"""
+
+import sqlite3
+from itertools import combinations
+
+from models.phone_index import guardar_telefono_en
+from models.trigram_index import normalizar, trigramas
+
+
+# Bloques más grandes que esto no se comparan par a par (apellidos muy comunes sin
+# otra coincidencia); sus socios igual se comparan por teléfono en su propio bloque
+MAX_BLOQUE = 300
+
+# Puntaje mínimo para proponer un par como posible duplicado
+PUNTAJE_MINIMO = 0.6
+
+# Tablas cuyos registros pasan al socio que se conserva al fusionar
+TABLAS_SOCIO = ("pagos", "notificaciones", "asistencias")
+
+_CODIGOS_SOUNDEX = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mnñ", "5"),
+    "r": "6",
+}
+
+
+def soundex(texto):
+    """Código soundex de la primera palabra ("Gonzalez" y "González" dan G524)."""
+    palabras = [p for p in normalizar(texto).split() if p[0].isalpha()]
+    if not palabras:
+        return ""
+    palabra = ''.join(ch for ch in palabras[0] if ch.isalpha())
+
+    codigo = palabra[0].upper()
+    anterior = _CODIGOS_SOUNDEX.get(palabra[0], "")
+    for ch in palabra[1:]:
+        digito = _CODIGOS_SOUNDEX.get(ch, "")
+        if digito and digito != anterior:
+            codigo += digito
+            if len(codigo) == 4:
+                break
+        # La h y la w no separan letras con el mismo código; las vocales sí
+        if ch not in "hw":
+            anterior = digito
+    return codigo.ljust(4, "0")
+
+
+class DedupeModel:
+    def __init__(self, db_path, photo_store=None):
+        """
+        Args:
+            db_path (str): Ruta a la base de datos SQLite
+            photo_store (PhotoStore): Donde borrar la foto del duplicado si
+                                      nadie más la usa (None: no se borra)
+        """
+        self.db_path = db_path
+        self.photo_store = photo_store
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def armar_bloques(self, socios):
+        """
+        Agrupa los socios por cada clave de bloqueo.
+
+        Args:
+            socios (list): Tuplas (id, nombre, apellido, telefono_norm)
+
+        Returns:
+            dict: {(tipo de clave, valor): [ids]} solo con los bloques de 2 o más socios
+        """
+        bloques = {}
+        for socio_id, nombre, apellido, telefono_norm in socios:
+            claves = []
+            if telefono_norm:
+                claves.append(("telefono", telefono_norm))
+            codigo = soundex(apellido)
+            inicial = normalizar(nombre)[:1]
+            if codigo and inicial:
+                claves.append(("apellido", f"{codigo}-{inicial}"))
+            for clave in claves:
+                bloques.setdefault(clave, []).append(socio_id)
+        return {clave: ids for clave, ids in bloques.items() if len(ids) > 1}
+
+    def puntuar(self, trigramas_a, trigramas_b, mismo_telefono):
+        """
+        Puntaje (0 a 1) de que dos socios sean la misma persona: similitud de
+        los trigramas del nombre completo, con un extra si comparten teléfono.
+        """
+        if not trigramas_a or not trigramas_b:
+            puntaje = 0.0
+        else:
+            puntaje = len(trigramas_a & trigramas_b) / len(trigramas_a | trigramas_b)
+        if mismo_telefono:
+            # Mismo teléfono: alcanza con un nombre parecido (pero no cualquiera: familias)
+            puntaje = min(1.0, puntaje + 0.4)
+        return puntaje
+
+    def buscar_duplicados(self, puntaje_minimo=PUNTAJE_MINIMO, solo_activos=False):
+        """
+        Pares de socios que probablemente son la misma persona, del más probable al menos.
+
+        Returns:
+            list: Tuplas (puntaje, socio A, socio B); cada socio es
+                  (id, nombre, apellido, telefono, fecha_inscripcion, cantidad de pagos)
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, nombre, apellido, telefono_norm FROM socios
+            WHERE ? = 0 OR COALESCE(activo, 1) = 1
+        """, (int(solo_activos),))
+        socios = {fila[0]: fila for fila in c.fetchall()}
+
+        # Los trigramas se calculan una vez por socio, no una vez por par
+        grams = {}
+        pares = {}
+        for ids in self.armar_bloques(socios.values()).values():
+            if len(ids) > MAX_BLOQUE:
+                continue
+            for socio_id in ids:
+                if socio_id not in grams:
+                    socio = socios[socio_id]
+                    grams[socio_id] = trigramas(f"{socio[1]} {socio[2]}")
+            for id_a, id_b in combinations(sorted(ids), 2):
+                if (id_a, id_b) in pares:
+                    continue
+                mismo_telefono = bool(socios[id_a][3]) and socios[id_a][3] == socios[id_b][3]
+                ga, gb = grams[id_a], grams[id_b]
+                # Cota de la similitud por tamaño: evita la intersección en pares imposibles
+                if not mismo_telefono and min(len(ga), len(gb)) < puntaje_minimo * max(len(ga), len(gb)):
+                    continue
+                puntaje = self.puntuar(ga, gb, mismo_telefono)
+                if puntaje >= puntaje_minimo:
+                    pares[(id_a, id_b)] = puntaje
+
+        if not pares:
+            conn.close()
+            return []
+
+        ids = sorted({socio_id for par in pares for socio_id in par})
+        c.execute("""
+            SELECT s.id, s.nombre, s.apellido, s.telefono, s.fecha_inscripcion,
+                   (SELECT COUNT(*) FROM pagos p WHERE p.socio_id = s.id)
+            FROM socios s
+            WHERE s.id IN (SELECT value FROM json_each(?))
+        """, (f"[{','.join(map(str, ids))}]",))
+        datos = {fila[0]: fila for fila in c.fetchall()}
+        conn.close()
+
+        return sorted(
+            ((puntaje, datos[a], datos[b]) for (a, b), puntaje in pares.items()),
+            key=lambda par: (-par[0], par[1][0], par[2][0])
+        )
+
+    def fusionar(self, conservar_id, eliminar_id):
+        """
+        Fusiona dos socios en una sola transacción (ver fusionar_en). Después
+        borra la foto del duplicado si ningún socio la usa.
+        """
+        conn = self.conectar()
+        try:
+            with conn:
+                c = conn.cursor()
+                c.execute("SELECT foto FROM socios WHERE id = ?", (eliminar_id,))
+                fila = c.fetchone()
+                resultado = self.fusionar_en(conn, conservar_id, eliminar_id)
+                foto = fila[0] if fila else None
+                if foto:
+                    c.execute("SELECT EXISTS (SELECT 1 FROM socios WHERE foto = ?)", (foto,))
+                    if c.fetchone()[0]:
+                        foto = None
+        finally:
+            conn.close()
+
+        # Los archivos se borran recién con la fusión confirmada
+        if foto and self.photo_store is not None:
+            self.photo_store.eliminar(foto)
+        return resultado
+
+    def fusionar_en(self, conn, conservar_id, eliminar_id):
+        """
+        Pasa pagos, notificaciones y asistencias del socio duplicado al que se
+        conserva, completa los datos que le falten y elimina el duplicado.
+        Los avisos automáticos que el conservado ya tiene no se duplican.
+        Usa la conexión recibida, sin hacer commit.
+
+        Returns:
+            dict: Registros movidos por tabla
+
+        Raises:
+            ValueError: Si los socios son el mismo o alguno no existe
+        """
+        if conservar_id == eliminar_id:
+            raise ValueError("No se puede fusionar un socio consigo mismo")
+
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM socios WHERE id IN (?, ?)", (conservar_id, eliminar_id))
+        if c.fetchone()[0] != 2:
+            raise ValueError("Alguno de los socios no existe")
+
+        c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existentes = {fila[0] for fila in c.fetchall()}
+
+        if 'notificaciones' in existentes:
+            # Las claves automáticas empiezan con el id del socio ('socio:tipo:periodo'):
+            # pasan al que se conserva, salvo las que ese socio ya tiene
+            prefijo_viejo, prefijo_nuevo = f"{eliminar_id}:", f"{conservar_id}:"
+            nueva_clave = "? || substr(clave, length(?) + 1)"
+            c.execute(f"""
+                DELETE FROM notificaciones
+                WHERE socio_id = ? AND substr(clave, 1, length(?)) = ?
+                AND {nueva_clave} IN (SELECT clave FROM notificaciones WHERE clave IS NOT NULL)
+            """, (eliminar_id, prefijo_viejo, prefijo_viejo, prefijo_nuevo, prefijo_viejo))
+            c.execute(f"""
+                UPDATE notificaciones SET clave = {nueva_clave}
+                WHERE socio_id = ? AND substr(clave, 1, length(?)) = ?
+            """, (prefijo_nuevo, prefijo_viejo, eliminar_id, prefijo_viejo, prefijo_viejo))
+
+        movidos = {}
+        for tabla in TABLAS_SOCIO:
+            if tabla in existentes:
+                c.execute(f"UPDATE {tabla} SET socio_id = ? WHERE socio_id = ?", (conservar_id, eliminar_id))
+                movidos[tabla] = c.rowcount
+
+        if 'asistencias_diarias' in existentes:
+            # El resumen diario se suma día por día al del socio que queda
+            c.execute("""
+                INSERT INTO asistencias_diarias (fecha, socio_id, cantidad, primera, ultima)
+                SELECT fecha, ?, cantidad, primera, ultima
+                FROM asistencias_diarias WHERE socio_id = ?
+                ON CONFLICT(fecha, socio_id) DO UPDATE SET
+                    cantidad = cantidad + excluded.cantidad,
+                    primera = min(primera, excluded.primera),
+                    ultima = max(ultima, excluded.ultima)
+            """, (conservar_id, eliminar_id))
+            c.execute("DELETE FROM asistencias_diarias WHERE socio_id = ?", (eliminar_id,))
+
+        # Datos que el socio conservado no tiene y el duplicado sí
+        c.execute("""
+            UPDATE socios SET
+                telefono = COALESCE(NULLIF(socios.telefono, ''), d.telefono),
+                telefono_norm = COALESCE(NULLIF(socios.telefono_norm, ''), d.telefono_norm),
+                foto = COALESCE(socios.foto, d.foto),
+                plan_id = COALESCE(socios.plan_id, d.plan_id),
+                fecha_inscripcion = min(COALESCE(socios.fecha_inscripcion, d.fecha_inscripcion),
+                                        COALESCE(d.fecha_inscripcion, socios.fecha_inscripcion))
+            FROM (SELECT * FROM socios WHERE id = ?) AS d
+            WHERE socios.id = ?
+        """, (eliminar_id, conservar_id))
+        # Si el teléfono cambió, el trigger dejó telefono_norm pendiente
+        c.execute("SELECT telefono FROM socios WHERE id = ?", (conservar_id,))
+        guardar_telefono_en(conn, conservar_id, c.fetchone()[0])
+
+        c.execute("DELETE FROM socios WHERE id = ?", (eliminar_id,))
+        return movidos
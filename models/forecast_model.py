@@ -0,0 +1,288 @@
+"""
+models/forecast_model.py
+Proyección de ingresos y renovaciones de los próximos meses.
+Carga los datos de socios y pagos en arrays de NumPy y calcula todo de forma
+vectorizada (sin recorrer socio por socio en Python).
+"""
+
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+
+# Las fechas se trabajan como días enteros desde epoch
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# Mínimo de observaciones para usar la tasa propia de una duración de plan
+MIN_OBSERVACIONES = 20
+
+# Separa plan y día en una sola clave ordenable para buscar el precio vigente
+# (los días desde epoch de cualquier fecha razonable caben holgados)
+_DIAS_POR_PLAN = 1 << 22
+
+
+def proyectar_ingresos(db_path, meses=6, gracia_dias=15, historia_meses=12):
+    """
+    Proyecta ingresos y renovaciones esperadas para los próximos meses.
+
+    Args:
+        db_path (str): Ruta a la base de datos SQLite
+        meses (int): Horizonte de la proyección (3 a 12 meses, incluye el mes actual)
+        gracia_dias (int): Días de tolerancia después del vencimiento para
+            considerar que el socio renovó (o sigue vigente)
+        historia_meses (int): Meses de historial usados para medir la tasa de renovación
+
+    Returns:
+        dict: meses, ingresos y renovaciones esperadas, tasas de renovación
+              observadas e ingresos históricos mensuales
+    """
+    if not 3 <= meses <= 12:
+        raise ValueError("El horizonte de proyección debe estar entre 3 y 12 meses.")
+
+    # Un plan dura como máximo un año: quien no pagó en 12 meses + gracia ya está vencido
+    historia_meses = max(historia_meses, 12)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        pagos = _cargar_pagos(conn, historia_meses, gracia_dias)
+        historico = _cargar_historico(conn, historia_meses)
+        precios = _cargar_precios(conn)
+    finally:
+        conn.close()
+
+    hoy = (np.datetime64(date.today(), 'D') - EPOCH).astype(np.int64)
+    socio, dia, duracion, plan, precio, activo = pagos
+
+    tasa_global, tasas = calcular_tasas_renovacion(socio, dia, duracion, hoy, gracia_dias)
+
+    # Último pago de cada socio activo
+    ultimo = _ultimo_por_socio(socio, dia)
+    ultimo = ultimo[activo[ultimo]]
+
+    # Tasa de cada socio según la duración de su plan (la global si hay pocos datos)
+    duraciones = np.unique(duracion[ultimo])
+    tasas_dur = np.array([tasas.get(int(d), tasa_global) for d in duraciones], dtype=np.float64)
+    tasa_socio = tasas_dur[np.searchsorted(duraciones, duracion[ultimo])]
+
+    ingresos, renovaciones, vigentes = _proyectar(
+        dia[ultimo], duracion[ultimo], precio[ultimo], tasa_socio, hoy, meses, gracia_dias,
+        plan=plan[ultimo], precios=precios
+    )
+
+    mes_actual = np.datetime64(date.today(), 'M')
+    etiquetas = [str(mes_actual + i) for i in range(meses)]
+
+    return {
+        'meses': etiquetas,
+        'ingresos': ingresos.tolist(),
+        'renovaciones': renovaciones.tolist(),
+        'total_ingresos': float(ingresos.sum()),
+        'socios_vigentes': vigentes,
+        'tasa_renovacion': tasa_global,
+        'tasas_por_duracion': tasas,
+        'historico': historico
+    }
+
+
+def calcular_tasas_renovacion(socio, dia, duracion, hoy, gracia_dias=15):
+    """
+    Calcula la tasa de renovación observada, global y por duración de plan.
+
+    Un pago cuenta como observable cuando su vencimiento más la gracia ya pasó;
+    se considera renovado si el mismo socio volvió a pagar dentro de ese plazo.
+
+    Returns:
+        tuple: (tasa_global, {duracion_dias: tasa})
+    """
+    if len(socio) == 0:
+        return 1.0, {}
+
+    orden = np.lexsort((dia, socio))
+    socio, dia, duracion = socio[orden], dia[orden], duracion[orden]
+
+    mismo_socio = np.zeros(len(socio), dtype=bool)
+    mismo_socio[:-1] = socio[:-1] == socio[1:]
+    siguiente = np.empty_like(dia)
+    siguiente[:-1] = dia[1:]
+    siguiente[-1] = dia[-1]
+
+    limite = dia + duracion + gracia_dias
+    observable = limite <= hoy
+    renovo = mismo_socio & (siguiente <= limite) & observable
+
+    total_obs = int(observable.sum())
+    if total_obs == 0:
+        return 1.0, {}
+    tasa_global = float(renovo.sum()) / total_obs
+
+    duraciones, inversa = np.unique(duracion, return_inverse=True)
+    obs_por_dur = np.bincount(inversa, weights=observable, minlength=len(duraciones))
+    ren_por_dur = np.bincount(inversa, weights=renovo, minlength=len(duraciones))
+
+    tasas = {
+        int(d): float(r / o)
+        for d, o, r in zip(duraciones, obs_por_dur, ren_por_dur)
+        if o >= MIN_OBSERVACIONES
+    }
+    return tasa_global, tasas
+
+
+def _proyectar(ultimo, duracion, precio, tasa, hoy, meses, gracia_dias, plan=None, precios=None):
+    """
+    Distribuye los vencimientos futuros de todos los socios en meses a la vez.
+    Con el historial de precios (ver _cargar_precios) cada renovación se valúa
+    al precio vigente el día que vence; si no, al precio de cada socio.
+    """
+    if len(ultimo) == 0:
+        return np.zeros(meses), np.zeros(meses), 0
+
+    duracion = np.maximum(duracion, 1)
+    vence = ultimo + duracion
+
+    # Socios vencidos hace más que la gracia: se consideran dados de baja
+    vigente = hoy - vence <= gracia_dias
+    # Vencidos dentro de la gracia: se espera la renovación desde hoy
+    base = np.where(vence < hoy, hoy - duracion, ultimo)
+
+    mes_actual = np.datetime64(EPOCH + int(hoy), 'M')
+    fin = ((mes_actual + meses).astype('datetime64[D]') - EPOCH).astype(np.int64)
+    renov_max = int(np.ceil((fin - hoy) / duracion[vigente].min())) + 1 if vigente.any() else 1
+
+    k = np.arange(1, renov_max + 1)
+    vencimientos = base[:, None] + duracion[:, None] * k[None, :]
+    probabilidad = np.power(tasa[:, None], k[None, :]) * vigente[:, None]
+
+    mes_venc = (EPOCH + vencimientos.astype('timedelta64[D]')).astype('datetime64[M]')
+    indice = (mes_venc - mes_actual).astype(np.int64)
+    dentro = (indice >= 0) & (indice < meses)
+
+    if precios is not None:
+        monto = precio_vigente(precios, plan[:, None], vencimientos, precio[:, None])
+    else:
+        monto = np.broadcast_to(precio[:, None], vencimientos.shape)
+
+    renovaciones = np.bincount(indice[dentro], weights=probabilidad[dentro], minlength=meses)
+    ingresos = np.bincount(
+        indice[dentro], weights=(probabilidad * monto)[dentro], minlength=meses
+    )
+    return ingresos, renovaciones, int(vigente.sum())
+
+
+def precio_vigente(precios, plan, dia, defecto):
+    """
+    Precio de cada plan en cada día, de forma vectorizada (los argumentos se
+    combinan como en NumPy). Como PlansModel.precios_vigentes: antes del primer
+    precio registrado vale ese primero. Donde el plan no tiene precios (o es
+    -1, sin plan) queda el valor de 'defecto'.
+
+    Args:
+        precios (tuple): Arrays (plan, día desde, precio) de _cargar_precios
+    """
+    planes_h, desde_h, precio_h = precios
+    plan, dia, defecto = np.broadcast_arrays(plan, dia, defecto)
+    if len(planes_h) == 0:
+        return defecto.astype(np.float64)
+
+    claves_h = planes_h * _DIAS_POR_PLAN + desde_h
+    # Último precio con vigencia hasta el día (inclusive)...
+    i = np.searchsorted(claves_h, plan * _DIAS_POR_PLAN + dia, side='right') - 1
+    vigente = (i >= 0) & (planes_h[np.maximum(i, 0)] == plan)
+    # ...o, si el día es anterior a todos, el primero del plan
+    primero = np.searchsorted(claves_h, plan * _DIAS_POR_PLAN - _DIAS_POR_PLAN // 2)
+    primero = np.minimum(primero, len(claves_h) - 1)
+    tiene_precio = planes_h[primero] == plan
+
+    return np.where(vigente, precio_h[np.maximum(i, 0)],
+                    np.where(tiene_precio, precio_h[primero], defecto)).astype(np.float64)
+
+
+def _a_dias(fechas):
+    """Convierte fechas ISO (YYYY-MM-DD) a días desde epoch, de forma vectorizada."""
+    return (np.array(fechas, dtype='datetime64[D]') - EPOCH).astype(np.int64)
+
+
+def _ultimo_por_socio(socio, dia):
+    """Índices del pago más reciente de cada socio."""
+    if len(socio) == 0:
+        return np.zeros(0, dtype=np.int64)
+    orden = np.lexsort((dia, socio))
+    es_ultimo = np.ones(len(orden), dtype=bool)
+    es_ultimo[:-1] = socio[orden[:-1]] != socio[orden[1:]]
+    return orden[es_ultimo]
+
+
+def _cargar_pagos(conn, historia_meses, gracia_dias):
+    """
+    Pagos del período de observación como arrays: socio, día, duración del
+    plan, plan (-1 si no tiene), precio esperado y si el socio está activo.
+    """
+    c = conn.cursor()
+    c.execute("""
+        SELECT p.socio_id, p.fecha_pago, COALESCE(pl.duracion_dias, 30),
+               COALESCE(pl.id, -1), COALESCE(pl.precio, p.monto), COALESCE(s.activo, 1)
+        FROM pagos p
+        JOIN socios s ON s.id = p.socio_id
+        LEFT JOIN planes pl ON pl.id = s.plan_id
+        WHERE p.fecha_pago >= date('now', ?, ?)
+    """, (f"-{historia_meses} months", f"-{gracia_dias} days"))
+    filas = c.fetchall()
+    if not filas:
+        vacio = np.zeros(0, dtype=np.int64)
+        return vacio, vacio, vacio, vacio, np.zeros(0), np.zeros(0, dtype=bool)
+
+    socios, fechas, duraciones, planes, precios, activos = zip(*filas)
+    return (
+        np.array(socios, dtype=np.int64),
+        _a_dias([f[:10] for f in fechas]),
+        np.array(duraciones, dtype=np.int64),
+        np.array(planes, dtype=np.int64),
+        np.array(precios, dtype=np.float64),
+        np.array(activos, dtype=bool)
+    )
+
+
+def _cargar_precios(conn):
+    """
+    Historial de precios de los planes como arrays (plan, día desde, precio),
+    ordenados por plan y fecha. Vacíos si la base todavía no tiene historial.
+    """
+    c = conn.cursor()
+    try:
+        c.execute("SELECT plan_id, vigente_desde, precio FROM planes_precios ORDER BY plan_id, vigente_desde")
+        filas = c.fetchall()
+    except sqlite3.OperationalError:
+        filas = []
+    if not filas:
+        vacio = np.zeros(0, dtype=np.int64)
+        return vacio, vacio, np.zeros(0)
+
+    planes, desde, precios = zip(*filas)
+    return (
+        np.array(planes, dtype=np.int64),
+        _a_dias([d[:10] for d in desde]),
+        np.array(precios, dtype=np.float64)
+    )
+
+
+def _cargar_historico(conn, historia_meses):
+    """Ingresos reales por mes, para comparar con la proyección."""
+    desde = str(np.datetime64(date.today(), 'M') - historia_meses)
+    c = conn.cursor()
+    try:
+        # Contadores mensuales mantenidos por triggers (ver PaymentsModel)
+        c.execute("""
+            SELECT mes, total_ingresos
+            FROM pagos_resumen_mes
+            WHERE mes >= ? AND total_pagos > 0
+            ORDER BY mes
+        """, (desde,))
+    except sqlite3.OperationalError:
+        c.execute("""
+            SELECT strftime('%Y-%m', fecha_pago) AS mes, SUM(monto)
+            FROM pagos
+            WHERE fecha_pago >= ?
+            GROUP BY mes
+            ORDER BY mes
+        """, (f"{desde}-01",))
+    return c.fetchall()
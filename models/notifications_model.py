@@ -4,12 +4,28 @@ Modelo para gestionar notificaciones automáticas del sistema.
 """
 
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from models.alert_rules import AlertRulesModel, ESTADOS_PAGO_SQL
+from models.retention_model import RetentionModel
+
+
+# Rango entero de cada prioridad (1 = más urgente); el resto de los valores va al final
+RANGOS_PRIORIDAD = {'alta': 1, 'media': 2}
+RANGO_NORMAL = 3
+
+
+def rango_sql(columna):
+    """Expresión SQL que calcula el rango de la prioridad guardada en 'columna'."""
+    casos = ' '.join(f"WHEN '{prioridad}' THEN {rango}" for prioridad, rango in RANGOS_PRIORIDAD.items())
+    return f"CASE {columna} {casos} ELSE {RANGO_NORMAL} END"
 
 
 class NotificationsModel:
     def __init__(self, db_path):
         self.db_path = db_path
+        # Las reglas de aviso por plan (ESTADOS_PAGO_SQL las necesita)
+        self.reglas = AlertRulesModel(db_path)
         self.crear_tabla()
 
     def conectar(self):
@@ -29,26 +45,181 @@ class NotificationsModel:
                 leida INTEGER DEFAULT 0,
                 prioridad TEXT DEFAULT 'normal',
                 fecha_vencimiento TEXT,
+                clave TEXT,
+                recordatorio_enviado TEXT,
+                rango INTEGER,
                 FOREIGN KEY(socio_id) REFERENCES socios(id)
             )
         """)
+
+        c.execute("PRAGMA table_info(notificaciones)")
+        columnas = [col[1] for col in c.fetchall()]
+        if 'clave' not in columnas:
+            c.execute("ALTER TABLE notificaciones ADD COLUMN clave TEXT")
+            self._completar_claves(conn)
+        if 'recordatorio_enviado' not in columnas:
+            c.execute("ALTER TABLE notificaciones ADD COLUMN recordatorio_enviado TEXT")
+        if 'rango' not in columnas:
+            c.execute("ALTER TABLE notificaciones ADD COLUMN rango INTEGER")
+            c.execute(f"UPDATE notificaciones SET rango = {rango_sql('prioridad')}")
+
+        # Clave 'socio:tipo:período'; NULL en los avisos manuales (pueden repetirse)
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_notificaciones_clave ON notificaciones(clave)")
+
+        # La lista de pendientes sale ordenada del índice, sin ordenar todas las filas.
+        # El rango lo mantienen los triggers; quien inserta puede ponerlo y se evita el UPDATE
+        c.executescript(f"""
+            CREATE INDEX IF NOT EXISTS idx_notificaciones_pendientes
+            ON notificaciones(leida, rango, fecha_creacion DESC, id DESC);
+
+            CREATE TRIGGER IF NOT EXISTS trg_notificaciones_rango_insert
+            AFTER INSERT ON notificaciones
+            WHEN NEW.rango IS NOT {rango_sql('NEW.prioridad')}
+            BEGIN
+                UPDATE notificaciones SET rango = {rango_sql('NEW.prioridad')} WHERE id = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_notificaciones_rango_update
+            AFTER UPDATE OF prioridad, rango ON notificaciones
+            WHEN NEW.rango IS NOT {rango_sql('NEW.prioridad')}
+            BEGIN
+                UPDATE notificaciones SET rango = {rango_sql('NEW.prioridad')} WHERE id = NEW.id;
+            END;
+        """)
+
+        self._crear_contadores(conn)
+        self._migrar_alertas(conn)
         conn.commit()
         conn.close()
 
-    def crear_notificacion(self, socio_id, tipo, mensaje, prioridad='normal', fecha_vencimiento=None):
-        """Crea una nueva notificación."""
+    def _crear_contadores(self, conn):
+        """
+        Tabla de contadores (total, pendientes, urgentes y pendientes por tipo)
+        mantenida por triggers, para no contar toda la tabla en cada refresco.
+        Los triggers suman la diferencia de cada fila con un UPSERT.
+        """
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notificaciones_contadores'")
+        nueva = c.fetchone() is None
+
+        c.executescript("""
+            CREATE TABLE IF NOT EXISTS notificaciones_contadores (
+                clave TEXT PRIMARY KEY,
+                cantidad INTEGER NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_notificaciones_contadores_insert
+            AFTER INSERT ON notificaciones
+            BEGIN
+                INSERT INTO notificaciones_contadores (clave, cantidad)
+                VALUES ('total', 1),
+                       ('pendientes', NEW.leida IS 0),
+                       ('urgentes', NEW.leida IS 0 AND NEW.rango IS 1),
+                       ('tipo:' || NEW.tipo, NEW.leida IS 0)
+                ON CONFLICT(clave) DO UPDATE SET cantidad = cantidad + excluded.cantidad;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_notificaciones_contadores_update
+            AFTER UPDATE OF leida, rango, tipo ON notificaciones
+            WHEN OLD.leida IS NOT NEW.leida OR OLD.rango IS NOT NEW.rango OR OLD.tipo IS NOT NEW.tipo
+            BEGIN
+                INSERT INTO notificaciones_contadores (clave, cantidad)
+                VALUES ('pendientes', (NEW.leida IS 0) - (OLD.leida IS 0)),
+                       ('urgentes', (NEW.leida IS 0 AND NEW.rango IS 1) - (OLD.leida IS 0 AND OLD.rango IS 1)),
+                       ('tipo:' || OLD.tipo, -(OLD.leida IS 0)),
+                       ('tipo:' || NEW.tipo, NEW.leida IS 0)
+                ON CONFLICT(clave) DO UPDATE SET cantidad = cantidad + excluded.cantidad;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_notificaciones_contadores_delete
+            AFTER DELETE ON notificaciones
+            BEGIN
+                INSERT INTO notificaciones_contadores (clave, cantidad)
+                VALUES ('total', -1),
+                       ('pendientes', -(OLD.leida IS 0)),
+                       ('urgentes', -(OLD.leida IS 0 AND OLD.rango IS 1)),
+                       ('tipo:' || OLD.tipo, -(OLD.leida IS 0))
+                ON CONFLICT(clave) DO UPDATE SET cantidad = cantidad + excluded.cantidad;
+            END;
+        """)
+        if nueva:
+            self.verificar_contadores_en(conn)
+
+    def _migrar_alertas(self, conn):
+        """
+        Pasa las filas de la tabla vieja alertas a notificaciones y la elimina,
+        para que quede un solo lugar de avisos. La clave 'alerta:id' evita
+        duplicarlas si la migración se corta y se repite.
+        """
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alertas'")
+        if c.fetchone() is None:
+            return
+        c.execute("""
+            INSERT INTO notificaciones (socio_id, tipo, mensaje, fecha_creacion, leida, prioridad, rango, clave)
+            SELECT socio_id,
+                   CASE WHEN mensaje LIKE '%no tiene pagos%' THEN 'sin_pagos' ELSE 'pago_vencido' END,
+                   mensaje,
+                   -- alertas guardaba solo el día
+                   CASE WHEN length(fecha_creacion) = 10 THEN fecha_creacion || ' 00:00:00'
+                        ELSE fecha_creacion END,
+                   COALESCE(leida, 0), 'alta', 1, 'alerta:' || id
+            FROM alertas
+            WHERE true  -- Necesario para el ON CONFLICT después de un SELECT
+            ORDER BY id
+            ON CONFLICT(clave) DO NOTHING
+        """)
+        c.execute("DROP TABLE alertas")
+
+    def _completar_claves(self, conn):
+        """
+        Asigna la clave a las notificaciones automáticas anteriores a la columna:
+        solo la más reciente de cada socio y tipo, si es del ciclo de pago actual,
+        para que la próxima verificación no la vuelva a crear. Las demás quedan sin clave.
+        """
+        c = conn.cursor()
+        c.execute("SELECT EXISTS (SELECT 1 FROM notificaciones)")
+        if not c.fetchone()[0]:
+            return
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL},
+            recientes AS (
+                SELECT n.id, n.socio_id, n.tipo,
+                       ROW_NUMBER() OVER (PARTITION BY n.socio_id, n.tipo
+                                          ORDER BY n.fecha_creacion DESC, n.id DESC) AS orden
+                FROM notificaciones n
+                JOIN estados e ON e.socio_id = n.socio_id
+                WHERE n.tipo IN ('pago_vencido', 'proximo_vencimiento', 'sin_pagos')
+                AND (e.ultimo_pago IS NULL OR date(n.fecha_creacion) >= date(e.ultimo_pago))
+            )
+            UPDATE notificaciones
+            SET clave = r.socio_id || ':' || r.tipo || ':' || e.periodo
+            FROM recientes r
+            JOIN estados e ON e.socio_id = r.socio_id
+            WHERE notificaciones.id = r.id AND r.orden = 1
+        """, {'dias_aviso': None})
+
+    def crear_notificacion(self, socio_id, tipo, mensaje, prioridad='normal', fecha_vencimiento=None, clave=None):
+        """
+        Crea una nueva notificación.
+        Si se pasa una clave que ya existe no se crea otra; devuelve si se creó.
+        """
         conn = self.conectar()
         c = conn.cursor()
         fecha_creacion = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         c.execute("""
             INSERT INTO notificaciones 
-            (socio_id, tipo, mensaje, fecha_creacion, prioridad, fecha_vencimiento)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (socio_id, tipo, mensaje, fecha_creacion, prioridad, fecha_vencimiento))
+            (socio_id, tipo, mensaje, fecha_creacion, prioridad, fecha_vencimiento, clave, rango)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(clave) DO NOTHING
+        """, (socio_id, tipo, mensaje, fecha_creacion, prioridad, fecha_vencimiento, clave,
+              RANGOS_PRIORIDAD.get(prioridad, RANGO_NORMAL)))
+        creada = c.rowcount > 0
         
         conn.commit()
         conn.close()
+        return creada
 
     def obtener_notificaciones_pendientes(self):
         """Obtiene todas las notificaciones no leídas."""
@@ -60,117 +231,352 @@ class NotificationsModel:
             FROM notificaciones n
             JOIN socios s ON n.socio_id = s.id
             WHERE n.leida = 0
-            ORDER BY 
-                CASE n.prioridad
-                    WHEN 'alta' THEN 1
-                    WHEN 'media' THEN 2
-                    ELSE 3
-                END,
-                n.fecha_creacion DESC
+            ORDER BY n.rango, n.fecha_creacion DESC, n.id DESC
         """)
         notificaciones = c.fetchall()
         conn.close()
         return notificaciones
 
+    def obtener_pendientes_pagina(self, cantidad, despues_de=None):
+        """
+        Página de notificaciones no leídas, en el mismo orden que
+        obtener_notificaciones_pendientes, para cargar la tabla de a partes.
+        Pagina por clave (no por OFFSET): cada página cuesta lo mismo.
+
+        Args:
+            cantidad (int): Filas a devolver
+            despues_de (tuple, optional): (rango, fecha_creacion, id) de la última
+                fila ya cargada; None para la primera página
+
+        Returns:
+            list: Tuplas (id, socio_id, socio, tipo, mensaje, fecha_creacion,
+                  prioridad, fecha_vencimiento, rango)
+        """
+        # Las dos partes recorren el índice idx_notificaciones_pendientes desde la
+        # última fila cargada: el resto de su mismo rango y después los rangos siguientes
+        select = """
+            SELECT n.id, n.socio_id, s.nombre || ' ' || s.apellido AS socio,
+                   n.tipo, n.mensaje, n.fecha_creacion, n.prioridad, n.fecha_vencimiento, n.rango
+            FROM notificaciones n
+            JOIN socios s ON n.socio_id = s.id
+            WHERE n.leida = 0
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        filas = []
+        rango = 0
+        if despues_de is not None:
+            rango, fecha, notif_id = despues_de
+            c.execute(select + """
+                AND n.rango = ? AND (n.fecha_creacion, n.id) < (?, ?)
+                ORDER BY n.fecha_creacion DESC, n.id DESC LIMIT ?
+            """, (rango, fecha, notif_id, cantidad))
+            filas = c.fetchall()
+        if len(filas) < cantidad:
+            c.execute(select + """
+                AND n.rango > ?
+                ORDER BY n.rango, n.fecha_creacion DESC, n.id DESC LIMIT ?
+            """, (rango, cantidad - len(filas)))
+            filas += c.fetchall()
+        conn.close()
+        return filas
+
+    def obtener_pendientes_entre(self, desde=None, hasta=None, limite=1000):
+        """
+        Notificaciones no leídas entre dos filas de la tabla (ambas incluidas),
+        en el orden de obtener_pendientes_pagina. Sirve para refrescar solo la
+        parte visible de la tabla sin volver a leer todo lo cargado.
+
+        Args:
+            desde (tuple, optional): (rango, fecha_creacion, id) de la primera fila;
+                None para empezar desde el principio (incluye las nuevas)
+            hasta (tuple, optional): (rango, fecha_creacion, id) de la última fila;
+                None para seguir hasta el final
+            limite (int): Máximo de filas a devolver
+
+        Returns:
+            list: Mismas columnas que obtener_pendientes_pagina, o None si el
+                  tramo tiene más de 'limite' filas
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        filas = []
+        # Una consulta por rango: cada una recorre su tramo del índice idx_notificaciones_pendientes
+        for rango in range(desde[0] if desde else 1, (hasta[0] if hasta else RANGO_NORMAL) + 1):
+            query = """
+                SELECT n.id, n.socio_id, s.nombre || ' ' || s.apellido AS socio,
+                       n.tipo, n.mensaje, n.fecha_creacion, n.prioridad, n.fecha_vencimiento, n.rango
+                FROM notificaciones n
+                JOIN socios s ON n.socio_id = s.id
+                WHERE n.leida = 0 AND n.rango = ?
+            """
+            params = [rango]
+            if desde and rango == desde[0]:
+                query += " AND (n.fecha_creacion, n.id) <= (?, ?)"
+                params += [desde[1], desde[2]]
+            if hasta and rango == hasta[0]:
+                query += " AND (n.fecha_creacion, n.id) >= (?, ?)"
+                params += [hasta[1], hasta[2]]
+            query += " ORDER BY n.fecha_creacion DESC, n.id DESC LIMIT ?"
+            params.append(limite + 1 - len(filas))
+            c.execute(query, params)
+            filas += c.fetchall()
+            if len(filas) > limite:
+                conn.close()
+                return None
+        conn.close()
+        return filas
+
+    def obtener_urgentes(self, limite=10):
+        """Las últimas notificaciones pendientes de prioridad alta (mismas columnas que obtener_pendientes_pagina)."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT n.id, n.socio_id, s.nombre || ' ' || s.apellido AS socio,
+                   n.tipo, n.mensaje, n.fecha_creacion, n.prioridad, n.fecha_vencimiento, n.rango
+            FROM notificaciones n
+            JOIN socios s ON n.socio_id = s.id
+            WHERE n.leida = 0 AND n.rango = 1
+            ORDER BY n.fecha_creacion DESC, n.id DESC
+            LIMIT ?
+        """, (limite,))
+        urgentes = c.fetchall()
+        conn.close()
+        return urgentes
+
     def marcar_como_leida(self, notificacion_id):
         """Marca una notificación como leída."""
         conn = self.conectar()
+        self.marcar_leida_en(conn, notificacion_id)
+        conn.commit()
+        conn.close()
+
+    def marcar_leida_en(self, conn, notificacion_id):
+        """Marca una notificación como leída usando la conexión recibida, sin hacer commit."""
         c = conn.cursor()
         c.execute("UPDATE notificaciones SET leida = 1 WHERE id = ?", (notificacion_id,))
+        return c.rowcount
+
+    def marcar_leidas(self, ids=None, filtro=None):
+        """Marca varias notificaciones como leídas en una sola sentencia (ver marcar_leidas_en)."""
+        conn = self.conectar()
+        marcadas = self.marcar_leidas_en(conn, ids, filtro)
         conn.commit()
         conn.close()
+        return marcadas
 
-    def verificar_pagos_vencidos(self):
-        """Verifica pagos vencidos y crea notificaciones automáticas."""
+    def marcar_leidas_en(self, conn, ids=None, filtro=None):
+        """
+        Marca como leídas las notificaciones pendientes con un único UPDATE,
+        usando la conexión recibida, sin hacer commit.
+
+        Args:
+            ids (list, optional): IDs a marcar
+            filtro (dict, optional): Si no se pasan ids, criterios a cumplir:
+                'tipo', 'prioridad', 'socio_id', 'fecha_desde', 'fecha_hasta' (YYYY-MM-DD).
+                Sin ids ni filtro se marcan todas las pendientes.
+
+        Returns:
+            list: IDs que cambiaron de estado (para poder deshacer)
+        """
+        query = "UPDATE notificaciones SET leida = 1 WHERE leida = 0"
+        params = []
+        if ids is not None:
+            query += " AND id IN (SELECT value FROM json_each(?))"
+            params.append(f"[{','.join(str(int(i)) for i in ids)}]")
+        else:
+            filtro = filtro or {}
+            for campo in ('tipo', 'prioridad', 'socio_id'):
+                if filtro.get(campo) is not None:
+                    query += f" AND {campo} = ?"
+                    params.append(filtro[campo])
+            if filtro.get('fecha_desde'):
+                query += " AND fecha_creacion >= ?"
+                params.append(filtro['fecha_desde'])
+            if filtro.get('fecha_hasta'):
+                # fecha_creacion incluye la hora: se toma el día hasta completo
+                query += " AND fecha_creacion < date(?, '+1 day')"
+                params.append(filtro['fecha_hasta'])
+
+        c = conn.cursor()
+        c.execute(query + " RETURNING id", params)
+        return [fila[0] for fila in c.fetchall()]
+
+    def desmarcar_leidas(self, ids):
+        """Deshace un marcado: vuelve a dejar pendientes las notificaciones recibidas."""
         conn = self.conectar()
+        cantidad = self.desmarcar_leidas_en(conn, ids)
+        conn.commit()
+        conn.close()
+        return cantidad
+
+    def desmarcar_leidas_en(self, conn, ids):
+        """Igual que desmarcar_leidas, usando la conexión recibida, sin hacer commit."""
         c = conn.cursor()
-        
-        # Obtener último pago de cada socio
         c.execute("""
-            SELECT s.id, s.nombre, s.apellido, s.telefono,
-                   MAX(p.fecha_pago) as ultimo_pago,
-                   pl.duracion_dias
-            FROM socios s
-            LEFT JOIN pagos p ON s.id = p.socio_id
-            LEFT JOIN planes pl ON s.plan_id = pl.id
-            WHERE s.id NOT IN (
-                SELECT socio_id FROM notificaciones 
-                WHERE tipo = 'pago_vencido' 
-                AND leida = 0
-                AND DATE(fecha_creacion) = DATE('now')
-            )
-            GROUP BY s.id
-        """)
-        
-        socios = c.fetchall()
-        notificaciones_creadas = 0
-        
-        for socio in socios:
-            socio_id, nombre, apellido, telefono, ultimo_pago, duracion_dias = socio
-            
-            if not duracion_dias:
-                duracion_dias = 30  # Por defecto 30 días
-            
-            if ultimo_pago:
-                fecha_ultimo = datetime.strptime(ultimo_pago, '%Y-%m-%d')
-                dias_transcurridos = (datetime.now() - fecha_ultimo).days
-                
-                # Pago vencido (más de la duración del plan)
-                if dias_transcurridos > duracion_dias:
-                    dias_vencidos = dias_transcurridos - duracion_dias
-                    mensaje = f"Pago vencido hace {dias_vencidos} días. Último pago: {ultimo_pago}"
-                    self.crear_notificacion(socio_id, 'pago_vencido', mensaje, 'alta')
-                    notificaciones_creadas += 1
-                
-                # Próximo a vencer (5 días antes)
-                elif dias_transcurridos >= duracion_dias - 5:
-                    dias_restantes = duracion_dias - dias_transcurridos
-                    mensaje = f"El pago vence en {dias_restantes} días"
-                    self.crear_notificacion(socio_id, 'proximo_vencimiento', mensaje, 'media')
-                    notificaciones_creadas += 1
-            else:
-                # Socio sin pagos registrados
-                mensaje = "No tiene pagos registrados"
-                self.crear_notificacion(socio_id, 'sin_pagos', mensaje, 'alta')
-                notificaciones_creadas += 1
-        
+            UPDATE notificaciones SET leida = 0
+            WHERE leida = 1 AND id IN (SELECT value FROM json_each(?))
+        """, (f"[{','.join(str(int(i)) for i in ids)}]",))
+        return c.rowcount
+
+    def verificar_pagos_vencidos(self):
+        """
+        Verifica pagos vencidos y crea notificaciones automáticas.
+
+        Todos los socios se evalúan con un único INSERT ... SELECT en una sola
+        transacción, según la regla de su plan (ver AlertRulesModel): pago
+        vencido (pasados la duración del plan y los días de gracia desde el
+        último pago), próximo a vencer (dentro de los días de aviso) y sin
+        pagos registrados.
+        Cada aviso lleva la clave 'socio:tipo:vencimiento', así que volver a
+        verificar no repite los que ya existen (leídos o no) en el mismo ciclo.
+
+        Returns:
+            dict: Notificaciones creadas por tipo ('pago_vencido',
+                  'proximo_vencimiento', 'sin_pagos') y el 'total'
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL}
+            INSERT INTO notificaciones (socio_id, tipo, mensaje, fecha_creacion, prioridad, clave, rango)
+            SELECT
+                socio_id,
+                estado,
+                CASE WHEN estado = 'sin_pagos' THEN 'No tiene pagos registrados'
+                     WHEN estado = 'pago_vencido'
+                         THEN 'Pago vencido hace ' || (-dias_restantes)
+                              || ' días. Último pago: ' || ultimo_pago
+                     WHEN dias_restantes < 0
+                         THEN 'El pago venció hace ' || (-dias_restantes) || ' días (en período de gracia)'
+                     ELSE 'El pago vence en ' || dias_restantes || ' días' END,
+                strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'),
+                prioridad,
+                socio_id || ':' || estado || ':' || periodo,
+                {rango_sql('prioridad')}
+            FROM estados
+            WHERE estado IS NOT NULL
+            ORDER BY socio_id
+            ON CONFLICT(clave) DO NOTHING
+            RETURNING tipo
+        """, {'dias_aviso': None})
+        tipos = [fila[0] for fila in c.fetchall()]
+        conn.commit()
         conn.close()
-        return notificaciones_creadas
 
-    def limpiar_notificaciones_antiguas(self, dias=30):
-        """Elimina notificaciones leídas con más de X días."""
+        cantidades = {tipo: tipos.count(tipo) for tipo in ('pago_vencido', 'proximo_vencimiento', 'sin_pagos')}
+        cantidades['total'] = len(tipos)
+        return cantidades
+
+    def obtener_recordatorios_pendientes(self):
+        """
+        Avisos de pago vencido sin leer cuyo socio tiene email y todavía no
+        recibió el recordatorio.
+
+        Returns:
+            list: Tuplas (notificacion_id, email, socio, dias_vencido, ultimo_pago)
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL}
+            SELECT n.id, s.email, s.nombre || ' ' || s.apellido,
+                   e.dias_transcurridos - e.duracion, e.ultimo_pago
+            FROM notificaciones n
+            JOIN socios s ON s.id = n.socio_id
+            JOIN estados e ON e.socio_id = n.socio_id
+            WHERE n.tipo = 'pago_vencido'
+            AND n.leida = 0
+            AND n.recordatorio_enviado IS NULL
+            AND TRIM(COALESCE(s.email, '')) <> ''
+            AND e.estado = 'pago_vencido'  -- Si ya pagó, no se le recuerda
+            ORDER BY n.id
+        """, {'dias_aviso': None})
+        pendientes = c.fetchall()
+        conn.close()
+        return pendientes
+
+    def marcar_recordatorios_enviados(self, ids):
+        """Registra la fecha de envío del recordatorio de las notificaciones recibidas."""
         conn = self.conectar()
         c = conn.cursor()
-        fecha_limite = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
-        
         c.execute("""
-            DELETE FROM notificaciones 
-            WHERE leida = 1 
-            AND DATE(fecha_creacion) < ?
-        """, (fecha_limite,))
-        
-        eliminadas = c.rowcount
+            UPDATE notificaciones
+            SET recordatorio_enviado = strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')
+            WHERE id IN (SELECT value FROM json_each(?))
+        """, (f"[{','.join(str(int(i)) for i in ids)}]",))
+        cantidad = c.rowcount
         conn.commit()
         conn.close()
-        return eliminadas
+        return cantidad
+
+    def limpiar_notificaciones_antiguas(self, dias=None, progreso=None):
+        """
+        Elimina de a lotes las notificaciones leídas con más de X días
+        (por defecto los de su política de retención, ver RetentionModel).
+        """
+        return RetentionModel(self.db_path).depurar_tabla('notificaciones', dias, progreso)
 
     def obtener_estadisticas(self):
-        """Obtiene estadísticas de notificaciones."""
+        """
+        Obtiene estadísticas de notificaciones desde los contadores.
+
+        Returns:
+            dict: 'total', 'pendientes', 'urgentes' y 'por_tipo' (pendientes por tipo)
+        """
         conn = self.conectar()
         c = conn.cursor()
-        
-        c.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN leida = 0 THEN 1 ELSE 0 END) as pendientes,
-                SUM(CASE WHEN prioridad = 'alta' AND leida = 0 THEN 1 ELSE 0 END) as urgentes
-            FROM notificaciones
-        """)
-        
-        stats = c.fetchone()
+        c.execute("SELECT clave, cantidad FROM notificaciones_contadores")
+        contadores = dict(c.fetchall())
         conn.close()
         return {
-            'total': stats[0],
-            'pendientes': stats[1],
-            'urgentes': stats[2]
-        }
\ No newline at end of file
+            'total': contadores.get('total', 0),
+            'pendientes': contadores.get('pendientes', 0),
+            'urgentes': contadores.get('urgentes', 0),
+            'por_tipo': {
+                clave[5:]: cantidad for clave, cantidad in contadores.items()
+                if clave.startswith('tipo:') and cantidad
+            }
+        }
+
+    def verificar_contadores(self):
+        """Recalcula los contadores contando la tabla (ver verificar_contadores_en)."""
+        conn = self.conectar()
+        corregidos = self.verificar_contadores_en(conn)
+        conn.commit()
+        conn.close()
+        return corregidos
+
+    def verificar_contadores_en(self, conn):
+        """
+        Cuenta de nuevo la tabla y corrige los contadores que no coinciden,
+        usando la conexión recibida, sin hacer commit.
+
+        Returns:
+            dict: Contadores corregidos {clave: (valor anterior, valor real)}
+        """
+        c = conn.cursor()
+        c.execute("""
+            SELECT 'total', COUNT(*) FROM notificaciones
+            UNION ALL
+            SELECT 'pendientes', COUNT(*) FROM notificaciones WHERE leida = 0
+            UNION ALL
+            SELECT 'urgentes', COUNT(*) FROM notificaciones WHERE leida = 0 AND rango = 1
+            UNION ALL
+            SELECT 'tipo:' || tipo, COUNT(*) FROM notificaciones WHERE leida = 0 GROUP BY tipo
+        """)
+        reales = dict(c.fetchall())
+        c.execute("SELECT clave, cantidad FROM notificaciones_contadores")
+        guardados = dict(c.fetchall())
+
+        corregidos = {
+            clave: (guardados.get(clave), reales.get(clave, 0))
+            for clave in reales.keys() | guardados.keys()
+            if guardados.get(clave) != reales.get(clave, 0)
+        }
+        if corregidos:
+            c.executemany("""
+                INSERT INTO notificaciones_contadores (clave, cantidad) VALUES (?, ?)
+                ON CONFLICT(clave) DO UPDATE SET cantidad = excluded.cantidad
+            """, [(clave, real) for clave, (_, real) in corregidos.items()])
+        return corregidos
@@ -3,14 +3,23 @@ models/payments_model.py
 Modelo completo para la gestión de pagos de socios.
 """
 
+import json
 import sqlite3
 from datetime import datetime, timedelta
 
+from models.alert_rules import AlertRulesModel, ESTADOS_PAGO_SQL
+
+
+# Orden de los valores empaquetados en pagos_auditoria (antes / despues)
+CAMPOS_AUDITORIA = ('socio_id', 'monto', 'fecha_pago', 'mes_correspondiente', 'metodo_pago', 'observaciones')
+
 
 class PaymentsModel:
     def __init__(self, db_path):
         self.db_path = db_path
         self._verificar_tabla()
+        # Las reglas de gracia por plan (ESTADOS_PAGO_SQL las necesita)
+        self.reglas = AlertRulesModel(db_path)
 
     def _verificar_tabla(self):
         """Verifica que la tabla de pagos exista."""
@@ -28,26 +37,223 @@ class PaymentsModel:
                 FOREIGN KEY(socio_id) REFERENCES socios(id)
             )
         """)
+        # Índice cubriente para "último pago por socio" y análisis por socio
+        c.execute("CREATE INDEX IF NOT EXISTS idx_pagos_socio_fecha ON pagos(socio_id, fecha_pago, monto)")
+        conn.commit()
+        conn.close()
+        self._crear_resumen_mensual()
+        self._crear_auditoria()
+
+    def _crear_resumen_mensual(self):
+        """
+        Crea los contadores incrementales por mes (según fecha_pago).
+        Los triggers los mantienen al registrar, editar o eliminar pagos,
+        así las tarjetas de estadísticas no recorren toda la tabla.
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pagos_resumen_mes'")
+        existia = c.fetchone() is not None
+
+        c.executescript("""
+            CREATE TABLE IF NOT EXISTS pagos_resumen_mes (
+                mes TEXT PRIMARY KEY,
+                total_pagos INTEGER NOT NULL DEFAULT 0,
+                total_ingresos REAL NOT NULL DEFAULT 0,
+                socios_pagaron INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS pagos_resumen_socio (
+                mes TEXT NOT NULL,
+                socio_id INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (mes, socio_id)
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_resumen_insert
+            AFTER INSERT ON pagos
+            BEGIN
+                INSERT INTO pagos_resumen_socio (mes, socio_id, cantidad)
+                VALUES (substr(NEW.fecha_pago, 1, 7), NEW.socio_id, 1)
+                ON CONFLICT(mes, socio_id) DO UPDATE SET cantidad = cantidad + 1;
+
+                INSERT INTO pagos_resumen_mes (mes, total_pagos, total_ingresos, socios_pagaron)
+                VALUES (substr(NEW.fecha_pago, 1, 7), 1, NEW.monto, 1)
+                ON CONFLICT(mes) DO UPDATE SET
+                    total_pagos = total_pagos + 1,
+                    total_ingresos = total_ingresos + NEW.monto,
+                    socios_pagaron = socios_pagaron + (
+                        SELECT cantidad = 1 FROM pagos_resumen_socio
+                        WHERE mes = substr(NEW.fecha_pago, 1, 7) AND socio_id = NEW.socio_id
+                    );
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_resumen_delete
+            AFTER DELETE ON pagos
+            BEGIN
+                UPDATE pagos_resumen_socio SET cantidad = cantidad - 1
+                WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id;
+
+                UPDATE pagos_resumen_mes SET
+                    total_pagos = total_pagos - 1,
+                    total_ingresos = total_ingresos - OLD.monto,
+                    socios_pagaron = socios_pagaron - COALESCE((
+                        SELECT cantidad <= 0 FROM pagos_resumen_socio
+                        WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id
+                    ), 0)
+                WHERE mes = substr(OLD.fecha_pago, 1, 7);
+
+                DELETE FROM pagos_resumen_socio
+                WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id AND cantidad <= 0;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_resumen_update
+            AFTER UPDATE OF monto, fecha_pago, socio_id ON pagos
+            BEGIN
+                -- Se descuenta la fila vieja y se suma la nueva
+                UPDATE pagos_resumen_socio SET cantidad = cantidad - 1
+                WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id;
+
+                UPDATE pagos_resumen_mes SET
+                    total_pagos = total_pagos - 1,
+                    total_ingresos = total_ingresos - OLD.monto,
+                    socios_pagaron = socios_pagaron - COALESCE((
+                        SELECT cantidad <= 0 FROM pagos_resumen_socio
+                        WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id
+                    ), 0)
+                WHERE mes = substr(OLD.fecha_pago, 1, 7);
+
+                DELETE FROM pagos_resumen_socio
+                WHERE mes = substr(OLD.fecha_pago, 1, 7) AND socio_id = OLD.socio_id AND cantidad <= 0;
+
+                INSERT INTO pagos_resumen_socio (mes, socio_id, cantidad)
+                VALUES (substr(NEW.fecha_pago, 1, 7), NEW.socio_id, 1)
+                ON CONFLICT(mes, socio_id) DO UPDATE SET cantidad = cantidad + 1;
+
+                INSERT INTO pagos_resumen_mes (mes, total_pagos, total_ingresos, socios_pagaron)
+                VALUES (substr(NEW.fecha_pago, 1, 7), 1, NEW.monto, 1)
+                ON CONFLICT(mes) DO UPDATE SET
+                    total_pagos = total_pagos + 1,
+                    total_ingresos = total_ingresos + NEW.monto,
+                    socios_pagaron = socios_pagaron + (
+                        SELECT cantidad = 1 FROM pagos_resumen_socio
+                        WHERE mes = substr(NEW.fecha_pago, 1, 7) AND socio_id = NEW.socio_id
+                    );
+            END;
+        """)
+
+        # Primera vez: cargar los contadores con el historial existente
+        if not existia:
+            self.recalcular_resumen_en(conn)
+        conn.commit()
+        conn.close()
+
+    def _crear_auditoria(self):
+        """
+        Crea el registro de auditoría de pagos (solo agregado).
+        Los triggers guardan cada edición y eliminación con los valores de antes
+        y de después empaquetados en un arreglo JSON (ver CAMPOS_AUDITORIA).
+        socio_id es el dueño del pago antes del cambio y socio_id_nuevo el de
+        después (NULL en las eliminaciones), así un pago que pasa a otro socio
+        (por ejemplo al fusionar duplicados) figura en el historial de los dos.
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("PRAGMA table_info(pagos_auditoria)")
+        columnas = [col[1] for col in c.fetchall()]
+        if columnas and 'socio_id_nuevo' not in columnas:
+            # Los triggers viejos no guardan el socio nuevo; el de solo agregado se
+            # quita un momento para completar los registros existentes
+            c.executescript("""
+                ALTER TABLE pagos_auditoria ADD COLUMN socio_id_nuevo INTEGER;
+                DROP TRIGGER IF EXISTS trg_pagos_auditoria_update;
+                DROP TRIGGER IF EXISTS trg_pagos_auditoria_no_update;
+                UPDATE pagos_auditoria SET socio_id_nuevo = json_extract(despues, '$[0]')
+                WHERE operacion = 'UPDATE';
+            """)
+
+        c.executescript("""
+            CREATE TABLE IF NOT EXISTS pagos_auditoria (
+                id INTEGER PRIMARY KEY,
+                pago_id INTEGER NOT NULL,
+                socio_id INTEGER NOT NULL,
+                socio_id_nuevo INTEGER,
+                operacion TEXT NOT NULL,
+                fecha TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+                antes TEXT NOT NULL,
+                despues TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_pagos_auditoria_pago ON pagos_auditoria(pago_id);
+            CREATE INDEX IF NOT EXISTS idx_pagos_auditoria_socio ON pagos_auditoria(socio_id, fecha);
+            CREATE INDEX IF NOT EXISTS idx_pagos_auditoria_socio_nuevo ON pagos_auditoria(socio_id_nuevo, fecha);
+            CREATE INDEX IF NOT EXISTS idx_pagos_auditoria_fecha ON pagos_auditoria(fecha);
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_auditoria_update
+            AFTER UPDATE ON pagos
+            WHEN OLD.socio_id IS NOT NEW.socio_id OR OLD.monto IS NOT NEW.monto
+              OR OLD.fecha_pago IS NOT NEW.fecha_pago
+              OR OLD.mes_correspondiente IS NOT NEW.mes_correspondiente
+              OR OLD.metodo_pago IS NOT NEW.metodo_pago
+              OR OLD.observaciones IS NOT NEW.observaciones
+            BEGIN
+                INSERT INTO pagos_auditoria (pago_id, socio_id, socio_id_nuevo, operacion, antes, despues)
+                VALUES (
+                    OLD.id, OLD.socio_id, NEW.socio_id, 'UPDATE',
+                    json_array(OLD.socio_id, OLD.monto, OLD.fecha_pago, OLD.mes_correspondiente,
+                               OLD.metodo_pago, OLD.observaciones),
+                    json_array(NEW.socio_id, NEW.monto, NEW.fecha_pago, NEW.mes_correspondiente,
+                               NEW.metodo_pago, NEW.observaciones)
+                );
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_auditoria_delete
+            AFTER DELETE ON pagos
+            BEGIN
+                INSERT INTO pagos_auditoria (pago_id, socio_id, operacion, antes)
+                VALUES (
+                    OLD.id, OLD.socio_id, 'DELETE',
+                    json_array(OLD.socio_id, OLD.monto, OLD.fecha_pago, OLD.mes_correspondiente,
+                               OLD.metodo_pago, OLD.observaciones)
+                );
+            END;
+
+            -- El registro no se edita ni se borra
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_auditoria_no_update
+            BEFORE UPDATE ON pagos_auditoria
+            BEGIN
+                SELECT RAISE(ABORT, 'El registro de auditoría de pagos no se puede modificar');
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_pagos_auditoria_no_delete
+            BEFORE DELETE ON pagos_auditoria
+            BEGIN
+                SELECT RAISE(ABORT, 'El registro de auditoría de pagos no se puede modificar');
+            END;
+        """)
         conn.commit()
         conn.close()
 
     def registrar_pago(self, socio_id, monto, mes_correspondiente, metodo_pago='efectivo', observaciones=''):
         """Registra un nuevo pago."""
         conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        pago_id = self.insertar_pago(conn, socio_id, monto, mes_correspondiente, metodo_pago, observaciones)
+        conn.commit()
+        conn.close()
         
+        return pago_id
+
+    def insertar_pago(self, conn, socio_id, monto, mes_correspondiente, metodo_pago='efectivo', observaciones=''):
+        """Inserta un pago usando la conexión recibida, sin hacer commit."""
         fecha_pago = datetime.now().strftime('%Y-%m-%d')
         
+        c = conn.cursor()
         c.execute("""
             INSERT INTO pagos (socio_id, monto, fecha_pago, mes_correspondiente, metodo_pago, observaciones)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (socio_id, monto, fecha_pago, mes_correspondiente, metodo_pago, observaciones))
         
-        conn.commit()
-        pago_id = c.lastrowid
-        conn.close()
-        
-        return pago_id
+        return c.lastrowid
 
     def obtener_pagos(self):
         """Obtiene todos los pagos con información del socio."""
@@ -138,6 +344,71 @@ class PaymentsModel:
         conn.commit()
         conn.close()
 
+    def obtener_auditoria(self, pago_id=None, socio_id=None, fecha_desde=None, fecha_hasta=None, limite=500):
+        """
+        Consulta el registro de auditoría de pagos, del cambio más reciente al más antiguo.
+
+        Args:
+            pago_id (int, optional): Filtrar por pago
+            socio_id (int, optional): Filtrar por socio (dueño del pago antes o después del cambio)
+            fecha_desde (str, optional): Fecha de inicio (YYYY-MM-DD)
+            fecha_hasta (str, optional): Fecha de fin (YYYY-MM-DD), inclusive
+            limite (int, optional): Máximo de registros a devolver
+
+        Returns:
+            list: Diccionarios con id, pago_id, socio_id, socio_id_nuevo, operacion,
+                  fecha, antes y despues (dict con CAMPOS_AUDITORIA, o None)
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+
+        query = """
+            SELECT id, pago_id, socio_id, operacion, fecha, antes, despues, socio_id_nuevo
+            FROM pagos_auditoria
+            WHERE 1=1
+        """
+        params = []
+
+        if pago_id is not None:
+            query += " AND pago_id = ?"
+            params.append(pago_id)
+
+        if socio_id is not None:
+            query += " AND (socio_id = ? OR socio_id_nuevo = ?)"
+            params.extend([socio_id, socio_id])
+
+        if fecha_desde:
+            query += " AND fecha >= ?"
+            params.append(fecha_desde)
+
+        if fecha_hasta:
+            # fecha incluye la hora: se compara contra el día siguiente
+            query += " AND fecha < date(?, '+1 day')"
+            params.append(fecha_hasta)
+
+        query += " ORDER BY fecha DESC, id DESC"
+        if limite:
+            query += " LIMIT ?"
+            params.append(limite)
+
+        c.execute(query, params)
+        registros = [
+            {
+                'id': fila[0],
+                'pago_id': fila[1],
+                'socio_id': fila[2],
+                'socio_id_nuevo': fila[7],
+                'operacion': fila[3],
+                'fecha': fila[4],
+                'antes': dict(zip(CAMPOS_AUDITORIA, json.loads(fila[5]))),
+                'despues': dict(zip(CAMPOS_AUDITORIA, json.loads(fila[6]))) if fila[6] else None
+            }
+            for fila in c.fetchall()
+        ]
+        conn.close()
+
+        return registros
+
     def obtener_pagos_filtrados(self, socio_id=None, fecha_desde=None, fecha_hasta=None, mes=None, anio=None):
         """Obtiene pagos con filtros específicos."""
         conn = sqlite3.connect(self.db_path)
@@ -241,6 +512,67 @@ class PaymentsModel:
             'socios_pagaron': stats[3] or 0
         }
 
+    def obtener_resumen_mes(self, mes=None):
+        """
+        Lee los contadores incrementales de un mes (YYYY-MM, por defecto el actual).
+        Devuelve las mismas claves que obtener_estadisticas_pagos.
+        """
+        mes = mes or datetime.now().strftime('%Y-%m')
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        
+        c.execute("""
+            SELECT total_pagos, total_ingresos, socios_pagaron
+            FROM pagos_resumen_mes
+            WHERE mes = ?
+        """, (mes,))
+        
+        fila = c.fetchone()
+        conn.close()
+        
+        total_pagos, total_ingresos, socios_pagaron = fila or (0, 0, 0)
+        return {
+            'total_pagos': total_pagos,
+            'total_ingresos': total_ingresos,
+            'promedio_pago': total_ingresos / total_pagos if total_pagos else 0,
+            'socios_pagaron': socios_pagaron
+        }
+
+    def recalcular_resumen_mes(self, mes=None):
+        """Corrige los contadores de un mes (o de todos) recalculándolos desde pagos."""
+        conn = sqlite3.connect(self.db_path)
+        self.recalcular_resumen_en(conn, mes)
+        conn.commit()
+        conn.close()
+
+    def recalcular_resumen_en(self, conn, mes=None):
+        """Recalcula los contadores usando la conexión recibida, sin hacer commit."""
+        filtro = "WHERE substr(fecha_pago, 1, 7) = ?" if mes else ""
+        params = (mes,) if mes else ()
+        
+        c = conn.cursor()
+        if mes:
+            c.execute("DELETE FROM pagos_resumen_socio WHERE mes = ?", params)
+            c.execute("DELETE FROM pagos_resumen_mes WHERE mes = ?", params)
+        else:
+            c.execute("DELETE FROM pagos_resumen_socio")
+            c.execute("DELETE FROM pagos_resumen_mes")
+        
+        c.execute(f"""
+            INSERT INTO pagos_resumen_socio (mes, socio_id, cantidad)
+            SELECT substr(fecha_pago, 1, 7), socio_id, COUNT(*)
+            FROM pagos
+            {filtro}
+            GROUP BY 1, 2
+        """, params)
+        c.execute(f"""
+            INSERT INTO pagos_resumen_mes (mes, total_pagos, total_ingresos, socios_pagaron)
+            SELECT substr(fecha_pago, 1, 7), COUNT(*), SUM(monto), COUNT(DISTINCT socio_id)
+            FROM pagos
+            {filtro}
+            GROUP BY 1
+        """, params)
+
     def obtener_pagos_por_metodo(self, fecha_desde=None, fecha_hasta=None):
         """Obtiene el total de pagos agrupados por método."""
         conn = sqlite3.connect(self.db_path)
@@ -291,21 +623,21 @@ class PaymentsModel:
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
         
-        c.execute("""
+        # Mismo criterio de vencimiento y gracia que los avisos
+        c.execute(f"""
+            WITH {ESTADOS_PAGO_SQL}
             SELECT 
                 s.id,
                 s.nombre || ' ' || s.apellido AS socio,
                 s.telefono,
-                MAX(p.fecha_pago) as ultimo_pago,
-                COALESCE(pl.duracion_dias, 30) as duracion,
-                julianday('now') - julianday(MAX(p.fecha_pago)) as dias_sin_pagar
-            FROM socios s
-            LEFT JOIN pagos p ON s.id = p.socio_id
-            LEFT JOIN planes pl ON s.plan_id = pl.id
-            GROUP BY s.id
-            HAVING dias_sin_pagar > duracion OR ultimo_pago IS NULL
+                e.ultimo_pago,
+                e.duracion,
+                e.dias_transcurridos AS dias_sin_pagar
+            FROM estados e
+            JOIN socios s ON s.id = e.socio_id
+            WHERE e.estado IN ('sin_pagos', 'pago_vencido')
             ORDER BY dias_sin_pagar DESC
-        """)
+        """, {'dias_aviso': None})
         
         deudores = c.fetchall()
         conn.close()
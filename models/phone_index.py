@@ -0,0 +1,144 @@
+"""
+models/phone_index.py
+Teléfonos de los socios normalizados a E.164 ("+5491144445555") en la columna
+socios.telefono_norm, para buscar, detectar duplicados y enviar mensajes sin
+volver a limpiar el número cada vez.
+La aplicación guarda el valor al insertar y al editar; si otro código cambia
+el teléfono sin actualizarlo, un trigger lo deja pendiente (NULL) y se
+recalcula en la próxima sincronización (una tarea programada, nunca durante
+una búsqueda).
+"""
+
+import re
+import sqlite3
+
+
+# Celulares argentinos: 54 + 9 + código de área + número (10 dígitos entre los dos)
+CODIGO_PAIS = "54"
+DIGITOS_NACIONALES = 10
+
+
+def normalizar_telefono(telefono):
+    """
+    Lleva un teléfono al formato E.164 que usa WhatsApp.
+
+    Acepta las formas habituales de escribir un celular argentino
+    ("11 4444-5555", "011 15 4444-5555", "+54 9 11 4444 5555", "5491144445555").
+    Los números con prefijo internacional de otro país se conservan tal cual.
+
+    Returns:
+        str: "+549XXXXXXXXXX", o "" si el número no se puede interpretar
+    """
+    texto = str(telefono or '').strip()
+    digitos = re.sub(r'\D', '', texto)
+    internacional = texto.startswith('+') or digitos.startswith('00')
+    if digitos.startswith('00'):
+        digitos = digitos[2:]
+
+    if internacional and not digitos.startswith(CODIGO_PAIS):
+        return f"+{digitos}" if 8 <= len(digitos) <= 15 else ""
+
+    # Ningún código de área argentino empieza con 5: un 54 adelante es el código de país
+    if digitos.startswith(CODIGO_PAIS) and (internacional or len(digitos) > DIGITOS_NACIONALES + 1):
+        digitos = digitos[len(CODIGO_PAIS):]
+        if len(digitos) == DIGITOS_NACIONALES + 1 and digitos.startswith('9'):
+            digitos = digitos[1:]
+
+    # Prefijo de larga distancia
+    if digitos.startswith('0'):
+        digitos = digitos[1:]
+
+    # "15" de celular después del código de área (de 2, 3 o 4 dígitos)
+    if len(digitos) == DIGITOS_NACIONALES + 2:
+        for largo_area in (2, 3, 4):
+            if digitos[largo_area:largo_area + 2] == '15':
+                digitos = digitos[:largo_area] + digitos[largo_area + 2:]
+                break
+
+    if len(digitos) != DIGITOS_NACIONALES:
+        return ""
+    return f"+{CODIGO_PAIS}9{digitos}"
+
+
+def guardar_telefono_en(conn, socio_id, telefono):
+    """
+    Guarda el teléfono normalizado de un socio usando la conexión recibida, sin
+    hacer commit. Va en una sentencia aparte, después de la que cambia el
+    teléfono: el trigger no distingue si esa sentencia traía telefono_norm y,
+    si el valor normalizado no cambió (solo cambió el formato), lo deja en NULL.
+    """
+    conn.execute("UPDATE socios SET telefono_norm = ? WHERE id = ?",
+                 (normalizar_telefono(telefono), socio_id))
+
+
+def parece_telefono(texto):
+    """True si el texto está formado solo por caracteres de un teléfono y tiene dígitos."""
+    return bool(re.fullmatch(r'[\d\s()+\-./]*\d[\d\s()+\-./]*', texto or ''))
+
+
+class PhoneIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.crear_columna()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_columna(self):
+        """Agrega telefono_norm a socios, su índice y el trigger, y completa los pendientes."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("PRAGMA table_info(socios)")
+        columnas = [col[1] for col in c.fetchall()]
+        if 'telefono_norm' not in columnas:
+            # NULL = pendiente de normalizar; '' = teléfono vacío o no interpretable
+            c.execute("ALTER TABLE socios ADD COLUMN telefono_norm TEXT")
+
+        # No es único: hay familias que comparten un mismo número
+        c.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_socios_telefono_norm ON socios(telefono_norm);
+
+            CREATE TRIGGER IF NOT EXISTS trg_socios_telefono_norm
+            AFTER UPDATE OF telefono ON socios
+            WHEN NEW.telefono IS NOT OLD.telefono AND NEW.telefono_norm IS OLD.telefono_norm
+            BEGIN
+                UPDATE socios SET telefono_norm = NULL WHERE id = NEW.id;
+            END;
+        """)
+
+        self.sincronizar(conn)
+        conn.commit()
+        conn.close()
+
+    def sincronizar(self, conn):
+        """Normaliza los teléfonos pendientes usando la conexión recibida, sin hacer commit."""
+        c = conn.cursor()
+        c.execute("SELECT id, telefono FROM socios WHERE telefono_norm IS NULL")
+        pendientes = [(normalizar_telefono(telefono), socio_id) for socio_id, telefono in c.fetchall()]
+        if pendientes:
+            c.executemany("UPDATE socios SET telefono_norm = ? WHERE id = ?", pendientes)
+        return len(pendientes)
+
+    def buscar_en(self, conn, telefono):
+        """
+        IDs de los socios con ese teléfono, escrito de cualquier forma.
+        Solo lee: los pendientes de normalizar se completan en sincronizar.
+
+        Returns:
+            list: IDs de socios (vacía si el número no se puede interpretar)
+        """
+        normalizado = normalizar_telefono(telefono)
+        if not normalizado:
+            return []
+
+        c = conn.cursor()
+        c.execute("SELECT id FROM socios WHERE telefono_norm = ? ORDER BY id", (normalizado,))
+        return [fila[0] for fila in c.fetchall()]
+
+    def buscar(self, telefono):
+        """Igual que buscar_en, con su propia conexión."""
+        conn = self.conectar()
+        try:
+            return self.buscar_en(conn, telefono)
+        finally:
+            conn.close()
@@ -0,0 +1,107 @@
+"""
+models/photo_store.py
+Fotos de los socios guardadas fuera de la base, con nombre igual al hash de
+su contenido (la misma foto se guarda una sola vez). Al guardar se genera
+también la miniatura; las fotos ya decodificadas se sirven desde un caché
+LRU de tamaño acotado.
+En socios solo queda el hash (columna foto).
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPixmap
+
+
+class PhotoStore:
+    def __init__(self, carpeta="Fotos Socios", lado_maximo=800, lado_miniatura=48, capacidad_cache=300):
+        """
+        Args:
+            carpeta (str): Carpeta donde se guardan las fotos
+            lado_maximo (int): Lado mayor de la foto guardada, en píxeles
+            lado_miniatura (int): Lado de las miniaturas de la tabla de socios
+            capacidad_cache (int): Imágenes decodificadas que se mantienen en memoria
+        """
+        self.carpeta = carpeta
+        self.lado_maximo = lado_maximo
+        self.lado_miniatura = lado_miniatura
+        self.capacidad_cache = capacidad_cache
+        self._cache = OrderedDict()
+
+    def ruta_foto(self, foto_hash):
+        # Subcarpeta por los dos primeros caracteres para no llenar un solo directorio
+        return os.path.join(self.carpeta, foto_hash[:2], f"{foto_hash}.jpg")
+
+    def ruta_miniatura(self, foto_hash):
+        return os.path.join(self.carpeta, foto_hash[:2], f"{foto_hash}_min.jpg")
+
+    def guardar(self, ruta_origen):
+        """
+        Guarda una foto (reducida a lado_maximo) y su miniatura.
+
+        Returns:
+            str: Hash SHA-256 del archivo original, que identifica a la foto
+
+        Raises:
+            ValueError: Si el archivo no es una imagen válida
+        """
+        with open(ruta_origen, 'rb') as f:
+            contenido = f.read()
+        foto_hash = hashlib.sha256(contenido).hexdigest()
+
+        ruta = self.ruta_foto(foto_hash)
+        ruta_min = self.ruta_miniatura(foto_hash)
+        if os.path.exists(ruta) and os.path.exists(ruta_min):
+            return foto_hash
+
+        imagen = QImage.fromData(contenido)
+        if imagen.isNull():
+            raise ValueError("El archivo no es una imagen válida")
+
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        if max(imagen.width(), imagen.height()) > self.lado_maximo:
+            imagen = imagen.scaled(self.lado_maximo, self.lado_maximo,
+                                   Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        imagen.save(ruta, "JPG", 90)
+
+        # Miniatura cuadrada, recortada al centro
+        miniatura = imagen.scaled(self.lado_miniatura, self.lado_miniatura,
+                                  Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        x = (miniatura.width() - self.lado_miniatura) // 2
+        y = (miniatura.height() - self.lado_miniatura) // 2
+        miniatura.copy(x, y, self.lado_miniatura, self.lado_miniatura).save(ruta_min, "JPG", 85)
+
+        # Por si antes se pidió y quedó en el caché como imagen vacía
+        self._cache.pop((foto_hash, True), None)
+        self._cache.pop((foto_hash, False), None)
+        return foto_hash
+
+    def eliminar(self, foto_hash):
+        """Borra la foto y su miniatura (las que existan) y las saca del caché."""
+        for ruta in (self.ruta_foto(foto_hash), self.ruta_miniatura(foto_hash)):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        self._cache.pop((foto_hash, True), None)
+        self._cache.pop((foto_hash, False), None)
+
+    def pixmap(self, foto_hash, miniatura=True):
+        """
+        Devuelve la foto (o su miniatura) decodificada, desde el caché si está.
+
+        Returns:
+            QPixmap: Imagen; nula si el archivo no existe
+        """
+        clave = (foto_hash, miniatura)
+        if clave in self._cache:
+            self._cache.move_to_end(clave)
+            return self._cache[clave]
+
+        pixmap = QPixmap(self.ruta_miniatura(foto_hash) if miniatura else self.ruta_foto(foto_hash))
+        self._cache[clave] = pixmap
+        if len(self._cache) > self.capacidad_cache:
+            self._cache.popitem(last=False)
+        return pixmap
@@ -3,9 +3,14 @@ models/plans_model.py
 Modelo para la gestión de planes del gimnasio.
 """
 
+import json
 import sqlite3
 
 
+# Vigencia asignada al precio que ya tenía un plan antes de existir el historial
+VIGENTE_DESDE_INICIAL = "1900-01-01"
+
+
 class PlansModel:
     def __init__(self, db_path):
         self.db_path = db_path
@@ -25,9 +30,52 @@ class PlansModel:
                 duracion_dias INTEGER NOT NULL
             )
         """)
+        self._crear_historial_precios(c)
         conn.commit()
         conn.close()
 
+    def _crear_historial_precios(self, c):
+        """
+        Historial de precios por plan. La clave (plan_id, vigente_desde) es el
+        índice de la búsqueda "precio vigente a una fecha". Los triggers registran
+        cada alta y cada cambio de precio, venga de donde venga la escritura.
+        """
+        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='planes_precios'")
+        existia = c.fetchone() is not None
+
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS planes_precios (
+                plan_id INTEGER NOT NULL,
+                vigente_desde TEXT NOT NULL,
+                precio REAL NOT NULL,
+                PRIMARY KEY (plan_id, vigente_desde)
+            ) WITHOUT ROWID
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_planes_precio_insert
+            AFTER INSERT ON planes
+            BEGIN
+                INSERT OR REPLACE INTO planes_precios (plan_id, vigente_desde, precio)
+                VALUES (NEW.id, date('now', 'localtime'), NEW.precio);
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_planes_precio_update
+            AFTER UPDATE OF precio ON planes
+            WHEN NEW.precio IS NOT OLD.precio
+            BEGIN
+                INSERT OR REPLACE INTO planes_precios (plan_id, vigente_desde, precio)
+                VALUES (NEW.id, date('now', 'localtime'), NEW.precio);
+            END
+        """)
+
+        if not existia:
+            # Los planes existentes arrancan con su precio actual como vigente desde siempre
+            c.execute("""
+                INSERT OR IGNORE INTO planes_precios (plan_id, vigente_desde, precio)
+                SELECT id, ?, precio FROM planes
+            """, (VIGENTE_DESDE_INICIAL,))
+
     def agregar_plan(self, nombre, precio, duracion_dias):
         conn = self.conectar()
         c = conn.cursor()
@@ -61,3 +109,61 @@ class PlansModel:
         """, (nombre, precio, duracion_dias, plan_id))
         conn.commit()
         conn.close()
+
+    # === HISTORIAL DE PRECIOS ===
+
+    def obtener_historial_precios(self, plan_id):
+        """Devuelve los precios de un plan como (vigente_desde, precio), del más reciente al más antiguo."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT vigente_desde, precio
+            FROM planes_precios
+            WHERE plan_id = ?
+            ORDER BY vigente_desde DESC
+        """, (plan_id,))
+        data = c.fetchall()
+        conn.close()
+        return data
+
+    def precio_vigente(self, plan_id, fecha):
+        """Devuelve el precio que tenía un plan en una fecha (o None si el plan no existe)."""
+        return self.precios_vigentes([(plan_id, fecha)])[0]
+
+    def precios_vigentes(self, pares):
+        """
+        Devuelve el precio vigente para muchos pares (plan, fecha) en una sola consulta.
+
+        Cada par se resuelve con una búsqueda en la clave (plan_id, vigente_desde).
+        Para fechas anteriores al primer precio registrado se usa ese primer precio.
+
+        Args:
+            pares (list): Tuplas (plan_id, fecha), con fecha 'YYYY-MM-DD' o date
+
+        Returns:
+            list: Precios en el mismo orden que los pares (None si el plan no tiene precios)
+        """
+        if not pares:
+            return []
+
+        # Los pares viajan como un único parámetro JSON (sin límite de variables)
+        datos = json.dumps([[plan_id, str(fecha)[:10]] for plan_id, fecha in pares])
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT COALESCE(
+                (SELECT pp.precio FROM planes_precios pp
+                 WHERE pp.plan_id = json_extract(j.value, '$[0]')
+                   AND pp.vigente_desde <= json_extract(j.value, '$[1]')
+                 ORDER BY pp.vigente_desde DESC LIMIT 1),
+                (SELECT pp.precio FROM planes_precios pp
+                 WHERE pp.plan_id = json_extract(j.value, '$[0]')
+                 ORDER BY pp.vigente_desde LIMIT 1)
+            )
+            FROM json_each(?) j
+            ORDER BY j.key
+        """, (datos,))
+        precios = [fila[0] for fila in c.fetchall()]
+        conn.close()
+        return precios
@@ -0,0 +1,254 @@
+"""
+models/retention_model.py
+Depuración de registros viejos por tabla, según políticas de retención
+guardadas en la tabla retencion.
+Se borra de a lotes chicos (cada uno en su propia transacción) recorriendo
+la tabla por tramos de rowid, para no bloquear la base mientras se depura ni
+agregarle índices de fecha: los registros se agregan en orden cronológico,
+así que al llegar a un tramo sin registros viejos se termina.
+Tablas, columnas y condiciones salen de POLITICAS (en el código); de la tabla
+retencion solo se leen los días a conservar y si la política está activa.
+El registro de auditoría de pagos (pagos_auditoria) no se depura: es de
+solo agregado y sus triggers impiden borrarlo.
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from models.alert_rules import ESTADOS_PAGO_SQL
+
+
+# Políticas: tabla -> (columna de fecha, días a conservar por defecto, condición extra)
+POLITICAS = {
+    # Los avisos automáticos del período vigente se conservan: sin su clave la
+    # próxima verificación los volvería a crear
+    'notificaciones': ('fecha_creacion', 30,
+                       'leida = 1 AND NOT EXISTS (SELECT 1 FROM temp.claves_abiertas a '
+                       'WHERE a.clave = notificaciones.clave)'),
+    # Los resúmenes por día y por hora se conservan: solo se borra el detalle
+    'asistencias': ('fecha_hora', 730, None),
+}
+
+# Tablas que nunca se depuran aunque se agregue una política
+TABLAS_PROTEGIDAS = ('pagos_auditoria', 'pagos', 'socios')
+
+# Índices que creaba la depuración antes; asistencias no lleva índices secundarios
+INDICES_VIEJOS = ('idx_notificaciones_fecha_creacion', 'idx_asistencias_fecha_hora')
+
+
+def _preparar_notificaciones(conn):
+    """
+    Arma temp.claves_abiertas: las claves que la verificación de pagos generaría
+    hoy para cada socio (una por tipo de aviso, en su período vigente).
+    """
+    c = conn.cursor()
+    c.execute("DROP TABLE IF EXISTS temp.claves_abiertas")
+    c.execute("CREATE TEMP TABLE claves_abiertas (clave TEXT PRIMARY KEY) WITHOUT ROWID")
+    c.execute(f"""
+        WITH {ESTADOS_PAGO_SQL}
+        INSERT OR IGNORE INTO temp.claves_abiertas (clave)
+        SELECT e.socio_id || ':' || t.tipo || ':' || e.periodo
+        FROM estados e
+        CROSS JOIN (SELECT 'pago_vencido' AS tipo UNION ALL SELECT 'proximo_vencimiento'
+                    UNION ALL SELECT 'sin_pagos') t
+    """, {'dias_aviso': None})
+
+
+# Preparación que necesita la condición de cada tabla, antes de depurarla
+PREPARACIONES = {
+    'notificaciones': _preparar_notificaciones,
+}
+
+
+class RetentionModel:
+    def __init__(self, db_path, tamano_lote=500, pausa=0.01):
+        """
+        Args:
+            db_path (str): Ruta de la base de datos
+            tamano_lote (int): Filas que se borran por transacción
+            pausa (float): Segundos entre lotes, para dejar pasar otras escrituras
+        """
+        self.db_path = db_path
+        self.tamano_lote = tamano_lote
+        self.pausa = pausa
+        self.crear_tabla()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_tabla(self):
+        """Crea la tabla de políticas con los valores iniciales (no pisa los editados)."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS retencion (
+                tabla TEXT PRIMARY KEY,
+                columna_fecha TEXT NOT NULL,
+                dias INTEGER NOT NULL,
+                condicion TEXT,
+                activa INTEGER DEFAULT 1,
+                ultima_depuracion TEXT,
+                ultimas_borradas INTEGER
+            )
+        """)
+        # Columna y condición son las del código; los días y si está activa, los editados
+        c.executemany("""
+            INSERT INTO retencion (tabla, columna_fecha, dias, condicion)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(tabla) DO UPDATE SET
+                columna_fecha = excluded.columna_fecha,
+                condicion = excluded.condicion
+        """, [(tabla, columna, dias, condicion) for tabla, (columna, dias, condicion) in POLITICAS.items()])
+        for indice in INDICES_VIEJOS:
+            c.execute(f"DROP INDEX IF EXISTS {indice}")
+        conn.commit()
+        conn.close()
+
+    def obtener_politicas(self):
+        """Devuelve las políticas: (tabla, columna_fecha, dias, condicion, activa, ultima_depuracion, ultimas_borradas)."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT tabla, columna_fecha, dias, condicion, activa, ultima_depuracion, ultimas_borradas
+            FROM retencion ORDER BY tabla
+        """)
+        politicas = c.fetchall()
+        conn.close()
+        return politicas
+
+    def configurar(self, tabla, dias=None, activa=None):
+        """Cambia los días a conservar o activa/desactiva la política de una tabla."""
+        if dias is not None and dias < 1:
+            raise ValueError("Hay que conservar al menos un día")
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            UPDATE retencion SET dias = COALESCE(?, dias), activa = COALESCE(?, activa)
+            WHERE tabla = ?
+        """, (dias, None if activa is None else int(activa), tabla))
+        conn.commit()
+        conn.close()
+
+    def depurar(self, progreso=None, compactar=True):
+        """
+        Aplica todas las políticas activas.
+
+        Args:
+            progreso (callable, optional): Recibe (tabla, filas borradas hasta ahora)
+                después de cada lote
+            compactar (bool): Devolver al sistema el espacio liberado al terminar
+
+        Returns:
+            dict: Filas borradas por tabla
+        """
+        borradas = {}
+        for tabla, _, _, _, activa, _, _ in self.obtener_politicas():
+            if activa and tabla in POLITICAS:
+                borradas[tabla] = self.depurar_tabla(tabla, progreso=progreso)
+        if compactar and sum(borradas.values()):
+            self.compactar()
+        return borradas
+
+    def depurar_tabla(self, tabla, dias=None, progreso=None):
+        """
+        Borra de a lotes los registros de una tabla más viejos que su política.
+        Cada lote es un tramo de rowid: recorre la clave primaria, sin índice de fecha.
+
+        Args:
+            tabla (str): Tabla con política en POLITICAS
+            dias (int, optional): Días a conservar; por defecto los de la política
+            progreso (callable, optional): Recibe (tabla, filas borradas hasta ahora)
+
+        Returns:
+            int: Filas borradas
+
+        Raises:
+            ValueError: Si la tabla no tiene política o está protegida
+        """
+        if tabla in TABLAS_PROTEGIDAS:
+            raise ValueError(f"La tabla {tabla} no se puede depurar")
+        if tabla not in POLITICAS:
+            raise ValueError(f"La tabla {tabla} no tiene política de retención")
+        columna, _, condicion = POLITICAS[tabla]
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("SELECT dias FROM retencion WHERE tabla = ?", (tabla,))
+        dias_politica = c.fetchone()[0]
+
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+        if c.fetchone() is None:
+            conn.close()
+            return 0
+
+        # Las fechas son texto 'YYYY-MM-DD HH:MM:SS': comparar contra el día límite
+        # equivale a DATE(columna) < límite
+        limite = (datetime.now() - timedelta(days=dias or dias_politica)).strftime('%Y-%m-%d')
+        filtro = f"{columna} < :limite" + (f" AND ({condicion})" if condicion else "")
+        total = 0
+        try:
+            if tabla in PREPARACIONES:
+                PREPARACIONES[tabla](conn)
+            desde = 0
+            while True:
+                # El tramo empieza en el siguiente rowid existente (se salta los huecos)
+                c.execute(f"SELECT MIN(rowid) FROM {tabla} WHERE rowid > ?", (desde,))
+                primero = c.fetchone()[0]
+                if primero is None:
+                    break
+                tramo = {'desde': primero - 1, 'hasta': primero - 1 + self.tamano_lote, 'limite': limite}
+                c.execute(f"SELECT MIN({columna}) FROM {tabla} WHERE rowid > :desde AND rowid <= :hasta",
+                          tramo)
+                mas_viejo = c.fetchone()[0]
+                if mas_viejo is not None and mas_viejo >= limite:
+                    break
+
+                c.execute(f"DELETE FROM {tabla} WHERE rowid > :desde AND rowid <= :hasta AND {filtro}",
+                          tramo)
+                total += c.rowcount
+                conn.commit()
+                if progreso:
+                    progreso(tabla, total)
+                desde = tramo['hasta']
+                time.sleep(self.pausa)
+
+            c.execute("""
+                UPDATE retencion SET
+                    ultima_depuracion = strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'),
+                    ultimas_borradas = ?
+                WHERE tabla = ?
+            """, (total, tabla))
+            conn.commit()
+        finally:
+            conn.close()
+        return total
+
+    def compactar(self):
+        """
+        Devuelve al sistema las páginas libres. Con auto_vacuum incremental se
+        liberan de a partes; si no, se hace VACUUM solo cuando las páginas
+        libres superan el 20% del archivo (VACUUM bloquea la base mientras dura).
+
+        Returns:
+            int: Páginas liberadas
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        c = conn.cursor()
+        try:
+            libres = c.execute("PRAGMA freelist_count").fetchone()[0]
+            paginas = c.execute("PRAGMA page_count").fetchone()[0]
+            if libres == 0:
+                return 0
+            if c.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                while c.execute("PRAGMA freelist_count").fetchone()[0]:
+                    c.execute("PRAGMA incremental_vacuum(1000)").fetchall()
+                    time.sleep(self.pausa)
+            elif libres > paginas * 0.2:
+                c.execute("VACUUM")
+            else:
+                return 0
+            c.execute("PRAGMA optimize")
+            return libres
+        finally:
+            conn.close()
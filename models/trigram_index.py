@@ -0,0 +1,203 @@
+"""
+models/trigram_index.py
+Índice de trigramas de nombre y apellido de los socios para búsquedas
+tolerantes a errores de tipeo ("gonzales" encuentra a "González").
+Los triggers sobre socios anotan qué socios cambiaron; el índice se pone
+al día con esos pendientes al escribir y en una tarea programada, nunca
+durante una búsqueda. La primera vez se arma de a lotes fuera de la GUI;
+hasta que termina, las búsquedas se quedan con LIKE.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+
+
+# Socios que se reindexan por transacción al armar el índice
+LOTE_ARMADO = 5000
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y solo letras/números separados por espacios."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(ch for ch in texto if not unicodedata.combining(ch))
+    return re.sub(r'[^a-z0-9ñ]+', ' ', texto.lower()).strip()
+
+
+def trigramas(texto):
+    """Conjunto de trigramas de cada palabra, con relleno para marcar inicio y fin."""
+    resultado = set()
+    for palabra in normalizar(texto).split():
+        palabra = f"  {palabra} "
+        resultado.update(palabra[i:i + 3] for i in range(len(palabra) - 2))
+    return resultado
+
+
+class TrigramIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Se activa cuando el índice está armado y se puede buscar en él
+        self.listo = threading.Event()
+        self.crear_tablas()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_tablas(self):
+        """
+        Crea el índice y los triggers que lo marcan como pendiente. La primera
+        vez deja a todos los socios pendientes; el armado lo hace armar().
+        """
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'socios_trigramas'")
+        existia = c.fetchone() is not None
+
+        c.executescript("""
+            -- cantidad: total de trigramas del socio (para calcular la similitud sin otro join)
+            CREATE TABLE IF NOT EXISTS socios_trigramas (
+                trigrama TEXT NOT NULL,
+                socio_id INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL,
+                PRIMARY KEY (trigrama, socio_id)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS socios_trigramas_pendientes (
+                socio_id INTEGER PRIMARY KEY
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_socios_trigramas_insert
+            AFTER INSERT ON socios
+            BEGIN
+                INSERT OR IGNORE INTO socios_trigramas_pendientes (socio_id) VALUES (NEW.id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_socios_trigramas_update
+            AFTER UPDATE OF nombre, apellido ON socios
+            BEGIN
+                INSERT OR IGNORE INTO socios_trigramas_pendientes (socio_id) VALUES (NEW.id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_socios_trigramas_delete
+            AFTER DELETE ON socios
+            BEGIN
+                INSERT OR IGNORE INTO socios_trigramas_pendientes (socio_id) VALUES (OLD.id);
+            END;
+        """)
+
+        if not existia:
+            c.execute("INSERT OR IGNORE INTO socios_trigramas_pendientes (socio_id) SELECT id FROM socios")
+        conn.commit()
+
+        # Sin el índice por socio el armado no terminó (o se cortó a mitad)
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_socios_trigramas_socio'")
+        if c.fetchone() is not None:
+            self.listo.set()
+        conn.close()
+
+    def armar(self, tamano_lote=LOTE_ARMADO):
+        """
+        Reindexa todos los pendientes de a lotes, cada uno en su propia
+        transacción para no bloquear las escrituras de la GUI. La primera vez
+        arma el índice completo. Pensado para el hilo de tareas.
+
+        Returns:
+            int: Socios reindexados
+        """
+        conn = self.conectar()
+        total = 0
+        try:
+            while True:
+                hechos = self.sincronizar(conn, tamano_lote)
+                conn.commit()
+                total += hechos
+                if hechos < tamano_lote:
+                    break
+            # Se crea después del armado inicial: construirlo de una vez es más rápido
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_socios_trigramas_socio ON socios_trigramas(socio_id)")
+            conn.commit()
+        finally:
+            conn.close()
+        self.listo.set()
+        return total
+
+    def sincronizar(self, conn, limite=None):
+        """
+        Reindexa los socios pendientes (hasta 'limite') usando la conexión
+        recibida, sin hacer commit.
+        """
+        c = conn.cursor()
+        c.execute("SELECT socio_id FROM socios_trigramas_pendientes LIMIT ?", (limite or -1,))
+        pendientes = [fila[0] for fila in c.fetchall()]
+        if not pendientes:
+            return 0
+
+        ids = json.dumps(pendientes)
+        c.execute("""
+            DELETE FROM socios_trigramas
+            WHERE socio_id IN (SELECT value FROM json_each(?))
+        """, (ids,))
+        c.execute("""
+            SELECT id, nombre, apellido FROM socios
+            WHERE id IN (SELECT value FROM json_each(?))
+        """, (ids,))
+
+        filas = []
+        for socio_id, nombre, apellido in c.fetchall():
+            grams = trigramas(f"{nombre} {apellido}")
+            filas.extend((g, socio_id, len(grams)) for g in grams)
+        # En el orden de la clave las inserciones van al final del árbol (armado inicial más rápido)
+        filas.sort()
+        c.executemany(
+            "INSERT OR IGNORE INTO socios_trigramas (trigrama, socio_id, cantidad) VALUES (?, ?, ?)",
+            filas
+        )
+        c.execute("""
+            DELETE FROM socios_trigramas_pendientes
+            WHERE socio_id IN (SELECT value FROM json_each(?))
+        """, (ids,))
+        return len(pendientes)
+
+    def buscar_en(self, conn, texto, limite=10, similitud_minima=0.3):
+        """
+        Socios cuyo nombre completo se parece al texto, del más parecido al menos.
+
+        La similitud es trigramas en común / trigramas en total (Jaccard). Solo se
+        leen las entradas del índice de los trigramas del texto buscado. Solo
+        lee; mientras el índice no está armado devuelve una lista vacía.
+
+        Returns:
+            list: Tuplas (socio_id, similitud)
+        """
+        grams = trigramas(texto)
+        if not grams or not self.listo.is_set():
+            return []
+
+        # Con menos trigramas en común que esto no se llega a la similitud mínima
+        minimo_comunes = max(1, int(similitud_minima * len(grams)))
+
+        c = conn.cursor()
+        c.execute("""
+            SELECT socio_id, similitud FROM (
+                SELECT t.socio_id,
+                       COUNT(*) * 1.0 / (? + MAX(t.cantidad) - COUNT(*)) AS similitud
+                FROM socios_trigramas t
+                WHERE t.trigrama IN (SELECT value FROM json_each(?))
+                GROUP BY t.socio_id
+                HAVING COUNT(*) >= ?
+            )
+            WHERE similitud >= ?
+            ORDER BY similitud DESC, socio_id DESC
+            LIMIT ?
+        """, (len(grams), json.dumps(sorted(grams)), minimo_comunes, similitud_minima, limite))
+        return c.fetchall()
+
+    def buscar(self, texto, limite=10, similitud_minima=0.3):
+        """Igual que buscar_en, con su propia conexión."""
+        conn = self.conectar()
+        try:
+            return self.buscar_en(conn, texto, limite, similitud_minima)
+        finally:
+            conn.close()
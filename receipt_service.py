@@ -0,0 +1,320 @@
+"""
+receipt_service.py
+Generación de recibos de pago en PDF.
+Cada recibo se dibuja sobre una plantilla (encabezado y marco fijos) que se
+define una vez por documento como formulario PDF y se reutiliza en cada
+página; sus medidas y colores se calculan una vez por proceso. Los lotes se
+reparten entre varios procesos con ProcessPoolExecutor.
+Este módulo no importa Qt: se carga en los procesos trabajadores.
+"""
+
+import multiprocessing
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+from datetime import datetime
+from functools import lru_cache
+
+
+# Recibos por tarea enviada a cada proceso (menos idas y vueltas entre procesos)
+RECIBOS_POR_TAREA = 25
+
+# Orden de los datos de cada recibo
+CAMPOS_RECIBO = (
+    'id', 'socio', 'telefono', 'email', 'plan', 'monto',
+    'fecha_pago', 'mes_correspondiente', 'metodo_pago', 'observaciones'
+)
+
+
+class ReceiptService:
+    def __init__(self, db_path, carpeta="Recibos PDF", nombre_gimnasio="Gimnasio"):
+        """
+        Args:
+            db_path (str): Ruta a la base de datos SQLite
+            carpeta (str): Carpeta donde se guardan los recibos
+            nombre_gimnasio (str): Nombre impreso en el encabezado
+        """
+        self.db_path = db_path
+        self.carpeta = carpeta
+        self.nombre_gimnasio = nombre_gimnasio
+
+    def obtener_pagos_mes(self, mes):
+        """Devuelve los IDs de los pagos registrados en un mes (YYYY-MM)."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            SELECT id FROM pagos
+            WHERE fecha_pago >= ? AND fecha_pago < date(?, '+1 month')
+            ORDER BY fecha_pago, id
+        """, (f"{mes}-01", f"{mes}-01"))
+        ids = [fila[0] for fila in c.fetchall()]
+        conn.close()
+        return ids
+
+    def obtener_datos(self, pago_ids):
+        """Carga los datos de todos los recibos en una sola consulta, en el orden recibido."""
+        if not pago_ids:
+            return []
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            SELECT p.id, s.nombre || ' ' || s.apellido, s.telefono, s.email,
+                   COALESCE(pl.nombre, s.plan, ''), p.monto, p.fecha_pago,
+                   p.mes_correspondiente, p.metodo_pago, p.observaciones
+            FROM json_each(?) j
+            JOIN pagos p ON p.id = j.value
+            JOIN socios s ON s.id = p.socio_id
+            LEFT JOIN planes pl ON pl.id = s.plan_id
+            ORDER BY j.key
+        """, (f"[{','.join(str(int(i)) for i in pago_ids)}]",))
+        datos = [dict(zip(CAMPOS_RECIBO, fila)) for fila in c.fetchall()]
+        conn.close()
+        return datos
+
+    def generar_lote(self, pago_ids, combinar=False, progreso=None, cancelado=None, max_procesos=None):
+        """
+        Genera un PDF por pago repartiendo el trabajo entre procesos.
+
+        Args:
+            pago_ids (list): IDs de los pagos
+            combinar (bool): Generar además un único PDF con todos los recibos para imprimir
+            progreso (callable, optional): Recibe (recibos_generados, total)
+            cancelado (threading.Event, optional): Si se activa, se descartan las tareas pendientes
+            max_procesos (int, optional): Procesos a usar (por defecto, uno por núcleo)
+
+        Returns:
+            dict: 'recibos' (rutas generadas), 'combinado' (ruta o None) y 'errores'
+        """
+        datos = self.obtener_datos(pago_ids)
+        total = len(datos)
+        resultado = {'recibos': [], 'combinado': None, 'errores': []}
+        if total == 0:
+            return resultado
+
+        carpeta = os.path.abspath(self.carpeta)
+        os.makedirs(carpeta, exist_ok=True)
+        tareas = [
+            [(d, os.path.join(carpeta, nombre_archivo(d))) for d in datos[i:i + RECIBOS_POR_TAREA]]
+            for i in range(0, total, RECIBOS_POR_TAREA)
+        ]
+
+        hechos = 0
+        # Los procesos no ven el evento del llamador: se les avisa con uno propio
+        cancelar_procesos = multiprocessing.Event()
+        ruta_combinado = None
+        with ProcessPoolExecutor(max_workers=max_procesos, initializer=_iniciar_proceso,
+                                 initargs=(cancelar_procesos,)) as executor:
+            futuro_combinado = None
+            if combinar:
+                # El archivo combinado es la tarea más larga: se encarga primero
+                # para que se dibuje en paralelo con los recibos sueltos
+                ruta_combinado = os.path.join(
+                    carpeta, f"Recibos combinados - {datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                )
+                futuro_combinado = executor.submit(
+                    generar_combinado, datos, ruta_combinado, self.nombre_gimnasio
+                )
+
+            futuros = {
+                executor.submit(generar_recibos, tarea, self.nombre_gimnasio): len(tarea)
+                for tarea in tareas
+            }
+
+            for futuro in as_completed(futuros):
+                if cancelado is not None and cancelado.is_set():
+                    cancelar_procesos.set()
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                    break
+                try:
+                    resultado['recibos'].extend(futuro.result())
+                except Exception as e:
+                    resultado['errores'].append(str(e))
+                hechos += futuros[futuro]
+                if progreso:
+                    progreso(hechos, total)
+
+            while futuro_combinado is not None and not cancelar_procesos.is_set():
+                if cancelado is not None and cancelado.is_set():
+                    cancelar_procesos.set()
+                    futuro_combinado.cancel()
+                    break
+                try:
+                    resultado['combinado'] = futuro_combinado.result(timeout=0.2)
+                except TimeoutError:
+                    continue
+                except Exception as e:
+                    resultado['errores'].append(f"Archivo combinado: {e}")
+                break
+
+        if cancelar_procesos.is_set():
+            # Un combinado a medias (o terminado justo al cancelar) no se deja en disco
+            resultado['combinado'] = None
+            if ruta_combinado and os.path.exists(ruta_combinado):
+                os.remove(ruta_combinado)
+
+        return resultado
+
+
+# === TRABAJO EN LOS PROCESOS ===
+
+def nombre_archivo(datos):
+    """Nombre del PDF de un recibo: número y socio, sin caracteres inválidos."""
+    socio = re.sub(r'[\\/:*?"<>|]+', '', datos['socio'] or '').strip()
+    return f"Recibo {datos['id']:06d} - {socio}.pdf"
+
+
+# Evento compartido con el proceso principal para abandonar un lote cancelado
+_cancelar = None
+
+
+def _iniciar_proceso(cancelar):
+    """Inicializador de cada proceso trabajador."""
+    global _cancelar
+    _cancelar = cancelar
+
+
+def _cancelado():
+    return _cancelar is not None and _cancelar.is_set()
+
+
+def generar_recibos(tarea, nombre_gimnasio):
+    """Genera los PDF de una tarea [(datos, ruta), ...] y devuelve las rutas."""
+    from reportlab.pdfgen import canvas
+
+    plantilla = _plantilla(nombre_gimnasio)
+    rutas = []
+    for datos, ruta in tarea:
+        if _cancelado():
+            break
+        c = canvas.Canvas(ruta, pagesize=plantilla['pagina'])
+        _definir_plantilla(c, plantilla)
+        _dibujar_recibo(c, datos, plantilla)
+        c.showPage()
+        c.save()
+        rutas.append(ruta)
+    return rutas
+
+
+def generar_combinado(lista_datos, ruta, nombre_gimnasio):
+    """
+    Genera un único PDF con un recibo por página; la plantilla se incluye una sola vez.
+    Si se cancela el lote no se escribe nada y devuelve None.
+    """
+    from reportlab.pdfgen import canvas
+
+    plantilla = _plantilla(nombre_gimnasio)
+    c = canvas.Canvas(ruta, pagesize=plantilla['pagina'])
+    _definir_plantilla(c, plantilla)
+    for datos in lista_datos:
+        if _cancelado():
+            return None
+        _dibujar_recibo(c, datos, plantilla)
+        c.showPage()
+    c.save()
+    return ruta
+
+
+@lru_cache(maxsize=None)
+def _plantilla(nombre_gimnasio):
+    """Medidas, colores y textos fijos del recibo (se calculan una vez por proceso)."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A5, landscape
+
+    ancho, alto = landscape(A5)
+    plantilla = {
+        'pagina': (ancho, alto),
+        'ancho': ancho,
+        'alto': alto,
+        'margen': 30,
+        'azul': colors.HexColor("#0078D7"),
+        'gris': colors.HexColor("#666666"),
+        'nombre': nombre_gimnasio,
+    }
+    return plantilla
+
+
+def _definir_plantilla(c, plantilla):
+    """
+    Agrega marco y encabezado como un formulario dentro del PDF: se dibujan una
+    vez por documento y cada página los reutiliza con doForm.
+    """
+    c.beginForm("plantilla_recibo")
+    _dibujar_plantilla(c, plantilla)
+    c.endForm()
+
+
+def _dibujar_plantilla(c, plantilla):
+    """Dibuja marco, encabezado y etiquetas fijas del recibo."""
+    ancho, alto, m = plantilla['ancho'], plantilla['alto'], plantilla['margen']
+
+    c.setStrokeColor(plantilla['azul'])
+    c.setLineWidth(1.5)
+    c.roundRect(m / 2, m / 2, ancho - m, alto - m, 8)
+
+    c.setFillColor(plantilla['azul'])
+    c.rect(m / 2, alto - m / 2 - 50, ancho - m, 50, stroke=0, fill=1)
+    c.setFillColor("white")
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(m, alto - m / 2 - 33, plantilla['nombre'])
+    c.setFont("Helvetica-Bold", 14)
+    c.drawRightString(ancho - m, alto - m / 2 - 33, "RECIBO DE PAGO")
+
+    c.setFillColor(plantilla['gris'])
+    c.setFont("Helvetica", 10)
+    etiquetas = ["Socio:", "Teléfono:", "Plan:", "Período:", "Fecha de pago:", "Método de pago:"]
+    for i, etiqueta in enumerate(etiquetas):
+        c.drawString(m, alto - 120 - i * 22, etiqueta)
+
+    c.setStrokeColor(plantilla['gris'])
+    c.setLineWidth(0.5)
+    c.line(ancho - m - 160, m + 30, ancho - m, m + 30)
+    c.setFont("Helvetica", 8)
+    c.drawCentredString(ancho - m - 80, m + 18, "Firma y sello")
+
+
+def _dibujar_recibo(c, datos, plantilla):
+    """Dibuja los datos variables de un recibo sobre la plantilla."""
+    ancho, alto, m = plantilla['ancho'], plantilla['alto'], plantilla['margen']
+    c.doForm("plantilla_recibo")
+
+    c.setFillColor(plantilla['gris'])
+    c.setFont("Helvetica", 10)
+    c.drawRightString(ancho - m, alto - 90, f"N° {datos['id']:06d}")
+
+    valores = [
+        datos['socio'] or "",
+        datos['telefono'] or "-",
+        datos['plan'] or "-",
+        _formatear_periodo(datos['mes_correspondiente']),
+        _formatear_fecha(datos['fecha_pago']),
+        (datos['metodo_pago'] or "efectivo").capitalize(),
+    ]
+    c.setFillColor("black")
+    c.setFont("Helvetica-Bold", 11)
+    for i, valor in enumerate(valores):
+        c.drawString(m + 110, alto - 120 - i * 22, valor)
+
+    if datos['observaciones']:
+        c.setFont("Helvetica-Oblique", 9)
+        c.drawString(m, alto - 120 - len(valores) * 22, datos['observaciones'][:110])
+
+    c.setFillColor(plantilla['azul'])
+    c.setFont("Helvetica-Bold", 22)
+    c.drawString(m, m + 25, f"Total: ${datos['monto']:,.2f}")
+
+
+def _formatear_fecha(fecha):
+    try:
+        return datetime.strptime(fecha[:10], "%Y-%m-%d").strftime("%d/%m/%Y")
+    except (TypeError, ValueError):
+        return fecha or "-"
+
+
+def _formatear_periodo(mes):
+    try:
+        return datetime.strptime(mes, "%Y-%m").strftime("%m/%Y")
+    except (TypeError, ValueError):
+        return mes or "-"
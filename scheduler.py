@@ -0,0 +1,220 @@
+"""
+scheduler.py
+Tareas programadas que corren en un hilo propio, fuera de la GUI.
+La tabla trabajos guarda cuándo corrió cada tarea y cuándo le toca de nuevo;
+si el programa estuvo cerrado, al abrirlo se ejecutan una sola vez las
+tareas atrasadas.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from PySide6.QtCore import QObject, Signal
+
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+class JobScheduler(QObject):
+    """Ejecuta tareas a una hora del día o cada cierta cantidad de minutos."""
+
+    # nombre de la tarea, resultado / mensaje de error
+    ejecutado = Signal(str, object)
+    fallido = Signal(str, str)
+
+    def __init__(self, db_path, espera_maxima=60):
+        """
+        Args:
+            db_path (str): Ruta de la base de datos
+            espera_maxima (int): Segundos máximos entre revisiones de la tabla
+                (por si cambia la hora del sistema o se edita un horario)
+        """
+        super().__init__()
+        self.db_path = db_path
+        self.espera_maxima = espera_maxima
+        self._funciones = {}
+        self._despertar = threading.Event()
+        self._activo = False
+        self._hilo = None
+        self.crear_tabla()
+
+    def conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def crear_tabla(self):
+        """Crea la tabla de tareas programadas si no existe."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS trabajos (
+                nombre TEXT PRIMARY KEY,
+                hora TEXT,
+                cada_minutos INTEGER,
+                ultima_ejecucion TEXT,
+                proxima_ejecucion TEXT NOT NULL,
+                ultimo_resultado TEXT,
+                ultimo_error TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def registrar(self, nombre, funcion, hora=None, cada_minutos=None):
+        """
+        Registra una tarea. Si ya estaba en la tabla se conserva su horario
+        guardado; si es nueva, la de intervalo corre en la primera revisión y
+        la de hora fija espera a la próxima vez que llegue esa hora.
+
+        Args:
+            nombre (str): Nombre único de la tarea
+            funcion (callable): Función sin argumentos; corre en el hilo del programador
+            hora (str, optional): Hora del día "HH:MM" a la que se ejecuta
+            cada_minutos (int, optional): Intervalo entre ejecuciones
+
+        Raises:
+            ValueError: Si no se indica exactamente uno de hora o cada_minutos
+        """
+        if (hora is None) == (cada_minutos is None):
+            raise ValueError("Indicá la hora o el intervalo de la tarea (solo uno)")
+        if hora is not None:
+            datetime.strptime(hora, '%H:%M')  # Valida el formato
+
+        self._funciones[nombre] = funcion
+        ahora = datetime.now()
+        primera = ahora if cada_minutos else self.calcular_proxima(hora, None, ahora)
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO trabajos (nombre, hora, cada_minutos, proxima_ejecucion)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(nombre) DO NOTHING
+        """, (nombre, hora, cada_minutos, primera.strftime(FORMATO_FECHA)))
+        conn.commit()
+        conn.close()
+
+    def obtener_trabajos(self):
+        """Devuelve el estado de las tareas: (nombre, hora, cada_minutos, ultima, proxima, resultado, error)."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT nombre, hora, cada_minutos, ultima_ejecucion, proxima_ejecucion,
+                   ultimo_resultado, ultimo_error
+            FROM trabajos
+            ORDER BY proxima_ejecucion
+        """)
+        trabajos = c.fetchall()
+        conn.close()
+        return trabajos
+
+    def ejecutar_ahora(self, nombre):
+        """Adelanta una tarea para que corra en cuanto el hilo quede libre."""
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("UPDATE trabajos SET proxima_ejecucion = ? WHERE nombre = ?",
+                  (datetime.now().strftime(FORMATO_FECHA), nombre))
+        conn.commit()
+        conn.close()
+        self._despertar.set()
+
+    def iniciar(self):
+        """Arranca el hilo del programador."""
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, name="JobScheduler", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=5):
+        """Detiene el hilo; una tarea en curso termina antes de salir."""
+        self._activo = False
+        self._despertar.set()
+        if self._hilo and self._hilo.is_alive():
+            self._hilo.join(timeout)
+
+    @staticmethod
+    def calcular_proxima(hora, cada_minutos, desde):
+        """Siguiente ejecución posterior a 'desde' (datetime) según el horario de la tarea."""
+        if cada_minutos:
+            return desde + timedelta(minutes=cada_minutos)
+        h, m = map(int, hora.split(':'))
+        proxima = desde.replace(hour=h, minute=m, second=0, microsecond=0)
+        if proxima <= desde:
+            proxima += timedelta(days=1)
+        return proxima
+
+    # === HILO DEL PROGRAMADOR ===
+
+    def _bucle(self):
+        while self._activo:
+            try:
+                espera = self._ejecutar_vencidas()
+            except sqlite3.Error as e:
+                print(f"Error en el programador de tareas: {e}")
+                espera = self.espera_maxima
+            self._despertar.wait(espera)
+            self._despertar.clear()
+
+    def _ejecutar_vencidas(self):
+        """
+        Ejecuta las tareas cuya hora ya pasó y devuelve los segundos hasta la
+        próxima. La próxima ejecución se calcula desde ahora: las ejecuciones
+        perdidas mientras el programa estuvo cerrado se recuperan con una sola.
+        """
+        ahora = datetime.now().strftime(FORMATO_FECHA)
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            SELECT nombre, hora, cada_minutos FROM trabajos
+            WHERE proxima_ejecucion <= ?
+            ORDER BY proxima_ejecucion
+        """, (ahora,))
+        vencidas = [fila for fila in c.fetchall() if fila[0] in self._funciones]
+        conn.close()
+
+        for nombre, hora, cada_minutos in vencidas:
+            if not self._activo:
+                break
+            self._ejecutar(nombre, hora, cada_minutos)
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("SELECT nombre, proxima_ejecucion FROM trabajos")
+        proximas = [proxima for nombre, proxima in c.fetchall() if nombre in self._funciones]
+        conn.close()
+        if not proximas:
+            return self.espera_maxima
+        faltan = (datetime.strptime(min(proximas), FORMATO_FECHA) - datetime.now()).total_seconds()
+        return min(max(faltan, 0), self.espera_maxima)
+
+    def _ejecutar(self, nombre, hora, cada_minutos):
+        inicio = datetime.now()
+        resultado, error = None, None
+        try:
+            resultado = self._funciones[nombre]()
+        except Exception as e:
+            error = str(e)
+
+        conn = self.conectar()
+        c = conn.cursor()
+        c.execute("""
+            UPDATE trabajos SET
+                ultima_ejecucion = ?,
+                proxima_ejecucion = ?,
+                ultimo_resultado = ?,
+                ultimo_error = ?
+            WHERE nombre = ?
+        """, (
+            inicio.strftime(FORMATO_FECHA),
+            self.calcular_proxima(hora, cada_minutos, datetime.now()).strftime(FORMATO_FECHA),
+            None if resultado is None else str(resultado),
+            error,
+            nombre
+        ))
+        conn.commit()
+        conn.close()
+
+        if error is None:
+            self.ejecutado.emit(nombre, resultado)
+        else:
+            self.fallido.emit(nombre, error)
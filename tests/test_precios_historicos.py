@@ -0,0 +1,93 @@
+"""
+tests/test_precios_historicos.py
+Un cambio de precio de un plan no cambia el valor de los períodos anteriores:
+la antigüedad de deuda y la proyección usan el precio vigente en cada fecha.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from controllers.members_controller import MembersController
+from models.aging_model import AgingModel
+from models.forecast_model import EPOCH, precio_vigente
+from models.payments_model import PaymentsModel
+from models.plans_model import PlansModel
+
+
+def hace(dias):
+    return (date.today() - timedelta(days=dias)).isoformat()
+
+
+class PreciosHistoricosTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.planes = PlansModel(self.db_path)
+        MembersController(self.db_path)
+        PaymentsModel(self.db_path)
+
+        self.planes.agregar_plan("Mensual", 1000, 30)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        self.plan_id = c.execute("SELECT id FROM planes").fetchone()[0]
+        # El precio del alta rige desde hace un año
+        c.execute("UPDATE planes_precios SET vigente_desde = ? WHERE plan_id = ?", (hace(365), self.plan_id))
+        c.execute("""
+            INSERT INTO socios (nombre, apellido, telefono, fecha_inscripcion, plan_id)
+            VALUES ('Ana', 'Pérez', '', ?, ?)
+        """, (hace(200), self.plan_id))
+        socio_id = c.lastrowid
+        # Vence hace 65 días: adeuda los períodos que empezaron hace 65, 35 y 5 días
+        c.execute("""
+            INSERT INTO pagos (socio_id, monto, fecha_pago, mes_correspondiente)
+            VALUES (?, 1000, ?, '')
+        """, (socio_id, hace(95)))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def _monto_adeudado(self):
+        detalle = AgingModel(self.db_path).obtener_detalle()
+        self.assertEqual(len(detalle), 1)
+        return detalle[0][8]
+
+    def _cambiar_precio(self, precio, vigente_desde):
+        self.planes.actualizar_plan(self.plan_id, "Mensual", precio, 30)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE planes_precios SET vigente_desde = ? WHERE plan_id = ? AND vigente_desde = ?",
+                     (vigente_desde, self.plan_id, date.today().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def test_aumento_de_hoy_no_cambia_la_deuda_anterior(self):
+        self.assertEqual(self._monto_adeudado(), 3000)
+        self._cambiar_precio(1500, date.today().isoformat())
+        self.assertEqual(self._monto_adeudado(), 3000)
+
+    def test_cada_periodo_al_precio_de_su_inicio(self):
+        self._cambiar_precio(1500, hace(20))
+        self.assertEqual(self._monto_adeudado(), 1000 + 1000 + 1500)
+
+    def test_precio_vigente_vectorizado(self):
+        dia = lambda fecha: int((np.datetime64(fecha, 'D') - EPOCH).astype(np.int64))
+        precios = (
+            np.array([1, 1, 2]),
+            np.array([dia('2024-01-01'), dia('2025-01-01'), dia('2024-06-01')]),
+            np.array([100.0, 150.0, 300.0]),
+        )
+        planes = np.array([1, 1, 1, 2, 3, -1])
+        dias = np.array([dia('2023-01-01'), dia('2024-12-31'), dia('2025-01-01'),
+                         dia('2030-01-01'), dia('2025-01-01'), dia('2025-01-01')])
+        resultado = precio_vigente(precios, planes, dias, np.full(6, 7.0))
+        self.assertEqual(resultado.tolist(), [100.0, 100.0, 150.0, 300.0, 7.0, 7.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
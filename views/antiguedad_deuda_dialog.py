@@ -0,0 +1,236 @@
+"""
+views/antiguedad_deuda_dialog.py
+Diálogo de antigüedad de deuda: resumen por tramos, detalle de cada tramo
+y exportación a Excel (o CSV si no está openpyxl).
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox
+)
+from PySide6.QtCore import Qt
+from datetime import datetime
+import os
+
+from models.aging_model import AgingModel, TRAMOS
+
+
+# Color de cada tramo, de menor a mayor atraso
+COLORES_TRAMO = ["#FFC107", "#FF9800", "#F44336", "#B71C1C"]
+
+# Socios que se cargan por página en el detalle
+TAMANIO_PAGINA = 500
+
+
+class AntiguedadDeudaDialog(QDialog):
+    """Socios vencidos agrupados por días de atraso, con detalle por tramo."""
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.model = AgingModel(db_path)
+        self.tramo_actual = None
+        self.cargados = 0
+        self.setWindowTitle("Antigüedad de Deuda")
+        self.setMinimumSize(1000, 700)
+        self.init_ui()
+        self.actualizar()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("⏳ Antigüedad de Deuda")
+        title.setStyleSheet("font-size: 20px; font-weight: bold; margin: 10px;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        # Un botón por tramo: muestra cantidad y monto, y al hacer clic abre el detalle
+        tramos_layout = QHBoxLayout()
+        self.botones_tramo = []
+        for tramo, etiqueta in TRAMOS:
+            btn = QPushButton(etiqueta)
+            btn.setCheckable(True)
+            btn.setMinimumHeight(80)
+            btn.setStyleSheet(f"""
+                QPushButton {{
+                    background: white;
+                    border: 2px solid {COLORES_TRAMO[tramo]};
+                    border-radius: 8px;
+                    font-size: 14px;
+                    padding: 8px;
+                }}
+                QPushButton:checked {{
+                    background: {COLORES_TRAMO[tramo]};
+                    color: white;
+                    font-weight: bold;
+                }}
+            """)
+            btn.clicked.connect(lambda _, t=tramo: self.seleccionar_tramo(t))
+            tramos_layout.addWidget(btn)
+            self.botones_tramo.append(btn)
+        layout.addLayout(tramos_layout)
+
+        self.lbl_detalle = QLabel("")
+        self.lbl_detalle.setStyleSheet("font-size: 14px; padding: 5px;")
+        layout.addWidget(self.lbl_detalle)
+
+        self.tabla = QTableWidget()
+        self.tabla.setColumnCount(8)
+        self.tabla.setHorizontalHeaderLabels([
+            "#", "Socio", "Teléfono", "Plan", "Último Pago", "Días Vencido", "Adeudado", "Acumulado"
+        ])
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla.setColumnWidth(1, 200)
+        layout.addWidget(self.tabla)
+
+        botones = QHBoxLayout()
+        self.btn_mas = QPushButton("⬇️ Cargar más")
+        self.btn_mas.clicked.connect(self.cargar_pagina)
+        btn_actualizar = QPushButton("↻ Actualizar")
+        btn_actualizar.clicked.connect(self.actualizar)
+        btn_exportar = QPushButton("📊 Exportar")
+        btn_exportar.setStyleSheet("""
+            QPushButton {
+                padding: 8px 18px;
+                background: #4CAF50;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #45a049;
+            }
+        """)
+        btn_exportar.clicked.connect(self.exportar)
+        botones.addWidget(self.btn_mas)
+        botones.addStretch()
+        botones.addWidget(btn_actualizar)
+        botones.addWidget(btn_exportar)
+        layout.addLayout(botones)
+
+    def actualizar(self):
+        """Recalcula el resumen por tramos y recarga el detalle seleccionado."""
+        try:
+            self.tramos = self.model.obtener_tramos()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al calcular la antigüedad de deuda:\n{e}")
+            return
+
+        for (tramo, etiqueta, cantidad, monto, porcentaje), btn in zip(self.tramos, self.botones_tramo):
+            btn.setText(f"{etiqueta}\n{cantidad} socios\n${monto:,.0f} ({porcentaje:.0%})")
+
+        # Por defecto se abre el tramo más atrasado que tenga socios
+        if self.tramo_actual is None:
+            con_socios = [t[0] for t in self.tramos if t[2] > 0]
+            self.tramo_actual = con_socios[-1] if con_socios else 0
+        self.seleccionar_tramo(self.tramo_actual)
+
+    def seleccionar_tramo(self, tramo):
+        """Muestra el detalle de un tramo desde la primera página."""
+        self.tramo_actual = tramo
+        for t, btn in enumerate(self.botones_tramo):
+            btn.setChecked(t == tramo)
+
+        _, etiqueta, cantidad, monto, _ = self.tramos[tramo]
+        self.lbl_detalle.setText(f"<b>{etiqueta}</b>: {cantidad} socios · ${monto:,.0f} adeudados")
+
+        self.tabla.setRowCount(0)
+        self.cargados = 0
+        self.cargar_pagina()
+
+    def cargar_pagina(self):
+        """Agrega la siguiente página del tramo seleccionado a la tabla."""
+        try:
+            filas = self.model.obtener_detalle(self.tramo_actual, TAMANIO_PAGINA, self.cargados)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al cargar el detalle:\n{e}")
+            return
+
+        inicio = self.tabla.rowCount()
+        self.tabla.setRowCount(inicio + len(filas))
+        for row, (pos, _, socio, tel, plan, ultimo, dias, _, monto, acumulado) in enumerate(filas, inicio):
+            valores = [str(pos), socio, tel or "", plan, ultimo or "Nunca",
+                       f"{dias} días", f"${monto:,.0f}", f"${acumulado:,.0f}"]
+            for col, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if col in (0, 5, 6, 7):
+                    item.setTextAlignment(Qt.AlignCenter)
+                self.tabla.setItem(row, col, item)
+
+        self.cargados += len(filas)
+        self.btn_mas.setEnabled(self.cargados < self.tramos[self.tramo_actual][2])
+
+    def exportar(self):
+        """Exporta el resumen y el detalle completo de todos los tramos."""
+        try:
+            detalle = self.model.obtener_detalle()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al obtener los deudores:\n{e}")
+            return
+
+        headers = ["#", "Socio", "Teléfono", "Plan", "Último Pago", "Días Vencido", "Tramo", "Adeudado"]
+        etiquetas = dict(TRAMOS)
+        filas = [
+            [pos, socio, tel or "", plan, ultimo or "Nunca", dias, etiquetas[tramo], monto]
+            for pos, _, socio, tel, plan, ultimo, dias, tramo, monto, _ in detalle
+        ]
+        fecha = datetime.now().strftime('%Y%m%d_%H%M')
+
+        try:
+            ruta = self._exportar_excel(headers, filas, fecha)
+        except ImportError:
+            ruta = self._exportar_csv(headers, filas, fecha)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al exportar:\n{e}")
+            return
+
+        QMessageBox.information(self, "✅ Éxito", f"Antigüedad de deuda exportada en:\n{os.path.abspath(ruta)}")
+
+    def _exportar_excel(self, headers, filas, fecha):
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill
+
+        carpeta = "Reportes Excel"
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"Antigüedad de Deuda - {fecha}.xlsx")
+
+        wb = Workbook()
+        header_fill = PatternFill(start_color="0078D7", end_color="0078D7", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF", size=12)
+
+        ws = wb.active
+        ws.title = "Resumen"
+        ws.append(["Tramo", "Socios", "Adeudado", "% del Total"])
+        for _, etiqueta, cantidad, monto, porcentaje in self.tramos:
+            ws.append([etiqueta, cantidad, monto, porcentaje])
+        for row in ws.iter_rows(min_row=2):
+            row[2].number_format = '$#,##0.00'
+            row[3].number_format = '0.0%'
+
+        ws_detalle = wb.create_sheet("Detalle")
+        ws_detalle.append(headers)
+        for fila in filas:
+            ws_detalle.append(fila)
+        for row in ws_detalle.iter_rows(min_row=2, min_col=8, max_col=8):
+            row[0].number_format = '$#,##0.00'
+
+        for hoja in (ws, ws_detalle):
+            for cell in hoja[1]:
+                cell.fill = header_fill
+                cell.font = header_font
+        ws.column_dimensions['A'].width = 18
+        ws_detalle.column_dimensions['B'].width = 30
+
+        wb.save(ruta)
+        return ruta
+
+    def _exportar_csv(self, headers, filas, fecha):
+        import csv
+
+        ruta = f"antiguedad_deuda_{fecha}.csv"
+        with open(ruta, 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.writer(file, delimiter=';')  # Usar ; como separador
+            writer.writerow(headers)
+            writer.writerows(filas)
+        return ruta
@@ -0,0 +1,162 @@
+"""
+views/attendance.py
+Vista de control de ingresos en la puerta.
+Se ingresa el número de socio (o su teléfono) y se muestra al instante si
+tiene la cuota al día; el ingreso se guarda en segundo plano.
+"""
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+    QHeaderView
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+
+from models.phone_index import normalizar_telefono
+from models.photo_store import PhotoStore
+
+
+# Ingresos que se muestran en la lista de últimos ingresos
+ULTIMOS_INGRESOS = 50
+
+# Lado de la foto del socio que se muestra para controlar su identidad
+LADO_FOTO = 160
+
+
+class AttendanceView(QWidget):
+    def __init__(self, attendance_model, members_controller, db_writer=None, photo_store=None):
+        super().__init__()
+        self.model = attendance_model
+        self.members_controller = members_controller
+        self.db_writer = db_writer
+        self.photo_store = photo_store or PhotoStore()
+        self.init_ui()
+        self.cargar_ultimos()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("✅ Control de Ingresos")
+        title.setAlignment(Qt.AlignCenter)
+        title.setStyleSheet("font-size: 22px; font-weight: bold; margin: 10px;")
+        layout.addWidget(title)
+
+        self.input_socio = QLineEdit()
+        self.input_socio.setPlaceholderText("N° de socio o teléfono y Enter")
+        self.input_socio.setStyleSheet("font-size: 20px; padding: 10px;")
+        self.input_socio.returnPressed.connect(self.registrar)
+        layout.addWidget(self.input_socio)
+
+        resultado_layout = QHBoxLayout()
+        self.lbl_foto = QLabel()
+        self.lbl_foto.setFixedSize(LADO_FOTO, LADO_FOTO)
+        self.lbl_foto.setAlignment(Qt.AlignCenter)
+        self.lbl_resultado = QLabel("")
+        self.lbl_resultado.setAlignment(Qt.AlignCenter)
+        self.lbl_resultado.setMinimumHeight(90)
+        self.lbl_resultado.setStyleSheet("font-size: 24px; font-weight: bold; border-radius: 8px;")
+        resultado_layout.addWidget(self.lbl_foto)
+        resultado_layout.addWidget(self.lbl_resultado, 1)
+        layout.addLayout(resultado_layout)
+
+        layout.addWidget(QLabel("Últimos ingresos:"))
+        self.tabla = QTableWidget()
+        self.tabla.setColumnCount(4)
+        self.tabla.setHorizontalHeaderLabels(["Hora", "N° Socio", "Socio", "Estado"])
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.tabla)
+
+    def cargar_ultimos(self):
+        """Carga los últimos ingresos guardados."""
+        try:
+            ultimos = self.model.obtener_ultimos(ULTIMOS_INGRESOS)
+        except Exception as e:
+            print(f"Error al cargar los últimos ingresos: {e}")
+            return
+        self.tabla.setRowCount(0)
+        for _, socio_id, socio, fecha_hora, habilitado, motivo in reversed(ultimos):
+            self._agregar_fila(fecha_hora, socio_id, socio, habilitado, motivo)
+
+    def registrar(self):
+        """Identifica al socio, valida su cuota y registra el ingreso."""
+        texto = self.input_socio.text().strip()
+        self.input_socio.clear()
+        if not texto:
+            return
+
+        socio_id = self._identificar(texto)
+        if socio_id is None:
+            return
+
+        resultado = self.model.registrar_ingreso(
+            socio_id, self.db_writer,
+            al_fallar=lambda msg: print(f"Error al registrar el ingreso: {msg}")
+        )
+        if not resultado['registrado']:
+            self.lbl_foto.clear()
+            self._mostrar(f"No existe el socio N° {socio_id}", "#FF9800")
+            return
+        socio = resultado['socio']
+        self._mostrar_foto(socio_id)
+
+        if resultado['habilitado']:
+            self._mostrar(f"✅ Bienvenido/a {socio}\nCuota al día hasta {resultado['vence']}", "#4CAF50")
+        else:
+            detalle = f" ({resultado['vence']})" if resultado['vence'] else ""
+            self._mostrar(f"⛔ {socio or f'Socio {socio_id}'}\n{resultado['motivo']}{detalle}", "#F44336")
+
+        self._agregar_fila(resultado['fecha_hora'], socio_id, socio,
+                           resultado['habilitado'], resultado['motivo'])
+
+    def _identificar(self, texto):
+        """Devuelve el ID del socio a partir de su número o de su teléfono."""
+        if normalizar_telefono(texto):
+            # Un teléfono que no es de nadie no se toma como N° de socio
+            ids = self.members_controller.indice_telefonos.buscar(texto)
+            if len(ids) == 1:
+                return ids[0]
+            if len(ids) > 1:
+                self._mostrar("Varios socios comparten ese teléfono:\nusá el N° de socio", "#FF9800")
+            else:
+                self._mostrar("No se encontró el socio", "#FF9800")
+            return None
+        if texto.isdigit():
+            return int(texto)
+        self._mostrar("No se encontró el socio", "#FF9800")
+        return None
+
+    def _mostrar_foto(self, socio_id):
+        """Muestra la foto del socio para compararla con quien está en la puerta."""
+        self.lbl_foto.clear()
+        try:
+            foto_hash = self.members_controller.obtener_fotos([socio_id]).get(socio_id)
+        except Exception as e:
+            print(f"Error al obtener la foto del socio: {e}")
+            return
+        if foto_hash:
+            pixmap = self.photo_store.pixmap(foto_hash, miniatura=False)
+            if not pixmap.isNull():
+                self.lbl_foto.setPixmap(
+                    pixmap.scaled(LADO_FOTO, LADO_FOTO, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                )
+                return
+        self.lbl_foto.setText("Sin foto")
+
+    def _mostrar(self, texto, color):
+        self.lbl_resultado.setText(texto)
+        self.lbl_resultado.setStyleSheet(
+            f"font-size: 24px; font-weight: bold; border-radius: 8px; color: white; background: {color};"
+        )
+
+    def _agregar_fila(self, fecha_hora, socio_id, socio, habilitado, motivo):
+        """Agrega un ingreso arriba de la lista, sin volver a consultar la base."""
+        self.tabla.insertRow(0)
+        valores = [fecha_hora[11:16], str(socio_id), socio or "", "Habilitado" if habilitado else motivo]
+        for col, valor in enumerate(valores):
+            item = QTableWidgetItem(valor)
+            if col == 3:
+                item.setForeground(QColor("#4CAF50" if habilitado else "#F44336"))
+            self.tabla.setItem(0, col, item)
+        if self.tabla.rowCount() > ULTIMOS_INGRESOS:
+            self.tabla.setRowCount(ULTIMOS_INGRESOS)
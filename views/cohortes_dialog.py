@@ -0,0 +1,115 @@
+"""
+views/cohortes_dialog.py
+Diálogo con el mapa de calor de retención por cohortes de inscripción.
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+from datetime import datetime
+
+# Intentar importar matplotlib
+try:
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+    from matplotlib.figure import Figure
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+
+class CohortesDialog(QDialog):
+    """Muestra qué porcentaje de cada cohorte pagó en cada mes posterior a su inscripción."""
+
+    def __init__(self, cohort_model, parent=None):
+        super().__init__(parent)
+        self.cohort_model = cohort_model
+        self.setWindowTitle("Retención por Cohortes")
+        self.setMinimumSize(1000, 700)
+        self.init_ui()
+        self.actualizar()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        title = QLabel("🧩 Retención por Mes de Inscripción")
+        title.setStyleSheet("font-size: 20px; font-weight: bold; margin: 10px;")
+        btn_actualizar = QPushButton("↻ Actualizar")
+        btn_actualizar.clicked.connect(self.actualizar)
+        header.addWidget(title)
+        header.addStretch()
+        header.addWidget(btn_actualizar)
+        layout.addLayout(header)
+
+        if MATPLOTLIB_AVAILABLE:
+            self.figura = Figure(figsize=(9, 6), facecolor='white')
+            self.canvas = FigureCanvas(self.figura)
+            layout.addWidget(self.canvas)
+        else:
+            # Sin matplotlib: la tabla coloreada hace de mapa de calor
+            self.tabla = QTableWidget()
+            self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+            layout.addWidget(self.tabla)
+
+    def actualizar(self):
+        """Actualiza la matriz (incremental) y la vuelve a dibujar."""
+        try:
+            datos = self.cohort_model.obtener_matriz()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al calcular cohortes:\n{e}")
+            return
+
+        # Solo cohortes con socios
+        filas = [i for i, t in enumerate(datos['tamanios']) if t > 0]
+        etiquetas = [
+            f"{self._formatear_mes(datos['cohortes'][i])} ({datos['tamanios'][i]})" for i in filas
+        ]
+        matriz = [datos['retencion'][i] for i in filas]
+
+        if MATPLOTLIB_AVAILABLE:
+            self._dibujar_heatmap(etiquetas, matriz)
+        else:
+            self._llenar_tabla(etiquetas, matriz)
+
+    def _dibujar_heatmap(self, etiquetas, matriz):
+        self.figura.clear()
+        ax = self.figura.add_subplot(111)
+        if not matriz:
+            ax.text(0.5, 0.5, "Sin datos de inscripciones", ha='center', va='center')
+            self.canvas.draw()
+            return
+
+        valores = [[float('nan') if v is None else v * 100 for v in fila] for fila in matriz]
+        imagen = ax.imshow(valores, cmap='YlGn', vmin=0, vmax=100, aspect='auto')
+        ax.set_yticks(range(len(etiquetas)))
+        ax.set_yticklabels(etiquetas, fontsize=8)
+        ax.set_xticks(range(len(valores[0])))
+        ax.set_xticklabels([str(m) for m in range(len(valores[0]))], fontsize=8)
+        ax.set_xlabel("Meses desde la inscripción", fontsize=10)
+        ax.set_title("Socios que pagaron (%)", fontsize=13, fontweight='bold')
+        self.figura.colorbar(imagen, ax=ax, fraction=0.03)
+        self.figura.tight_layout()
+        self.canvas.draw()
+
+    def _llenar_tabla(self, etiquetas, matriz):
+        columnas = len(matriz[0]) if matriz else 0
+        self.tabla.setRowCount(len(matriz))
+        self.tabla.setColumnCount(columnas)
+        self.tabla.setHorizontalHeaderLabels([str(m) for m in range(columnas)])
+        self.tabla.setVerticalHeaderLabels(etiquetas)
+
+        for row, fila in enumerate(matriz):
+            for col, valor in enumerate(fila):
+                if valor is None:
+                    continue
+                item = QTableWidgetItem(f"{valor:.0%}")
+                item.setTextAlignment(Qt.AlignCenter)
+                # Blanco -> verde según la retención
+                item.setBackground(QColor(int(255 - 179 * valor), int(255 - 80 * valor), int(255 - 175 * valor)))
+                self.tabla.setItem(row, col, item)
+
+    def _formatear_mes(self, mes):
+        return datetime.strptime(mes, "%Y-%m").strftime("%b %Y")
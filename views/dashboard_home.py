@@ -15,6 +15,10 @@ import sqlite3
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 
+from models.aging_model import AgingModel
+from models.alert_rules import AlertRulesModel
+from models.attendance_model import AttendanceModel, DIAS_SEMANA
+
 # Intentar importar matplotlib
 try:
     from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -31,6 +35,9 @@ class DashboardHome(QWidget):
         super().__init__()
         self.db_path = db_path
         self.notifications_model = notifications_model
+        self.aging_model = AgingModel(db_path)
+        self.reglas_alertas = AlertRulesModel(db_path)
+        self.attendance_model = AttendanceModel(db_path)
         self.init_ui()
         
         # Auto-actualizar cada 60 segundos
@@ -284,6 +291,37 @@ class DashboardHome(QWidget):
             graficos_layout2.addWidget(grafico3_group)
             graficos_layout2.addWidget(grafico4_group)
             layout.addLayout(graficos_layout2)
+
+            # Tercera fila: asistencia (solo lee los resúmenes por hora)
+            graficos_layout3 = QHBoxLayout()
+
+            # Gráfico 5: Ocupación por día y hora (mapa de calor)
+            grafico5_group = QGroupBox("🔥 Ocupación por Día y Hora (Últimas 12 Semanas)")
+            grafico5_layout = QVBoxLayout()
+
+            self.fig_ocupacion = Figure(figsize=(7, 4), facecolor='white')
+            self.canvas_ocupacion = FigureCanvas(self.fig_ocupacion)
+            self.canvas_ocupacion.setMinimumHeight(300)
+
+            grafico5_layout.addWidget(self.canvas_ocupacion)
+            grafico5_group.setLayout(grafico5_layout)
+            grafico5_group.setStyleSheet(self._get_groupbox_style("#F44336"))
+
+            # Gráfico 6: Asistencia semanal
+            grafico6_group = QGroupBox("🏃 Asistencia Semanal (Último Semestre)")
+            grafico6_layout = QVBoxLayout()
+
+            self.fig_asistencia = Figure(figsize=(7, 4), facecolor='white')
+            self.canvas_asistencia = FigureCanvas(self.fig_asistencia)
+            self.canvas_asistencia.setMinimumHeight(300)
+
+            grafico6_layout.addWidget(self.canvas_asistencia)
+            grafico6_group.setLayout(grafico6_layout)
+            grafico6_group.setStyleSheet(self._get_groupbox_style("#009688"))
+
+            graficos_layout3.addWidget(grafico5_group)
+            graficos_layout3.addWidget(grafico6_group)
+            layout.addLayout(graficos_layout3)
         else:
             # Mensaje si matplotlib no está instalado
             warning = self._crear_warning_matplotlib()
@@ -427,19 +465,8 @@ class DashboardHome(QWidget):
             ingresos = c.fetchone()[0]
             self.card_ingresos.lbl_valor.setText(f"${ingresos:,.0f}")
 
-            # Contar pagos vencidos
-            c.execute("""
-                SELECT COUNT(*) FROM (
-                    SELECT s.id
-                    FROM socios s
-                    LEFT JOIN pagos p ON s.id = p.socio_id
-                    LEFT JOIN planes pl ON s.plan_id = pl.id
-                    GROUP BY s.id
-                    HAVING MAX(p.fecha_pago) IS NULL 
-                    OR julianday('now') - julianday(MAX(p.fecha_pago)) > COALESCE(pl.duracion_dias, 30)
-                )
-            """)
-            vencidos = c.fetchone()[0]
+            # Contar pagos vencidos (con la gracia de cada plan)
+            vencidos = self.reglas_alertas.contar_vencidos()
             self.card_vencidos.lbl_valor.setText(str(vencidos))
 
             conn.close()
@@ -449,41 +476,12 @@ class DashboardHome(QWidget):
     def actualizar_alertas(self):
         """Actualiza la tabla de alertas urgentes."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            
-            c.execute("""
-                SELECT s.nombre || ' ' || s.apellido, 
-                       MAX(p.fecha_pago) as ultimo_pago,
-                       COALESCE(pl.duracion_dias, 30) as duracion,
-                       s.telefono
-                FROM socios s
-                LEFT JOIN pagos p ON s.id = p.socio_id
-                LEFT JOIN planes pl ON s.plan_id = pl.id
-                GROUP BY s.id
-            """)
-            
-            socios_data = c.fetchall()
-            vencidos = []
-            
-            for socio in socios_data:
-                nombre, ultimo_pago, duracion, telefono = socio
-                
-                if ultimo_pago:
-                    fecha_ultimo = datetime.strptime(ultimo_pago, '%Y-%m-%d')
-                    dias_transcurridos = (datetime.now() - fecha_ultimo).days
-                    
-                    if dias_transcurridos > duracion:
-                        dias_vencidos = dias_transcurridos - duracion
-                        vencidos.append((nombre, dias_vencidos, ultimo_pago, telefono))
-                else:
-                    vencidos.append((nombre, "Sin pagos", "Nunca", telefono or "Sin tel."))
-            
-            # Ordenar por días vencidos (mayor a menor)
-            vencidos_ordenados = sorted([v for v in vencidos if isinstance(v[1], int)], 
-                                       key=lambda x: x[1], reverse=True)
-            sin_pagos = [v for v in vencidos if not isinstance(v[1], int)]
-            vencidos = vencidos_ordenados + sin_pagos
+            # Los más atrasados ya vienen ordenados desde SQL
+            vencidos = [
+                (nombre, dias, ultimo_pago or "Nunca", telefono)
+                for _, _, nombre, telefono, _, ultimo_pago, dias, _, _, _
+                in self.aging_model.obtener_mas_atrasados(10)
+            ]
             
             # Mostrar top 10 o mensaje si no hay datos
             if len(vencidos) == 0:
@@ -513,11 +511,11 @@ class DashboardHome(QWidget):
                     self.tabla_alertas.setItem(row, 0, item_nombre)
                     
                     # Problema
-                    problema = f"Pago vencido" if isinstance(dias, int) else "Sin pagos registrados"
+                    problema = "Pago vencido" if fecha != "Nunca" else "Sin pagos registrados"
                     self.tabla_alertas.setItem(row, 1, QTableWidgetItem(problema))
                     
                     # Días vencido
-                    dias_texto = f"{dias} días" if isinstance(dias, int) else dias
+                    dias_texto = f"{dias} días"
                     item_dias = QTableWidgetItem(dias_texto)
                     item_dias.setForeground(QColor(211, 47, 47))
                     item_dias.setBackground(QColor(255, 235, 238))
@@ -542,8 +540,6 @@ class DashboardHome(QWidget):
                             it = self.tabla_alertas.item(r, c)
                             if it:
                                 it.setForeground(QColor(0, 0, 0))
-            
-            conn.close()
         except Exception as e:
             print(f"Error al actualizar alertas: {e}")
             # Mostrar mensaje de error en la tabla
@@ -567,42 +563,17 @@ class DashboardHome(QWidget):
     def actualizar_proximos_vencimientos(self):
         """Actualiza la tabla de próximos vencimientos."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            
-            c.execute("""
-                SELECT s.nombre || ' ' || s.apellido, 
-                       s.telefono,
-                       MAX(p.fecha_pago) as ultimo_pago,
-                       COALESCE(pl.duracion_dias, 30) as duracion
-                FROM socios s
-                LEFT JOIN pagos p ON s.id = p.socio_id
-                LEFT JOIN planes pl ON s.plan_id = pl.id
-                GROUP BY s.id
-            """)
-            
-            socios_data = c.fetchall()
-            proximos = []
-            
-            for socio in socios_data:
-                nombre, telefono, ultimo_pago, duracion = socio
-                
-                if ultimo_pago:
-                    fecha_ultimo = datetime.strptime(ultimo_pago, '%Y-%m-%d')
-                    dias_transcurridos = (datetime.now() - fecha_ultimo).days
-                    
-                    # Próximos a vencer (entre 0 y 5 días antes del vencimiento)
-                    if duracion - 5 <= dias_transcurridos <= duracion:
-                        dias_restantes = duracion - dias_transcurridos
-                        proximos.append((nombre, telefono or "Sin tel.", ultimo_pago, dias_restantes))
-            
-            # Ordenar por días restantes (menor a mayor)
-            proximos = sorted(proximos, key=lambda x: x[3])
+            # Dentro de la ventana de aviso de la regla de cada plan, ya ordenados por días restantes
+            proximos = [
+                (f"{nombre} {apellido}", telefono or "Sin tel.", ultimo_pago, dias_restantes)
+                for _, nombre, apellido, telefono, _, ultimo_pago, _, dias_restantes
+                in self.reglas_alertas.obtener_proximos()
+            ]
             
             # Mostrar datos o mensaje si no hay
             if len(proximos) == 0:
                 self.tabla_proximos.setRowCount(1)
-                item_vacio = QTableWidgetItem("✓ No hay vencimientos próximos en los siguientes 5 días")
+                item_vacio = QTableWidgetItem("✓ No hay vencimientos próximos")
                 item_vacio.setTextAlignment(Qt.AlignCenter)
                 item_vacio.setForeground(QColor(76, 175, 80))
                 self.tabla_proximos.setSpan(0, 0, 1, 4)
@@ -630,8 +601,6 @@ class DashboardHome(QWidget):
                     item_dias.setFont(self._get_bold_font())
                     item_dias.setTextAlignment(Qt.AlignCenter)
                     self.tabla_proximos.setItem(row, 3, item_dias)
-            
-            conn.close()
         except Exception as e:
             print(f"Error al actualizar próximos vencimientos: {e}")
             # Mostrar mensaje de error en la tabla
@@ -752,6 +721,55 @@ class DashboardHome(QWidget):
         except Exception as e:
             print(f"Error al actualizar gráficos: {e}")
 
+        self.actualizar_graficos_asistencia()
+
+    def actualizar_graficos_asistencia(self):
+        """Actualiza el mapa de ocupación y la tendencia semanal desde los baldes por hora."""
+        try:
+            matriz = self.attendance_model.obtener_ocupacion(semanas=12)
+            semanas = self.attendance_model.obtener_tendencia_semanal(semanas=26)
+        except Exception as e:
+            print(f"Error al actualizar gráficos de asistencia: {e}")
+            return
+
+        # === GRÁFICO 5: Ocupación por día y hora ===
+        # Solo las horas en que el gimnasio tuvo ingresos (por defecto, de 6 a 23)
+        horas = [h for h in range(24) if any(dia[h] for dia in matriz)] or list(range(6, 24))
+        horas = list(range(horas[0], horas[-1] + 1))
+
+        self.fig_ocupacion.clear()
+        ax5 = self.fig_ocupacion.add_subplot(111)
+        imagen = ax5.imshow([[dia[h] for h in horas] for dia in matriz],
+                            aspect='auto', cmap='YlOrRd', interpolation='nearest')
+        ax5.set_xticks(range(len(horas)))
+        ax5.set_xticklabels([f"{h}" for h in horas], fontsize=8)
+        ax5.set_yticks(range(7))
+        ax5.set_yticklabels(DIAS_SEMANA, fontsize=9)
+        ax5.set_xlabel("Hora", fontsize=11)
+        ax5.set_title("Asistencias Promedio por Hora", fontsize=14, fontweight='bold', pad=20)
+        self.fig_ocupacion.colorbar(imagen, ax=ax5)
+        self.fig_ocupacion.tight_layout()
+        self.canvas_ocupacion.draw()
+
+        # === GRÁFICO 6: Asistencia semanal ===
+        self.fig_asistencia.clear()
+        ax6 = self.fig_asistencia.add_subplot(111)
+        if semanas:
+            etiquetas = [datetime.strptime(s[0], "%Y-%m-%d").strftime("%d/%m") for s in semanas]
+            asistencias = [s[1] for s in semanas]
+            ax6.plot(etiquetas, asistencias, marker='o', color='#009688', linewidth=2, markersize=5)
+            ax6.fill_between(range(len(etiquetas)), asistencias, alpha=0.3, color='#009688')
+            ax6.tick_params(axis='x', rotation=45, labelsize=8)
+        else:
+            ax6.text(0.5, 0.5, "Sin asistencias registradas", ha='center', va='center',
+                     transform=ax6.transAxes, fontsize=12, color='gray')
+        ax6.set_title("Asistencias por Semana", fontsize=14, fontweight='bold', pad=20)
+        ax6.set_xlabel("Semana", fontsize=11)
+        ax6.set_ylabel("Asistencias", fontsize=11)
+        ax6.grid(True, alpha=0.3)
+        self.fig_asistencia.tight_layout()
+        self.canvas_asistencia.draw()
+
     def closeEvent(self, event):
         """Detiene el timer al cerrar."""
         if hasattr(self, 'timer'):
@@ -0,0 +1,150 @@
+"""
+views/duplicados_dialog.py
+Diálogo para revisar los posibles socios duplicados y fusionarlos.
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox
+)
+from PySide6.QtCore import Qt, Signal
+import threading
+
+from models.dedupe_model import DedupeModel
+from models.photo_store import PhotoStore
+
+
+class DuplicadosDialog(QDialog):
+    """Lista pares de socios que parecen la misma persona y permite fusionarlos."""
+
+    # Pares encontrados (o mensaje de error); emitida desde el hilo de búsqueda
+    encontrados = Signal(object)
+
+    def __init__(self, db_path, parent=None, photo_store=None):
+        super().__init__(parent)
+        self.model = DedupeModel(db_path, photo_store or PhotoStore())
+        self.pares = []
+        self.fusionados = 0
+        self.setWindowTitle("Socios Duplicados")
+        self.setMinimumSize(1100, 600)
+        self.encontrados.connect(self._mostrar_pares)
+        self.init_ui()
+        self.buscar()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("👥 Posibles Socios Duplicados")
+        title.setStyleSheet("font-size: 20px; font-weight: bold; margin: 10px;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        self.lbl_estado = QLabel("")
+        layout.addWidget(self.lbl_estado)
+
+        self.tabla = QTableWidget()
+        self.tabla.setColumnCount(7)
+        self.tabla.setHorizontalHeaderLabels([
+            "Coincidencia", "Socio A", "Teléfono A", "Pagos A", "Socio B", "Teléfono B", "Pagos B"
+        ])
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QTableWidget.SelectRows)
+        self.tabla.setColumnWidth(1, 220)
+        self.tabla.setColumnWidth(4, 220)
+        layout.addWidget(self.tabla)
+
+        botones = QHBoxLayout()
+        self.btn_buscar = QPushButton("↻ Buscar de nuevo")
+        self.btn_buscar.clicked.connect(self.buscar)
+        btn_conservar_a = QPushButton("⬅️ Conservar A")
+        btn_conservar_a.clicked.connect(lambda: self.fusionar(conservar_a=True))
+        btn_conservar_b = QPushButton("Conservar B ➡️")
+        btn_conservar_b.clicked.connect(lambda: self.fusionar(conservar_a=False))
+        for btn in (btn_conservar_a, btn_conservar_b):
+            btn.setStyleSheet("""
+                QPushButton {
+                    padding: 8px 18px;
+                    background: #2196F3;
+                    color: white;
+                    border-radius: 6px;
+                    font-weight: bold;
+                }
+                QPushButton:hover {
+                    background: #1976D2;
+                }
+            """)
+        botones.addWidget(self.btn_buscar)
+        botones.addStretch()
+        botones.addWidget(btn_conservar_a)
+        botones.addWidget(btn_conservar_b)
+        layout.addLayout(botones)
+
+    def buscar(self):
+        """Busca los duplicados en segundo plano (compara miles de pares)."""
+        self.btn_buscar.setEnabled(False)
+        self.lbl_estado.setText("Buscando duplicados...")
+        threading.Thread(target=self._ejecutar_busqueda, daemon=True).start()
+
+    def _ejecutar_busqueda(self):
+        try:
+            self.encontrados.emit(self.model.buscar_duplicados())
+        except Exception as e:
+            self.encontrados.emit(str(e))
+
+    def _mostrar_pares(self, pares):
+        self.btn_buscar.setEnabled(True)
+        if isinstance(pares, str):
+            self.lbl_estado.setText("")
+            QMessageBox.critical(self, "Error", f"Error al buscar duplicados:\n{pares}")
+            return
+        self.pares = pares
+        self._llenar_tabla()
+
+    def _llenar_tabla(self):
+        self.tabla.setUpdatesEnabled(False)
+        self.tabla.setRowCount(len(self.pares))
+        for row, (puntaje, a, b) in enumerate(self.pares):
+            valores = [
+                f"{puntaje:.0%}",
+                f"#{a[0]} {a[1]} {a[2]} (alta {a[4] or '-'})", a[3] or "", str(a[5]),
+                f"#{b[0]} {b[1]} {b[2]} (alta {b[4] or '-'})", b[3] or "", str(b[5]),
+            ]
+            for col, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if col in (0, 3, 6):
+                    item.setTextAlignment(Qt.AlignCenter)
+                self.tabla.setItem(row, col, item)
+        self.tabla.setUpdatesEnabled(True)
+        self.lbl_estado.setText(f"{len(self.pares)} pares de posibles duplicados.")
+
+    def fusionar(self, conservar_a):
+        """Fusiona el par seleccionado conservando el socio elegido."""
+        fila = self.tabla.currentRow()
+        if fila < 0:
+            QMessageBox.warning(self, "Atención", "Seleccioná un par de socios.")
+            return
+
+        _, a, b = self.pares[fila]
+        conservar, eliminar = (a, b) if conservar_a else (b, a)
+        reply = QMessageBox.question(
+            self, "Confirmar fusión",
+            f"Los {eliminar[5]} pagos y el historial de {eliminar[1]} {eliminar[2]} (#{eliminar[0]}) "
+            f"pasarán a {conservar[1]} {conservar[2]} (#{conservar[0]}), y se eliminará "
+            f"#{eliminar[0]}.\n\n¿Continuar?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        try:
+            self.model.fusionar(conservar[0], eliminar[0])
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo fusionar:\n{e}")
+            return
+
+        # Los pares del socio eliminado ya no valen; sin volver a comparar todo
+        self.fusionados += 1
+        self.pares = [p for p in self.pares if eliminar[0] not in (p[1][0], p[2][0])]
+        self._llenar_tabla()
@@ -94,16 +94,45 @@ Vista para gestionar socios con búsqueda y filtros mejorados.
 """
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QHBoxLayout, QMessageBox, QComboBox
+    QTableWidget, QTableWidgetItem, QHBoxLayout, QMessageBox, QComboBox, QFileDialog
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, Signal, QSize
+from PySide6.QtGui import QIcon
 import datetime
+import sqlite3
+import threading
+
+from models.photo_store import PhotoStore
+
+
+# Filas que se muestran como máximo en la tabla (la búsqueda corta en la base)
+LIMITE_SOCIOS = 200
+
+# Espera desde la última tecla antes de buscar
+DEBOUNCE_MS = 250
 
 
 class MembersView(QWidget):
-    def __init__(self, controller):
+    # id de la búsqueda, (socios encontrados, si son aproximados); emitida desde el hilo de búsqueda
+    resultados_busqueda = Signal(int, object)
+
+    def __init__(self, controller, writer=None, photo_store=None):
         super().__init__()
         self.controller = controller
+        self.writer = writer
+        self.photo_store = photo_store or PhotoStore()
+
+        # Búsqueda en segundo plano: solo se muestra la última, las viejas se interrumpen
+        self._busqueda_actual = 0
+        self._conn_busqueda = None
+        self._lock_busqueda = threading.Lock()
+        self.resultados_busqueda.connect(self._mostrar_resultados)
+
+        self.timer_busqueda = QTimer(self)
+        self.timer_busqueda.setSingleShot(True)
+        self.timer_busqueda.setInterval(DEBOUNCE_MS)
+        self.timer_busqueda.timeout.connect(self.buscar_socios)
+
         self.init_ui()
 
     def init_ui(self):
@@ -119,7 +148,8 @@ class MembersView(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Buscar por nombre, apellido o teléfono...")
-        self.search_input.textChanged.connect(self.buscar_socios)
+        # Cada tecla reinicia la espera; se busca al dejar de escribir
+        self.search_input.textChanged.connect(lambda _: self.timer_busqueda.start())
         self.search_input.setStyleSheet("""
             QLineEdit {
                 padding: 8px;
@@ -150,6 +180,10 @@ class MembersView(QWidget):
         search_layout.addWidget(btn_limpiar)
         layout.addLayout(search_layout)
 
+        self.lbl_resultados = QLabel("")
+        self.lbl_resultados.setStyleSheet("color: #666; margin-left: 4px;")
+        layout.addWidget(self.lbl_resultados)
+
         # --- FORMULARIO DE ALTA ---
         form_layout = QHBoxLayout()
         
@@ -195,6 +229,13 @@ class MembersView(QWidget):
         ])
         self.tabla.horizontalHeader().setStretchLastSection(True)
         self.tabla.setAlternatingRowColors(True)
+        # La miniatura va como ícono en la columna ID
+        lado = self.photo_store.lado_miniatura
+        self.tabla.setIconSize(QSize(lado, lado))
+        self.tabla.verticalHeader().setDefaultSectionSize(lado + 4)
+        self.tabla.setColumnWidth(0, lado + 60)
+        # Las fotos se cargan recién cuando las filas quedan a la vista
+        self.tabla.verticalScrollBar().valueChanged.connect(self._cargar_fotos_visibles)
         self.tabla.setStyleSheet("""
             QTableWidget {
                 border: 1px solid #ddd;
@@ -247,7 +288,39 @@ class MembersView(QWidget):
             }
         """)
         
+        self.btn_foto = QPushButton("📷 Foto")
+        self.btn_foto.clicked.connect(self.asignar_foto)
+        self.btn_foto.setStyleSheet("""
+            QPushButton {
+                padding: 8px 16px;
+                background: #17a2b8;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #138496;
+            }
+        """)
+
+        self.btn_duplicados = QPushButton("👥 Duplicados")
+        self.btn_duplicados.clicked.connect(self.abrir_duplicados)
+        self.btn_duplicados.setStyleSheet("""
+            QPushButton {
+                padding: 8px 16px;
+                background: #6f42c1;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #5a32a3;
+            }
+        """)
+
+        btn_layout.addWidget(self.btn_duplicados)
         btn_layout.addStretch()
+        btn_layout.addWidget(self.btn_foto)
         btn_layout.addWidget(self.btn_editar)
         btn_layout.addWidget(self.btn_eliminar)
         layout.addLayout(btn_layout)
@@ -262,18 +335,15 @@ class MembersView(QWidget):
         for plan in planes:
             self.combo_plan.addItem(plan[1], plan[0])  # nombre, id
 
-    def cargar_socios(self, filtro=""):
-        """Carga socios en la tabla con filtro opcional."""
-        socios = self.controller.obtener_todos()
-        
-        # Aplicar filtro si existe
-        if filtro:
-            filtro = filtro.lower()
-            socios = [s for s in socios if 
-                     filtro in str(s[1]).lower() or  # nombre
-                     filtro in str(s[2]).lower() or  # apellido
-                     filtro in str(s[3]).lower()]    # teléfono
-        
+    def cargar_socios(self, filtro=None):
+        """Carga socios en la tabla (por defecto, con la búsqueda actual)."""
+        if filtro is None:
+            filtro = self.search_input.text().strip()
+        self._llenar_tabla(self.controller.buscar(filtro, LIMITE_SOCIOS), filtro)
+
+    def _llenar_tabla(self, socios, filtro=""):
+        """Reemplaza el contenido de la tabla sin redibujar fila por fila."""
+        self.tabla.setUpdatesEnabled(False)
         self.tabla.setRowCount(len(socios))
         for row, socio in enumerate(socios):
             self.tabla.setItem(row, 0, QTableWidgetItem(str(socio[0])))  # ID
@@ -283,16 +353,144 @@ class MembersView(QWidget):
             self.tabla.setItem(row, 5, QTableWidgetItem(str(socio[4]) if socio[4] else ""))  # Fecha
             # Plan (índice 5 en la consulta)
             self.tabla.setItem(row, 4, QTableWidgetItem(str(socio[5]) if socio[5] else "Sin plan"))
+        self.tabla.setUpdatesEnabled(True)
+        # Después de que la tabla calcule la geometría de las filas nuevas
+        QTimer.singleShot(0, self._cargar_fotos_visibles)
+
+        if len(socios) >= LIMITE_SOCIOS:
+            detalle = "Refiná la búsqueda para ver otros." if filtro else "Usá la búsqueda para encontrar otros."
+            self.lbl_resultados.setText(f"Mostrando los primeros {LIMITE_SOCIOS} socios. {detalle}")
+        else:
+            self.lbl_resultados.setText(f"{len(socios)} socios encontrados." if filtro else "")
+
+    def _cargar_fotos_visibles(self, *_):
+        """Pone la miniatura de las filas visibles que todavía no la tienen (una consulta)."""
+        if self.tabla.rowCount() == 0:
+            return
+        primera = max(self.tabla.rowAt(0), 0)
+        ultima = self.tabla.rowAt(self.tabla.viewport().height() - 1)
+        if ultima < 0:
+            ultima = self.tabla.rowCount() - 1
+
+        # UserRole guarda el hash ('' sin foto); None = todavía no se consultó
+        pendientes = {}
+        for row in range(primera, ultima + 1):
+            item = self.tabla.item(row, 0)
+            if item is not None and item.data(Qt.UserRole) is None:
+                pendientes[int(item.text())] = item
+        if not pendientes:
+            return
+
+        try:
+            fotos = self.controller.obtener_fotos(list(pendientes))
+        except Exception as e:
+            print(f"Error al cargar las fotos: {e}")
+            return
+
+        for socio_id, item in pendientes.items():
+            foto_hash = fotos.get(socio_id) or ""
+            item.setData(Qt.UserRole, foto_hash)
+            if foto_hash:
+                item.setIcon(QIcon(self.photo_store.pixmap(foto_hash)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Al agrandar la ventana pueden quedar a la vista filas sin foto
+        self._cargar_fotos_visibles()
+
+    def asignar_foto(self):
+        """Elige una imagen y la guarda como foto del socio seleccionado."""
+        fila = self.tabla.currentRow()
+        if fila < 0:
+            QMessageBox.warning(self, "Error", "Seleccioná un socio para asignarle la foto.")
+            return
+
+        ruta, _ = QFileDialog.getOpenFileName(
+            self, "Foto del socio", "", "Imágenes (*.jpg *.jpeg *.png *.bmp)"
+        )
+        if not ruta:
+            return
+
+        socio_id = int(self.tabla.item(fila, 0).text())
+        try:
+            foto_hash = self.photo_store.guardar(ruta)
+            self.controller.asignar_foto(socio_id, foto_hash)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar la foto:\n{e}")
+            return
+
+        item = self.tabla.item(fila, 0)
+        item.setData(Qt.UserRole, foto_hash)
+        item.setIcon(QIcon(self.photo_store.pixmap(foto_hash)))
+
+    def abrir_duplicados(self):
+        """Abre la revisión de socios duplicados y recarga la tabla si hubo fusiones."""
+        from views.duplicados_dialog import DuplicadosDialog
+        dialogo = DuplicadosDialog(self.controller.db_path, self, self.photo_store)
+        dialogo.exec()
+        if dialogo.fusionados:
+            self.cargar_socios()
 
     def buscar_socios(self):
-        """Busca socios mientras el usuario escribe."""
+        """Busca en segundo plano con el texto actual e interrumpe la búsqueda anterior."""
         filtro = self.search_input.text().strip()
-        self.cargar_socios(filtro)
+        with self._lock_busqueda:
+            self._busqueda_actual += 1
+            busqueda_id = self._busqueda_actual
+            if self._conn_busqueda is not None:
+                self._conn_busqueda.interrupt()
+
+        threading.Thread(
+            target=self._ejecutar_busqueda, args=(busqueda_id, filtro), daemon=True
+        ).start()
+
+    def _ejecutar_busqueda(self, busqueda_id, filtro):
+        conn = sqlite3.connect(self.controller.db_path, check_same_thread=False)
+        with self._lock_busqueda:
+            if busqueda_id != self._busqueda_actual:
+                conn.close()
+                return
+            self._conn_busqueda = conn
+
+        socios = None
+        aproximados = False
+        try:
+            socios = self.controller.buscar_en(conn, filtro, LIMITE_SOCIOS)
+            if not socios and filtro:
+                # Sin coincidencias exactas: probar con nombres parecidos (errores de tipeo)
+                socios = self.controller.buscar_similares_en(conn, filtro)
+                aproximados = True
+        except sqlite3.OperationalError as e:
+            # "interrupted": llegó una búsqueda más nueva
+            if busqueda_id == self._busqueda_actual:
+                print(f"Error al buscar socios: {e}")
+        finally:
+            with self._lock_busqueda:
+                if self._conn_busqueda is conn:
+                    self._conn_busqueda = None
+                conn.close()
+
+        if socios is not None:
+            self.resultados_busqueda.emit(busqueda_id, (socios, aproximados))
+
+    def _mostrar_resultados(self, busqueda_id, resultado):
+        """Muestra los resultados solo si siguen siendo los de la última búsqueda."""
+        if busqueda_id != self._busqueda_actual:
+            return
+        socios, aproximados = resultado
+        self._llenar_tabla(socios, self.search_input.text().strip())
+        if aproximados and socios:
+            self.lbl_resultados.setText("Sin coincidencias exactas. Socios con nombre parecido:")
 
     def limpiar_busqueda(self):
-        """Limpia la búsqueda y recarga todos los socios."""
+        """Limpia la búsqueda y recarga los últimos socios."""
+        self.timer_busqueda.stop()
+        self.search_input.blockSignals(True)
         self.search_input.clear()
-        self.cargar_socios()
+        self.search_input.blockSignals(False)
+        with self._lock_busqueda:
+            self._busqueda_actual += 1
+        self.cargar_socios("")
 
     def agregar_socio(self):
         """Agrega un nuevo socio."""
@@ -306,7 +504,21 @@ class MembersView(QWidget):
             QMessageBox.warning(self, "Error", "Nombre y apellido son obligatorios.")
             return
 
+        if self.writer:
+            # La escritura se hace en el hilo escritor; la GUI no se bloquea
+            self.btn_agregar.setEnabled(False)
+            self.writer.encolar(
+                self.controller.insertar, nombre, apellido, telefono, fecha_alta, plan_id,
+                al_completar=self._socio_agregado, al_fallar=self._error_escritura
+            )
+            return
+
         self.controller.agregar(nombre, apellido, telefono, fecha_alta, plan_id)
+        self._socio_agregado()
+
+    def _socio_agregado(self, socio_id=None):
+        """Refresca la tabla una vez guardado el socio."""
+        self.btn_agregar.setEnabled(True)
         self.cargar_socios()
         
         # Limpiar campos
@@ -316,6 +528,11 @@ class MembersView(QWidget):
         
         QMessageBox.information(self, "Éxito", "Socio agregado correctamente.")
 
+    def _error_escritura(self, mensaje):
+        """Informa un error devuelto por el hilo escritor."""
+        self.btn_agregar.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"No se pudo guardar el socio:\n{mensaje}")
+
     def editar_socio(self):
         """Edita el socio seleccionado."""
         fila = self.tabla.currentRow()
@@ -4,17 +4,215 @@ Vista para gestionar notificaciones y alertas del sistema.
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QPushButton, QHBoxLayout, QMessageBox, QGroupBox, QFrame
+    QWidget, QVBoxLayout, QLabel, QTableView, QAbstractItemView,
+    QPushButton, QHBoxLayout, QMessageBox, QGroupBox, QFrame, QComboBox
 )
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex, Signal
 from PySide6.QtGui import QColor
+import threading
+
+
+# Filas que se piden a la base cada vez que la tabla llega al final de lo cargado
+FILAS_POR_PAGINA = 200
+
+# Si el tramo visible cambió en más filas que esto, se recarga desde el principio
+MAX_FILAS_REFRESCO = 1000
+
+TIPOS = {
+    'pago_vencido': '⚠️ Pago Vencido',
+    'proximo_vencimiento': '⏰ Próximo a Vencer',
+    'sin_pagos': '❌ Sin Pagos',
+    'renovacion': '🔄 Renovación',
+    'otro': 'ℹ️ Información'
+}
+
+COLORES_PRIORIDAD = {
+    'alta': QColor(244, 67, 54, 50),    # Rojo claro
+    'media': QColor(255, 152, 0, 50),   # Naranja claro
+}
+COLOR_PRIORIDAD_NORMAL = QColor(33, 150, 243, 50)  # Azul claro
+
+
+def _clave(notif):
+    """Clave de orden de una fila: (rango, fecha_creacion, id)."""
+    return (notif[8], notif[5], notif[0])
+
+
+def _antes(a, b):
+    """True si la fila a va antes que la b (rango ascendente, más nuevas primero)."""
+    if a[8] != b[8]:
+        return a[8] < b[8]
+    return (a[5], a[0]) > (b[5], b[0])
+
+
+class NotificacionesTableModel(QAbstractTableModel):
+    """
+    Notificaciones pendientes para un QTableView. Las filas se piden a la
+    base de a páginas a medida que se hace scroll (canFetchMore/fetchMore) y
+    el texto y los colores se calculan en data(), solo para las celdas visibles.
+    """
+
+    COLUMNAS = ["ID", "Socio", "Tipo", "Mensaje", "Fecha", "Prioridad"]
+
+    def __init__(self, notifications_model, parent=None):
+        super().__init__(parent)
+        self.notifications_model = notifications_model
+        self._filas = []
+        self._hay_mas = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNAS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        notif = self._filas[index.row()]
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(notif[0])
+            if col == 1:
+                return notif[2]
+            if col == 2:
+                return TIPOS.get(notif[3], notif[3])
+            if col == 3:
+                return notif[4]
+            if col == 4:
+                return notif[5].split()[0] if notif[5] else ""
+            return (notif[6] or "").upper()
+
+        if role == Qt.BackgroundRole and col < 5:
+            # Como antes, la columna de prioridad queda sin color
+            return COLORES_PRIORIDAD.get(notif[6], COLOR_PRIORIDAD_NORMAL)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._hay_mas
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._hay_mas:
+            return
+        ultima = self._filas[-1] if self._filas else None
+        pagina = self.notifications_model.obtener_pendientes_pagina(
+            FILAS_POR_PAGINA, (ultima[8], ultima[5], ultima[0]) if ultima else None
+        )
+        self._hay_mas = len(pagina) == FILAS_POR_PAGINA
+        if pagina:
+            inicio = len(self._filas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+            self._filas.extend(pagina)
+            self.endInsertRows()
+
+    def recargar(self):
+        """Descarta lo cargado y vuelve a pedir la primera página."""
+        filas = self.notifications_model.obtener_pendientes_pagina(FILAS_POR_PAGINA)
+        self.beginResetModel()
+        self._filas = filas
+        self._hay_mas = len(filas) == FILAS_POR_PAGINA
+        self.endResetModel()
+
+    def refrescar(self, primera, ultima):
+        """
+        Vuelve a leer solo las filas primera..ultima (las visibles) y aplica las
+        diferencias fila por fila: quita las que ya no están pendientes, agrega
+        las nuevas en su lugar y actualiza las que cambiaron. Como no se
+        reinicia el modelo, la selección y el scroll se conservan.
+        """
+        if not self._filas:
+            self.recargar()
+            return
+        primera = max(0, min(primera, len(self._filas) - 1))
+        ultima = max(primera, min(ultima, len(self._filas) - 1))
+        # Desde el principio si se ve la primera fila (ahí aparecen las nuevas más urgentes)
+        desde = None if primera == 0 else _clave(self._filas[primera])
+        hasta = None if ultima == len(self._filas) - 1 and not self._hay_mas else _clave(self._filas[ultima])
+        nuevas = self.notifications_model.obtener_pendientes_entre(desde, hasta, MAX_FILAS_REFRESCO)
+        if nuevas is None:
+            # Demasiados cambios en el tramo: sale más barato empezar de nuevo
+            self.recargar()
+            return
+
+        fila, fin = primera, ultima + 1
+        for nueva in nuevas:
+            # Las cargadas que quedan antes de la nueva ya no están pendientes
+            quitar = fila
+            while quitar < fin and _antes(self._filas[quitar], nueva) and self._filas[quitar][0] != nueva[0]:
+                quitar += 1
+            if quitar > fila:
+                self._quitar_filas(fila, quitar - 1)
+                fin -= quitar - fila
+
+            if fila < fin and self._filas[fila][0] == nueva[0]:
+                if self._filas[fila] != nueva:
+                    self._filas[fila] = nueva
+                    self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(self.COLUMNAS) - 1))
+                fila += 1
+                continue
+
+            # Si cambió de lugar (por ejemplo, de prioridad), se quita la copia vieja
+            vieja = next((i for i, f in enumerate(self._filas) if f[0] == nueva[0]), None)
+            if vieja is not None:
+                self._quitar_filas(vieja, vieja)
+                if vieja < fila:
+                    fila -= 1
+                if vieja < fin:
+                    fin -= 1
+            self.beginInsertRows(QModelIndex(), fila, fila)
+            self._filas.insert(fila, nueva)
+            self.endInsertRows()
+            fila += 1
+            fin += 1
+
+        if fila < fin:
+            self._quitar_filas(fila, fin - 1)
+
+    def quitar(self, ids):
+        """Quita de la tabla las notificaciones marcadas, sin volver a leerlas."""
+        ids = set(ids)
+        fila = len(self._filas) - 1
+        while fila >= 0:
+            if self._filas[fila][0] not in ids:
+                fila -= 1
+                continue
+            # Se quita cada tramo seguido de una vez, de abajo hacia arriba
+            fin = fila
+            while fila > 0 and self._filas[fila - 1][0] in ids:
+                fila -= 1
+            self._quitar_filas(fila, fin)
+            fila -= 1
+
+    def _quitar_filas(self, primera, ultima):
+        self.beginRemoveRows(QModelIndex(), primera, ultima)
+        del self._filas[primera:ultima + 1]
+        self.endRemoveRows()
+
+    def id_notificacion(self, fila):
+        return self._filas[fila][0]
 
 
 class NotificationsView(QWidget):
-    def __init__(self, notifications_model):
+    # Filas borradas hasta ahora / total (o mensaje de error) de la limpieza en segundo plano
+    limpieza_progreso = Signal(int)
+    limpieza_terminada = Signal(object)
+
+    def __init__(self, notifications_model, writer=None):
         super().__init__()
         self.model = notifications_model
+        self.writer = writer
+        # Métodos del widget (no lambdas): así Qt los encola al hilo de la GUI
+        self.limpieza_progreso.connect(self._limpieza_progreso)
+        self.limpieza_terminada.connect(self._limpieza_terminada)
+        # Pila de marcados (listas de IDs) para poder deshacerlos
+        self.deshacer = []
         self.init_ui()
         self.cargar_notificaciones()
         
@@ -101,16 +299,16 @@ class NotificationsView(QWidget):
         layout.addLayout(btn_layout)
 
         # Tabla de notificaciones
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(6)
-        self.tabla.setHorizontalHeaderLabels([
-            "ID", "Socio", "Tipo", "Mensaje", "Fecha", "Prioridad"
-        ])
+        self.tabla_model = NotificacionesTableModel(self.model, self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.tabla_model)
         self.tabla.horizontalHeader().setStretchLastSection(True)
+        self.tabla.verticalHeader().setDefaultSectionSize(28)
         self.tabla.setAlternatingRowColors(True)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectRows)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.tabla.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 border-radius: 6px;
             }
@@ -155,9 +353,35 @@ class NotificationsView(QWidget):
             }
         """)
         self.btn_marcar_todas.clicked.connect(self.marcar_todas_leidas)
+
+        self.combo_tipo = QComboBox()
+        self.combo_tipo.addItem("Todos los tipos", None)
+        for tipo in ('pago_vencido', 'proximo_vencimiento', 'sin_pagos', 'renovacion', 'otro'):
+            self.combo_tipo.addItem(self._formatear_tipo(tipo), tipo)
+
+        self.btn_deshacer = QPushButton("↩️ Deshacer")
+        self.btn_deshacer.setStyleSheet("""
+            QPushButton {
+                padding: 10px 20px;
+                background: #9E9E9E;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #757575;
+            }
+            QPushButton:disabled {
+                background: #E0E0E0;
+            }
+        """)
+        self.btn_deshacer.setEnabled(False)
+        self.btn_deshacer.clicked.connect(self.deshacer_marcado)
         
+        action_layout.addWidget(self.btn_deshacer)
         action_layout.addStretch()
         action_layout.addWidget(self.btn_marcar_leida)
+        action_layout.addWidget(self.combo_tipo)
         action_layout.addWidget(self.btn_marcar_todas)
         layout.addLayout(action_layout)
 
@@ -191,59 +415,21 @@ class NotificationsView(QWidget):
         return frame
 
     def cargar_notificaciones(self):
-        """Carga las notificaciones en la tabla."""
-        notificaciones = self.model.obtener_notificaciones_pendientes()
-        self.tabla.setRowCount(len(notificaciones))
-
-        for row, notif in enumerate(notificaciones):
-            # ID
-            self.tabla.setItem(row, 0, QTableWidgetItem(str(notif[0])))
-            
-            # Socio
-            self.tabla.setItem(row, 1, QTableWidgetItem(notif[2]))
-            
-            # Tipo
-            tipo_item = QTableWidgetItem(self._formatear_tipo(notif[3]))
-            self.tabla.setItem(row, 2, tipo_item)
-            
-            # Mensaje
-            self.tabla.setItem(row, 3, QTableWidgetItem(notif[4]))
-            
-            # Fecha
-            fecha = notif[5].split()[0] if notif[5] else ""
-            self.tabla.setItem(row, 4, QTableWidgetItem(fecha))
-            
-            # Prioridad
-            prioridad_item = QTableWidgetItem(notif[6].upper())
-            
-            # Colorear según prioridad
-            if notif[6] == 'alta':
-                color = QColor(244, 67, 54, 50)  # Rojo claro
-            elif notif[6] == 'media':
-                color = QColor(255, 152, 0, 50)  # Naranja claro
-            else:
-                color = QColor(33, 150, 243, 50)  # Azul claro
-            
-            for col in range(6):
-                item = self.tabla.item(row, col)
-                if item:
-                    item.setBackground(color)
-            
-            self.tabla.setItem(row, 5, prioridad_item)
+        """Refresca las filas visibles de la tabla y las estadísticas."""
+        alto = self.tabla.viewport().height()
+        primera = self.tabla.rowAt(0)
+        ultima = self.tabla.rowAt(alto - 1)
+        self.tabla_model.refrescar(
+            max(primera, 0),
+            ultima if ultima >= 0 else self.tabla_model.rowCount() - 1
+        )
 
         # Actualizar estadísticas
         self.actualizar_estadisticas()
 
     def _formatear_tipo(self, tipo):
         """Formatea el tipo de notificación para mostrar."""
-        tipos = {
-            'pago_vencido': '⚠️ Pago Vencido',
-            'proximo_vencimiento': '⏰ Próximo a Vencer',
-            'sin_pagos': '❌ Sin Pagos',
-            'renovacion': '🔄 Renovación',
-            'otro': 'ℹ️ Información'
-        }
-        return tipos.get(tipo, tipo)
+        return TIPOS.get(tipo, tipo)
 
     def actualizar_estadisticas(self):
         """Actualiza las estadísticas mostradas."""
@@ -255,65 +441,127 @@ class NotificationsView(QWidget):
     def verificar_pagos(self):
         """Ejecuta la verificación de pagos vencidos."""
         try:
-            cantidad = self.model.verificar_pagos_vencidos()
+            cantidades = self.model.verificar_pagos_vencidos()
             QMessageBox.information(
                 self,
                 "Verificación Completa",
-                f"Se crearon {cantidad} nuevas notificaciones de pagos vencidos."
+                f"Se crearon {cantidades['total']} nuevas notificaciones:\n\n"
+                f"⚠️ Pagos vencidos: {cantidades['pago_vencido']}\n"
+                f"⏰ Próximos a vencer: {cantidades['proximo_vencimiento']}\n"
+                f"❌ Sin pagos: {cantidades['sin_pagos']}"
             )
             self.cargar_notificaciones()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al verificar pagos: {str(e)}")
 
     def limpiar_antiguas(self):
-        """Limpia notificaciones antiguas."""
+        """Limpia notificaciones antiguas en segundo plano, de a lotes."""
         reply = QMessageBox.question(
             self,
             "Confirmar",
-            "¿Eliminar notificaciones leídas con más de 30 días?",
+            "¿Eliminar las notificaciones leídas más viejas que su plazo de retención?",
             QMessageBox.Yes | QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            cantidad = self.model.limpiar_notificaciones_antiguas()
-            QMessageBox.information(
-                self,
-                "Limpieza Completa",
-                f"Se eliminaron {cantidad} notificaciones antiguas."
+            self.btn_limpiar.setEnabled(False)
+            threading.Thread(target=self._ejecutar_limpieza, daemon=True).start()
+
+    def _ejecutar_limpieza(self):
+        try:
+            cantidad = self.model.limpiar_notificaciones_antiguas(
+                progreso=lambda _, borradas: self.limpieza_progreso.emit(borradas)
             )
-            self.cargar_notificaciones()
+            self.limpieza_terminada.emit(cantidad)
+        except Exception as e:
+            self.limpieza_terminada.emit(str(e))
+
+    def _limpieza_progreso(self, borradas):
+        self.btn_limpiar.setText(f"🧹 Limpiando... {borradas}")
+
+    def _limpieza_terminada(self, cantidad):
+        self.btn_limpiar.setEnabled(True)
+        self.btn_limpiar.setText("🧹 Limpiar Antiguas")
+        if isinstance(cantidad, str):
+            QMessageBox.critical(self, "Error", f"Error al limpiar notificaciones:\n{cantidad}")
+            return
+        QMessageBox.information(
+            self,
+            "Limpieza Completa",
+            f"Se eliminaron {cantidad} notificaciones antiguas."
+        )
+        self.cargar_notificaciones()
 
     def marcar_leida(self):
-        """Marca la notificación seleccionada como leída."""
-        fila = self.tabla.currentRow()
-        if fila < 0:
+        """Marca como leídas las notificaciones seleccionadas."""
+        filas = sorted({index.row() for index in self.tabla.selectionModel().selectedRows()})
+        if not filas:
             QMessageBox.warning(self, "Error", "Seleccioná una notificación.")
             return
-        
-        notif_id = int(self.tabla.item(fila, 0).text())
-        self.model.marcar_como_leida(notif_id)
-        self.cargar_notificaciones()
+
+        ids = [self.tabla_model.id_notificacion(fila) for fila in filas]
+        self._marcar(ids, None)
 
     def marcar_todas_leidas(self):
-        """Marca todas las notificaciones como leídas."""
+        """Marca como leídas todas las pendientes (o las del tipo elegido)."""
+        tipo = self.combo_tipo.currentData()
+        texto = f"las notificaciones \"{self.combo_tipo.currentText()}\"" if tipo else "todas las notificaciones"
         reply = QMessageBox.question(
             self,
             "Confirmar",
-            "¿Marcar todas las notificaciones como leídas?",
+            f"¿Marcar {texto} como leídas?",
             QMessageBox.Yes | QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            notificaciones = self.model.obtener_notificaciones_pendientes()
-            for notif in notificaciones:
-                self.model.marcar_como_leida(notif[0])
-            
-            self.cargar_notificaciones()
-            QMessageBox.information(
-                self,
-                "Completado",
-                "Todas las notificaciones fueron marcadas como leídas."
+            self._marcar(None, {'tipo': tipo} if tipo else None)
+
+    def _marcar(self, ids, filtro):
+        """Marca en una sola sentencia y refresca la tabla una vez al terminar."""
+        if self.writer:
+            # La escritura se hace en el hilo escritor; la GUI no se bloquea
+            self.writer.encolar(
+                self.model.marcar_leidas_en, ids, filtro,
+                al_completar=self._marcado_completo,
+                al_fallar=lambda msg: QMessageBox.critical(self, "Error", f"No se pudo actualizar:\n{msg}")
             )
+            return
+
+        try:
+            marcadas = self.model.marcar_leidas(ids, filtro)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo actualizar:\n{e}")
+            return
+        self._marcado_completo(marcadas)
+
+    def _marcado_completo(self, marcadas):
+        if marcadas:
+            self.deshacer.append(marcadas)
+            self.btn_deshacer.setEnabled(True)
+            self.tabla_model.quitar(marcadas)
+        self.cargar_notificaciones()
+
+    def deshacer_marcado(self):
+        """Vuelve a dejar pendientes las notificaciones del último marcado."""
+        if not self.deshacer:
+            return
+        ids = self.deshacer.pop()
+        self.btn_deshacer.setEnabled(bool(self.deshacer))
+
+        if self.writer:
+            self.writer.encolar(
+                self.model.desmarcar_leidas_en, ids,
+                al_completar=lambda _: self.cargar_notificaciones(),
+                al_fallar=lambda msg: QMessageBox.critical(self, "Error", f"No se pudo deshacer:\n{msg}")
+            )
+            return
+
+        try:
+            self.model.desmarcar_leidas(ids)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo deshacer:\n{e}")
+            return
+        self.cargar_notificaciones()
 
     def closeEvent(self, event):
         """Detiene el timer al cerrar."""
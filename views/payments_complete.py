@@ -975,9 +975,7 @@ class PaymentsCompleteView(QWidget):
         stats_group = QGroupBox("📊 Resumen del Mes Actual")
         stats_layout = QHBoxLayout()
         
-        mes_actual_inicio = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-        mes_actual_fin = datetime.now().strftime('%Y-%m-%d')
-        stats = self.controller.obtener_estadisticas(mes_actual_inicio, mes_actual_fin)
+        stats = self.controller.obtener_estadisticas_mes_actual()
         
         self.card_total_mes = self._crear_card("Total del Mes", f"${stats['total_ingresos']:,.0f}", "#4CAF50")
         self.card_pagos_mes = self._crear_card("Pagos Registrados", str(stats['total_pagos']), "#2196F3")
@@ -1509,10 +1507,8 @@ class PaymentsCompleteView(QWidget):
             QMessageBox.critical(self, "Error", f"Error al exportar:\n{str(e)}")
 
     def actualizar_estadisticas(self):
-        """Actualiza las tarjetas de estadísticas."""
-        mes_actual_inicio = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-        mes_actual_fin = datetime.now().strftime('%Y-%m-%d')
-        stats = self.controller.obtener_estadisticas(mes_actual_inicio, mes_actual_fin)
+        """Actualiza las tarjetas desde los contadores del mes (tiempo constante)."""
+        stats = self.controller.obtener_estadisticas_mes_actual()
         
         self.card_total_mes.lbl_valor.setText(f"${stats['total_ingresos']:,.0f}")
         self.card_pagos_mes.lbl_valor.setText(str(stats['total_pagos']))
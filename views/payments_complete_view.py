@@ -13,10 +13,11 @@ from .historial_socio_dialog import HistorialSocioDialog
 
 class PaymentsCompleteView(QWidget):
     """Vista completa de pagos de socios."""
-    def __init__(self, controller, email_service=None):
+    def __init__(self, controller, email_service=None, writer=None):
         super().__init__()
         self.controller = controller
         self.email_service = email_service
+        self.writer = writer
         self.pago_seleccionado = None
         self.init_ui()
 
@@ -25,6 +26,11 @@ class PaymentsCompleteView(QWidget):
         self.timer.timeout.connect(self.actualizar_datos)
         self.timer.start(60000)
 
+        # Corregir los contadores del mes cada 15 minutos
+        self.timer_resumen = QTimer()
+        self.timer_resumen.timeout.connect(self.corregir_resumen)
+        self.timer_resumen.start(15 * 60000)
+
     def init_ui(self):
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -49,9 +55,7 @@ class PaymentsCompleteView(QWidget):
         stats_group = QGroupBox("📊 Resumen del Mes Actual")
         stats_layout = QHBoxLayout()
 
-        mes_inicio = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-        mes_fin = datetime.now().strftime('%Y-%m-%d')
-        stats = self.controller.obtener_estadisticas(mes_inicio, mes_fin)
+        stats = self.controller.obtener_estadisticas_mes_actual()
 
         self.card_total_mes = self._crear_card("Total del Mes", f"${stats['total_ingresos']:,.0f}", "#4CAF50")
         self.card_pagos_mes = self._crear_card("Pagos Registrados", str(stats['total_pagos']), "#2196F3")
@@ -241,10 +245,24 @@ class PaymentsCompleteView(QWidget):
             if QMessageBox.question(self, "Pago duplicado", "Ya existe un pago para este mes. ¿Registrar igual?",
                                     QMessageBox.Yes | QMessageBox.No) == QMessageBox.No:
                 return
+        if self.writer:
+            # La escritura se hace en el hilo escritor; la GUI no se bloquea
+            self.writer.encolar(
+                self.controller.payments_model.insertar_pago, socio_id, monto, mes, metodo, "",
+                al_completar=self._pago_registrado, al_fallar=self._error_escritura
+            )
+            return
         self.controller.registrar_pago(socio_id, monto, mes, metodo)
+        self._pago_registrado()
+
+    def _pago_registrado(self, pago_id=None):
         self.cargar_pagos()
+        self.actualizar_estadisticas()
         QMessageBox.information(self, "Éxito", "Pago registrado correctamente")
 
+    def _error_escritura(self, mensaje):
+        QMessageBox.critical(self, "Error", f"No se pudo guardar el pago:\n{mensaje}")
+
     def editar_pago(self):
         fila = self.tabla.currentRow()
         if fila < 0: return QMessageBox.warning(self, "Error", "Seleccioná un pago")
@@ -256,6 +274,7 @@ class PaymentsCompleteView(QWidget):
             monto, mes, metodo, obs = dialogo.obtener_datos()
             self.controller.actualizar_pago(pago_id, monto, mes, metodo, obs)
             self.cargar_pagos()
+            self.actualizar_estadisticas()
 
     def eliminar_pago(self):
         fila = self.tabla.currentRow()
@@ -264,6 +283,7 @@ class PaymentsCompleteView(QWidget):
         if QMessageBox.question(self, "Eliminar", "¿Eliminar este pago?", QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
             self.controller.eliminar_pago(pago_id)
             self.cargar_pagos()
+            self.actualizar_estadisticas()
 
     def ver_historial_socio(self):
         fila = self.tabla.currentRow()
@@ -351,5 +371,26 @@ class PaymentsCompleteView(QWidget):
         self.cmb_filtro_anio.setCurrentIndex(0)
         self.cargar_pagos()
 
+    def actualizar_estadisticas(self):
+        """Actualiza las tarjetas desde los contadores del mes (tiempo constante)."""
+        stats = self.controller.obtener_estadisticas_mes_actual()
+        self.card_total_mes.lbl_valor.setText(f"${stats['total_ingresos']:,.0f}")
+        self.card_pagos_mes.lbl_valor.setText(str(stats['total_pagos']))
+        self.card_socios_mes.lbl_valor.setText(str(stats['socios_pagaron']))
+        self.card_promedio.lbl_valor.setText(f"${stats['promedio_pago']:,.0f}")
+
+    def corregir_resumen(self):
+        """Recalcula los contadores del mes actual para corregir cualquier desvío."""
+        mes = datetime.now().strftime('%Y-%m')
+        if self.writer:
+            self.writer.encolar(
+                self.controller.payments_model.recalcular_resumen_en, mes,
+                al_completar=lambda _: self.actualizar_estadisticas()
+            )
+        else:
+            self.controller.recalcular_resumen_mes(mes)
+            self.actualizar_estadisticas()
+
     def actualizar_datos(self):
         self.cargar_pagos()
+        self.actualizar_estadisticas()
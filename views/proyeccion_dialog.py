@@ -0,0 +1,144 @@
+"""
+views/proyeccion_dialog.py
+Diálogo de proyección de ingresos y renovaciones de los próximos meses.
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox, QGroupBox
+)
+from PySide6.QtCore import Qt
+from datetime import datetime
+
+from models.forecast_model import proyectar_ingresos
+
+# Intentar importar matplotlib
+try:
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+    from matplotlib.figure import Figure
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+
+class ProyeccionDialog(QDialog):
+    """Muestra ingresos y renovaciones esperadas según la tasa de renovación observada."""
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.setWindowTitle("Proyección de Ingresos")
+        self.setMinimumSize(900, 650)
+        self.init_ui()
+        self.proyectar()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("🔮 Proyección de Ingresos y Renovaciones")
+        title.setStyleSheet("font-size: 20px; font-weight: bold; margin: 10px;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        # Parámetros
+        params_group = QGroupBox("⚙️ Parámetros")
+        params_layout = QHBoxLayout()
+
+        self.spin_meses = QSpinBox()
+        self.spin_meses.setRange(3, 12)
+        self.spin_meses.setValue(6)
+        self.spin_meses.setSuffix(" meses")
+
+        self.spin_gracia = QSpinBox()
+        self.spin_gracia.setRange(0, 60)
+        self.spin_gracia.setValue(15)
+        self.spin_gracia.setSuffix(" días")
+
+        btn_proyectar = QPushButton("📈 Proyectar")
+        btn_proyectar.setStyleSheet("""
+            QPushButton {
+                padding: 8px 18px;
+                background: #2196F3;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #1976D2;
+            }
+        """)
+        btn_proyectar.clicked.connect(self.proyectar)
+
+        params_layout.addWidget(QLabel("Horizonte:"))
+        params_layout.addWidget(self.spin_meses)
+        params_layout.addWidget(QLabel("Gracia:"))
+        params_layout.addWidget(self.spin_gracia)
+        params_layout.addWidget(btn_proyectar)
+        params_layout.addStretch()
+        params_group.setLayout(params_layout)
+        layout.addWidget(params_group)
+
+        self.lbl_resumen = QLabel("")
+        self.lbl_resumen.setStyleSheet("font-size: 14px; padding: 5px;")
+        layout.addWidget(self.lbl_resumen)
+
+        if MATPLOTLIB_AVAILABLE:
+            self.figura = Figure(figsize=(8, 3.5), facecolor='white')
+            self.canvas = FigureCanvas(self.figura)
+            self.canvas.setMinimumHeight(260)
+            layout.addWidget(self.canvas)
+
+        self.tabla = QTableWidget()
+        self.tabla.setColumnCount(3)
+        self.tabla.setHorizontalHeaderLabels(["Mes", "Ingresos Esperados", "Renovaciones Esperadas"])
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        self.tabla.setAlternatingRowColors(True)
+        layout.addWidget(self.tabla)
+
+    def proyectar(self):
+        """Calcula la proyección y actualiza tabla y gráfico."""
+        try:
+            resultado = proyectar_ingresos(
+                self.db_path, self.spin_meses.value(), self.spin_gracia.value()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al calcular la proyección:\n{e}")
+            return
+
+        self.lbl_resumen.setText(
+            f"Total esperado: <b>${resultado['total_ingresos']:,.0f}</b> · "
+            f"Socios vigentes: <b>{resultado['socios_vigentes']}</b> · "
+            f"Tasa de renovación observada: <b>{resultado['tasa_renovacion']:.0%}</b>"
+        )
+
+        self.tabla.setRowCount(len(resultado['meses']))
+        for row, (mes, ingreso, renov) in enumerate(
+                zip(resultado['meses'], resultado['ingresos'], resultado['renovaciones'])):
+            self.tabla.setItem(row, 0, QTableWidgetItem(self._formatear_mes(mes)))
+            self.tabla.setItem(row, 1, QTableWidgetItem(f"${ingreso:,.0f}"))
+            self.tabla.setItem(row, 2, QTableWidgetItem(f"{renov:,.0f}"))
+
+        if MATPLOTLIB_AVAILABLE:
+            self._dibujar(resultado)
+
+    def _dibujar(self, resultado):
+        """Ingresos reales de los últimos meses y la proyección a continuación."""
+        self.figura.clear()
+        ax = self.figura.add_subplot(111)
+
+        historico = [h for h in resultado['historico'] if h[0] < resultado['meses'][0]]
+        x_hist = [self._formatear_mes(h[0]) for h in historico]
+        x_proy = [self._formatear_mes(m) for m in resultado['meses']]
+
+        if historico:
+            ax.plot(x_hist, [h[1] for h in historico], marker='o', color='#4CAF50', label="Real")
+        ax.bar(x_proy, resultado['ingresos'], color='#2196F3', alpha=0.7, label="Proyectado")
+        ax.set_ylabel("Ingresos ($)", fontsize=10)
+        ax.tick_params(axis='x', rotation=45, labelsize=8)
+        ax.grid(axis='y', alpha=0.3)
+        ax.legend(fontsize=9)
+        self.figura.tight_layout()
+        self.canvas.draw()
+
+    def _formatear_mes(self, mes):
+        return datetime.strptime(mes, "%Y-%m").strftime("%b %Y")
@@ -0,0 +1,146 @@
+"""
+views/recibos_dialog.py
+Diálogo para generar los recibos de pago de un mes en lote.
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
+    QCheckBox, QProgressBar, QMessageBox
+)
+from PySide6.QtCore import Qt, Signal
+from datetime import datetime
+import os
+import threading
+
+from receipt_service import ReceiptService
+
+
+class RecibosDialog(QDialog):
+    """Genera un PDF por pago del mes elegido, en varios procesos, mostrando el avance."""
+
+    # Emitidas desde el hilo del lote; Qt las entrega en el hilo de la GUI
+    progreso = Signal(int, int)
+    terminado = Signal(object)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.service = ReceiptService(db_path)
+        self.cancelado = threading.Event()
+        self.hilo = None
+        self.setWindowTitle("Recibos de Pago")
+        self.setMinimumWidth(450)
+        self.progreso.connect(self._actualizar_progreso)
+        self.terminado.connect(self._lote_terminado)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("🧾 Recibos de Pago")
+        title.setStyleSheet("font-size: 20px; font-weight: bold; margin: 10px;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        mes_layout = QHBoxLayout()
+        mes_layout.addWidget(QLabel("Mes:"))
+        self.combo_mes = QComboBox()
+        anio, mes = datetime.now().year, datetime.now().month
+        for _ in range(12):
+            self.combo_mes.addItem(datetime(anio, mes, 1).strftime("%B %Y").capitalize(), f"{anio}-{mes:02d}")
+            anio, mes = (anio, mes - 1) if mes > 1 else (anio - 1, 12)
+        mes_layout.addWidget(self.combo_mes)
+        layout.addLayout(mes_layout)
+
+        self.chk_combinar = QCheckBox("Generar también un único PDF para imprimir")
+        self.chk_combinar.setChecked(True)
+        layout.addWidget(self.chk_combinar)
+
+        self.barra = QProgressBar()
+        self.barra.setValue(0)
+        layout.addWidget(self.barra)
+
+        self.lbl_estado = QLabel("")
+        layout.addWidget(self.lbl_estado)
+
+        botones = QHBoxLayout()
+        self.btn_generar = QPushButton("🧾 Generar")
+        self.btn_generar.setStyleSheet("""
+            QPushButton {
+                padding: 8px 18px;
+                background: #2196F3;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #1976D2;
+            }
+        """)
+        self.btn_generar.clicked.connect(self.generar)
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.setEnabled(False)
+        self.btn_cancelar.clicked.connect(self.cancelado.set)
+        botones.addStretch()
+        botones.addWidget(self.btn_cancelar)
+        botones.addWidget(self.btn_generar)
+        layout.addLayout(botones)
+
+    def generar(self):
+        """Lanza el lote en segundo plano para no congelar la ventana."""
+        try:
+            pago_ids = self.service.obtener_pagos_mes(self.combo_mes.currentData())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al obtener los pagos:\n{e}")
+            return
+
+        if not pago_ids:
+            QMessageBox.information(self, "Sin pagos", "No hay pagos registrados en ese mes.")
+            return
+
+        self.cancelado.clear()
+        self.barra.setRange(0, len(pago_ids))
+        self.barra.setValue(0)
+        self.lbl_estado.setText(f"Generando {len(pago_ids)} recibos...")
+        self.btn_generar.setEnabled(False)
+        self.btn_cancelar.setEnabled(True)
+
+        self.hilo = threading.Thread(
+            target=self._ejecutar_lote, args=(pago_ids, self.chk_combinar.isChecked()), daemon=True
+        )
+        self.hilo.start()
+
+    def _ejecutar_lote(self, pago_ids, combinar):
+        try:
+            resultado = self.service.generar_lote(
+                pago_ids, combinar, progreso=self.progreso.emit, cancelado=self.cancelado
+            )
+        except Exception as e:
+            resultado = {'recibos': [], 'combinado': None, 'errores': [str(e)]}
+        self.terminado.emit(resultado)
+
+    def _actualizar_progreso(self, hechos, total):
+        self.barra.setValue(hechos)
+        self.lbl_estado.setText(f"Generados {hechos} de {total} recibos...")
+
+    def _lote_terminado(self, resultado):
+        self.btn_generar.setEnabled(True)
+        self.btn_cancelar.setEnabled(False)
+        self.lbl_estado.setText(f"{len(resultado['recibos'])} recibos generados.")
+
+        if resultado['errores']:
+            QMessageBox.warning(
+                self, "Recibos con errores",
+                "Algunos recibos no se pudieron generar:\n" + "\n".join(resultado['errores'][:5])
+            )
+        elif self.cancelado.is_set():
+            QMessageBox.information(self, "Cancelado", f"Se generaron {len(resultado['recibos'])} recibos antes de cancelar.")
+        else:
+            mensaje = f"Recibos guardados en:\n{os.path.abspath(self.service.carpeta)}"
+            if resultado['combinado']:
+                mensaje += f"\n\nArchivo para imprimir:\n{resultado['combinado']}"
+            QMessageBox.information(self, "✅ Éxito", mensaje)
+
+    def reject(self):
+        # Al cerrar con un lote en curso se descartan las tareas pendientes
+        self.cancelado.set()
+        super().reject()
@@ -461,6 +461,7 @@ class ReportsView(QWidget):
     def __init__(self, db_path):
         super().__init__()
         self.db_path = db_path
+        self.cohort_model = None  # Se crea al abrir las cohortes y conserva su caché
         self.init_ui()
 
     def init_ui(self):
@@ -600,6 +601,70 @@ class ReportsView(QWidget):
         """)
         self.btn_export_pdf.clicked.connect(self.exportar_pdf)
 
+        self.btn_proyeccion = QPushButton("🔮 Proyección")
+        self.btn_proyeccion.setStyleSheet("""
+            QPushButton {
+                padding: 10px 20px;
+                background: #673AB7;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #512DA8;
+            }
+        """)
+        self.btn_proyeccion.clicked.connect(self.abrir_proyeccion)
+
+        self.btn_cohortes = QPushButton("🧩 Cohortes")
+        self.btn_cohortes.setStyleSheet("""
+            QPushButton {
+                padding: 10px 20px;
+                background: #009688;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #00796B;
+            }
+        """)
+        self.btn_cohortes.clicked.connect(self.abrir_cohortes)
+
+        self.btn_deudas = QPushButton("⏳ Antigüedad de Deuda")
+        self.btn_deudas.setStyleSheet("""
+            QPushButton {
+                padding: 10px 20px;
+                background: #F44336;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #D32F2F;
+            }
+        """)
+        self.btn_deudas.clicked.connect(self.abrir_antiguedad_deuda)
+
+        self.btn_recibos = QPushButton("🧾 Recibos")
+        self.btn_recibos.setStyleSheet("""
+            QPushButton {
+                padding: 10px 20px;
+                background: #607D8B;
+                color: white;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #455A64;
+            }
+        """)
+        self.btn_recibos.clicked.connect(self.abrir_recibos)
+
+        export_layout.addWidget(self.btn_proyeccion)
+        export_layout.addWidget(self.btn_cohortes)
+        export_layout.addWidget(self.btn_deudas)
+        export_layout.addWidget(self.btn_recibos)
         export_layout.addStretch()
         export_layout.addWidget(self.btn_export_excel)
         export_layout.addWidget(self.btn_export_pdf)
@@ -880,3 +945,34 @@ class ReportsView(QWidget):
 
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error al exportar PDF:\n{e}")
+
+    def abrir_proyeccion(self):
+        """Abre la proyección de ingresos y renovaciones."""
+        try:
+            from views.proyeccion_dialog import ProyeccionDialog
+            ProyeccionDialog(self.db_path, self).exec()
+        except ImportError as e:
+            QMessageBox.warning(self, "Falta dependencia", f"La proyección requiere NumPy:\n{e}")
+
+    def abrir_cohortes(self):
+        """Abre el mapa de calor de retención por cohortes."""
+        try:
+            from models.cohort_model import CohortModel
+            from views.cohortes_dialog import CohortesDialog
+        except ImportError as e:
+            QMessageBox.warning(self, "Falta dependencia", f"Las cohortes requieren NumPy:\n{e}")
+            return
+
+        if self.cohort_model is None:
+            self.cohort_model = CohortModel(self.db_path)
+        CohortesDialog(self.cohort_model, self).exec()
+
+    def abrir_antiguedad_deuda(self):
+        """Abre la antigüedad de deuda por tramos."""
+        from views.antiguedad_deuda_dialog import AntiguedadDeudaDialog
+        AntiguedadDeudaDialog(self.db_path, self).exec()
+
+    def abrir_recibos(self):
+        """Abre la generación de recibos de pago en lote."""
+        from views.recibos_dialog import RecibosDialog
+        RecibosDialog(self.db_path, self).exec()
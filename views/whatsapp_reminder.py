@@ -1,13 +1,15 @@
 # views/whatsapp_reminder.py
 import sqlite3
 import webbrowser
-from datetime import datetime, timedelta
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QSpinBox, QPushButton, QTableWidget, QTableWidgetItem,
     QHBoxLayout, QMessageBox, QGroupBox, QCheckBox
 )
 from PySide6.QtCore import Qt
 
+from models.alert_rules import AlertRulesModel
+from models.phone_index import PhoneIndex
+
 
 class WhatsappReminderView(QWidget):
     """Ventana para enviar recordatorios por WhatsApp a socios próximos a vencer."""
@@ -15,6 +17,8 @@ class WhatsappReminderView(QWidget):
         super().__init__()
         self.db_path = db_path
         self.socios = []
+        self.indice_telefonos = PhoneIndex(db_path)
+        self.reglas_alertas = AlertRulesModel(db_path)
         self.init_ui()
 
     def init_ui(self):
@@ -87,34 +91,21 @@ class WhatsappReminderView(QWidget):
     # === FUNCIONES ===
 
     def buscar_socios(self):
-        """Busca socios a los que se les vence pronto la cuota."""
+        """Busca socios a los que se les vence pronto la cuota (con la duración de su plan)."""
         dias_aviso = self.spin_dias.value()
-        hoy = datetime.now().date()
 
         conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-
-        c.execute("""
-            SELECT s.id, s.nombre || ' ' || s.apellido, s.telefono,
-                   MAX(p.fecha_pago)
-            FROM socios s
-            LEFT JOIN pagos p ON s.id = p.socio_id
-            WHERE s.activo = 1
-            GROUP BY s.id
-        """)
-
-        socios = c.fetchall()
+        self.indice_telefonos.sincronizar(conn)
+        conn.commit()
         conn.close()
 
-        proximos = []
-        for s in socios:
-            if not s[3]:
-                continue
-            fecha_pago = datetime.strptime(s[3], "%Y-%m-%d").date()
-            dias_transcurridos = (hoy - fecha_pago).days
-            dias_restantes = 30 - dias_transcurridos
-            if 0 < dias_restantes <= dias_aviso:
-                proximos.append((s[0], s[1], s[2], s[3], dias_restantes))
+        # A los que vencen hoy no se les avisa
+        proximos = [
+            (socio_id, f"{nombre} {apellido}", telefono, ultimo_pago, dias_restantes, telefono_norm)
+            for socio_id, nombre, apellido, telefono, telefono_norm, ultimo_pago, _, dias_restantes
+            in self.reglas_alertas.obtener_proximos(dias_aviso, solo_activos=True)
+            if dias_restantes > 0
+        ]
 
         self._mostrar_socios(proximos)
 
@@ -125,7 +116,9 @@ class WhatsappReminderView(QWidget):
             chk = QCheckBox()
             self.tabla.setCellWidget(i, 0, chk)
             self.tabla.setItem(i, 1, QTableWidgetItem(s[1]))
-            self.tabla.setItem(i, 2, QTableWidgetItem(s[2] or ""))
+            item_telefono = QTableWidgetItem(s[2] or "")
+            item_telefono.setData(Qt.UserRole, s[5])
+            self.tabla.setItem(i, 2, item_telefono)
             self.tabla.setItem(i, 3, QTableWidgetItem(s[3]))
             self.tabla.setItem(i, 4, QTableWidgetItem(str(s[4])))
 
@@ -136,19 +129,19 @@ class WhatsappReminderView(QWidget):
             chk = self.tabla.cellWidget(i, 0)
             if chk and chk.isChecked():
                 nombre = self.tabla.item(i, 1).text()
-                telefono = self.tabla.item(i, 2).text()
+                telefono_norm = self.tabla.item(i, 2).data(Qt.UserRole)
                 dias = self.tabla.item(i, 4).text()
-                if telefono:
-                    seleccionados.append((nombre, telefono, dias))
+                if telefono_norm:
+                    seleccionados.append((nombre, telefono_norm, dias))
 
         if not seleccionados:
             QMessageBox.warning(self, "Atención", "Seleccioná al menos un socio para enviar el mensaje.")
             return
 
         for s in seleccionados:
-            nombre, telefono, dias = s
+            nombre, telefono_norm, dias = s
             mensaje = f"Hola {nombre}, estás a {dias} días de vencer tu cuota del gimnasio. Te esperamos para renovar"
-            link = f"https://wa.me/{telefono.replace('+', '').replace(' ', '')}?text={mensaje.replace(' ', '%20')}"
+            link = f"https://wa.me/{telefono_norm.lstrip('+')}?text={mensaje.replace(' ', '%20')}"
             webbrowser.open(link)
 
         QMessageBox.information(self, "✅ Listo", f"Se abrieron {len(seleccionados)} chats de WhatsApp en el navegador.")
@@ -1,7 +1,6 @@
 import sys
 import sqlite3
 import webbrowser
-from datetime import datetime
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QTableWidget, QTableWidgetItem,
@@ -9,6 +8,9 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
+from models.alert_rules import AlertRulesModel
+from models.phone_index import PhoneIndex
+
 DB_PATH = "gimnasio.db"
 
 class VentanaWhatsApp(QWidget):
@@ -48,6 +50,8 @@ class VentanaWhatsApp(QWidget):
         btn_layout.addWidget(self.btn_enviar_todos)
         self.layout.addLayout(btn_layout)
 
+        # Completa los teléfonos normalizados que hayan quedado pendientes
+        PhoneIndex(DB_PATH)
         self.cargar_socios()
 
     def conectar(self):
@@ -57,54 +61,39 @@ class VentanaWhatsApp(QWidget):
         """Carga socios cuya cuota vence dentro de los próximos X días"""
         self.tabla.setRowCount(0)
         dias_filtro = self.dias_spin.value()
-        hoy = datetime.now().date()
 
-        conn = self.conectar()
-        cur = conn.cursor()
         try:
-            cur.execute("""
-                SELECT nombre, apellido, telefono, fecha_vencimiento
-                FROM vista_vencimientos
-                WHERE telefono IS NOT NULL
-            """)
-            socios = cur.fetchall()
+            # Vencimiento del último pago de cada socio, con la duración de su plan
+            socios = AlertRulesModel(DB_PATH).obtener_proximos(dias_filtro, solo_activos=True)
         except Exception as e:
             QMessageBox.critical(self, "Error BD", f"No se pudo leer la base:\n{e}")
-            conn.close()
             return
-        conn.close()
 
-        for nombre, apellido, telefono, fecha_vto_str in socios:
-            if not telefono or not fecha_vto_str:
-                continue
-            fecha_vto = datetime.strptime(fecha_vto_str, "%Y-%m-%d").date()
-            dias_restantes = (fecha_vto - hoy).days
-            if 0 <= dias_restantes <= dias_filtro:
-                self.agregar_fila(nombre, apellido, telefono, fecha_vto, dias_restantes)
+        for _, nombre, apellido, telefono, telefono_norm, _, fecha_vto, dias_restantes in socios:
+            if telefono_norm:
+                self.agregar_fila(nombre, apellido, telefono, telefono_norm, fecha_vto, dias_restantes)
 
-    def agregar_fila(self, nombre, apellido, telefono, fecha_vto, dias_restantes):
+    def agregar_fila(self, nombre, apellido, telefono, telefono_norm, fecha_vto, dias_restantes):
         row = self.tabla.rowCount()
         self.tabla.insertRow(row)
         self.tabla.setItem(row, 0, QTableWidgetItem(f"{nombre} {apellido}"))
-        self.tabla.setItem(row, 1, QTableWidgetItem(telefono))
+        item_telefono = QTableWidgetItem(telefono)
+        item_telefono.setData(Qt.UserRole, telefono_norm)
+        self.tabla.setItem(row, 1, item_telefono)
         self.tabla.setItem(row, 2, QTableWidgetItem(str(fecha_vto)))
         self.tabla.setItem(row, 3, QTableWidgetItem(str(dias_restantes)))
 
         btn = QPushButton("Enviar")
-        btn.clicked.connect(lambda: self.enviar_mensaje(nombre, telefono, dias_restantes))
+        btn.clicked.connect(lambda: self.enviar_mensaje(nombre, telefono_norm, dias_restantes))
         self.tabla.setCellWidget(row, 4, btn)
 
-    def enviar_mensaje(self, nombre, telefono, dias_restantes):
-        """Abre chat de WhatsApp con mensaje personalizado"""
-        telefono = telefono.strip().replace(" ", "").replace("-", "")
-        if not telefono.startswith("549"):
-            telefono = "549" + telefono[-10:]  # Normaliza número argentino
-
+    def enviar_mensaje(self, nombre, telefono_norm, dias_restantes):
+        """Abre chat de WhatsApp con mensaje personalizado (teléfono ya normalizado a E.164)"""
         mensaje = (
             f"Hola {nombre}, tu cuota vence en {dias_restantes} días. "
             f"Podés abonar en recepción para mantener tu membresía activa. ¡Gracias!"
         )
-        url = f"https://wa.me/{telefono}?text={mensaje.replace(' ', '%20')}"
+        url = f"https://wa.me/{telefono_norm.lstrip('+')}?text={mensaje.replace(' ', '%20')}"
         webbrowser.open(url)
 
     def enviar_a_todos(self):
@@ -115,9 +104,9 @@ class VentanaWhatsApp(QWidget):
 
         for i in range(filas):
             nombre = self.tabla.item(i, 0).text()
-            telefono = self.tabla.item(i, 1).text()
+            telefono_norm = self.tabla.item(i, 1).data(Qt.UserRole)
             dias = int(self.tabla.item(i, 3).text())
-            self.enviar_mensaje(nombre, telefono, dias)
+            self.enviar_mensaje(nombre, telefono_norm, dias)
 
         QMessageBox.information(self, "Envío completo", "Se abrieron los chats de WhatsApp para todos los socios.")
 